@@ -0,0 +1,127 @@
+"""
+Runs the benchmark modules & compares their results with a baseline:
+
+    $ python -m benchmarks -o baseline.json
+    $ git checkout my-branch
+    $ python -m benchmarks --baseline baseline.json
+
+Modules to run might be chosen by their names, ie. `python -m benchmarks bench_wire`.
+A measurement greater than its baseline by more than `--threshold` is reported as
+a regression & the exit status is 1. All the measurements are seconds or bytes, so lower
+is better. Timings vary between runs & machines; compare results of the same machine only.
+"""
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+import typing as t
+
+from ._utils import (
+    Results,
+    format_value,
+)
+
+
+SuiteResults = t.Dict[str, Results]
+
+
+def discover() -> t.List[str]:
+    """Names of all the benchmark modules, ie. `bench_*` modules of this package."""
+    return sorted(
+        info.name
+        for info in pkgutil.iter_modules([os.path.dirname(__file__)])
+        if info.name.startswith("bench_")
+    )
+
+
+def run(names: t.Iterable[str]) -> SuiteResults:
+    results = {}
+    for name in names:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = importlib.import_module(f"{__package__}.{name}").run()
+    return results
+
+
+def compare(
+    baseline: SuiteResults, results: SuiteResults, threshold: float
+) -> t.List[t.Tuple[str, str, float, float, bool]]:
+    """
+    Returns rows of measurements found in both: the module, the name of the measurement,
+    its baseline & its current value & whether it is a regression.
+    """
+    rows = []
+    for module, measurements in results.items():
+        for name, value in measurements.items():
+            old = baseline.get(module, {}).get(name)
+            if old is None:
+                continue
+            regression = old > 0 and value / old > 1 + threshold
+            rows.append((module, name, old, value, regression))
+    return rows
+
+
+def print_comparison(rows: t.List[t.Tuple[str, str, float, float, bool]]) -> None:
+    width = max((len(f"{module}.{name}") for module, name, *_ in rows), default=0)
+    for module, name, old, new, regression in rows:
+        change = f"{(new / old - 1) * 100:+7.1f}%" if old else "       -"
+        flag = "  REGRESSION" if regression else ""
+        print(
+            f"{module + '.' + name:<{width}} "
+            f"{format_value(name, old)} -> {format_value(name, new)} {change}{flag}"
+        )
+
+
+def print_suite(results: SuiteResults) -> None:
+    width = max((len(f"{m}.{n}") for m, r in results.items() for n in r), default=0)
+    for module, measurements in results.items():
+        for name, value in measurements.items():
+            print(f"{module + '.' + name:<{width}} {format_value(name, value)}")
+
+
+def _load(path: str) -> SuiteResults:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("modules", nargs="*", help="names of the modules to run, all by default")
+    parser.add_argument("-o", "--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="compare the results with ones saved before")
+    parser.add_argument(
+        "--results", help="compare results saved before instead of running the benchmarks"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative increase reported as a regression, 0.1 by default",
+    )
+    args = parser.parse_args(argv)
+
+    if args.results:
+        results = _load(args.results)
+    else:
+        available = discover()
+        unknown = set(args.modules) - set(available)
+        if unknown:
+            parser.error(f"unknown modules: {', '.join(sorted(unknown))}")
+        results = run(args.modules or available)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "results": results}, f, indent=2)
+            f.write("\n")
+
+    if not args.baseline:
+        print_suite(results)
+        return 0
+    rows = compare(_load(args.baseline), results, args.threshold)
+    print_comparison(rows)
+    return 1 if any(regression for *_, regression in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Helpers shared by the benchmark modules. Each module exposes a `run` function returning
+a dict of measurements, ie. seconds per operation (keys ending with `_s`) or bytes per
+instance (keys ending with `_bytes`), and can be run on its own:
+
+    $ python -m benchmarks.bench_compact_errors
+
+or together with the others, see `benchmarks.__main__`:
+
+    $ python -m benchmarks
+"""
+import gc
+import timeit
+import tracemalloc
+import typing as t
+
+
+Results = t.Dict[str, float]
+
+
+def time_per_op(func: t.Callable[[], t.Any], number: int = 100_000, repeat: int = 5) -> float:
+    """Best of `repeat` timings of `number` calls of `func`, in seconds per call."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def bytes_per_object(factory: t.Callable[[], t.Any], number: int = 10_000) -> float:
+    """Average size of memory blocks allocated for an object made by `factory` and kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [factory() for _ in range(number)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return (after - before) / number
+
+
+def format_value(name: str, value: float) -> str:
+    if name.endswith("_s"):
+        return f"{value * 1e9:12.1f} ns"
+    return f"{value:12.1f} B"
+
+
+def print_results(results: Results) -> None:
+    width = max(len(name) for name in results)
+    for name, value in results.items():
+        print(f"{name:<{width}} {format_value(name, value)}")
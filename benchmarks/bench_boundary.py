@@ -0,0 +1,79 @@
+"""
+Overhead of ErrorBoundary on each of its paths: success, suppressing, propagating
+& transforming an exception, as a context manager & as a decorator, against a bare try/except.
+"""
+from pca.packages.errors import (
+    ErrorBoundary,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+TransformedError = error_builder("TransformedError")
+
+
+def succeed() -> None:
+    pass
+
+
+def fail() -> None:
+    raise ValueError("an error")
+
+
+def bare() -> None:
+    try:
+        fail()
+    except ValueError:
+        pass
+
+
+def ignore(exc_info) -> None:
+    pass
+
+
+def run(number: int = 100_000) -> Results:
+    # by default, suppressed exceptions are logged; the cost of logging isn't measured
+    suppressing = ErrorBoundary(name="suppress", catch=ValueError, on_suppress_exception=ignore)
+    propagating = ErrorBoundary(name="propagate", catch=())
+    transforming = ErrorBoundary(
+        name="transform",
+        catch=(),
+        transform_propagated_exception=lambda exc_info: TransformedError(),
+    )
+
+    def within(boundary: ErrorBoundary, func) -> None:
+        try:
+            with boundary:
+                func()
+        except Exception:
+            pass
+
+    def calling(func) -> None:
+        try:
+            func()
+        except Exception:
+            pass
+
+    decorated_success = suppressing(succeed)
+    decorated_suppress = suppressing(fail)
+    decorated_propagate = propagating(fail)
+
+    return {
+        "bare_try_except_s": time_per_op(bare, number),
+        "success_s": time_per_op(lambda: within(suppressing, succeed), number),
+        "suppress_s": time_per_op(lambda: within(suppressing, fail), number),
+        "propagate_s": time_per_op(lambda: within(propagating, fail), number),
+        "transform_s": time_per_op(lambda: within(transforming, fail), number),
+        "decorated_success_s": time_per_op(lambda: calling(decorated_success), number),
+        "decorated_suppress_s": time_per_op(lambda: calling(decorated_suppress), number),
+        "decorated_propagate_s": time_per_op(lambda: calling(decorated_propagate), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,43 @@
+"""
+Overhead of ErrorBoundary on the success path of a tiny function, against a bare try/except.
+"""
+from pca.packages.errors import ErrorBoundary
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+def tiny(value: int) -> int:
+    return value + 1
+
+
+def bare(value: int) -> int:
+    try:
+        return tiny(value)
+    except Exception:
+        return 0
+
+
+def run(number: int = 200_000) -> Results:
+    fast = ErrorBoundary(name="fast")(tiny)
+    with_hook = ErrorBoundary(name="with_hook", on_no_exception=lambda: None)(tiny)
+    boundary = ErrorBoundary(name="context_manager")
+
+    def context_manager(value: int) -> int:
+        with boundary:
+            return tiny(value)
+
+    return {
+        "plain_call_s": time_per_op(lambda: tiny(1), number),
+        "bare_try_except_s": time_per_op(lambda: bare(1), number),
+        "fast_path_decorator_s": time_per_op(lambda: fast(1), number),
+        "decorator_with_hook_s": time_per_op(lambda: with_hook(1), number),
+        "context_manager_s": time_per_op(lambda: context_manager(1), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,84 @@
+"""
+`ErrorBoundary.map` over 100k items, every 100th of them failing: inline & on a thread pool
+with chunks of 1 & 256 items, against a hand-written try/except in `Executor.map`. Also
+the peak of memory allocated while the results are consumed one by one, which stays
+constant for `map` & grows with the number of items for `Executor.map`.
+"""
+import tracemalloc
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pca.packages.errors import ErrorBoundary
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+N_ITEMS = 100_000
+
+
+def process(item: int) -> int:
+    if item % 100 == 0:
+        raise ValueError(item)
+    return item * 2
+
+
+def by_hand(item: int):
+    try:
+        return process(item)
+    except ValueError as e:
+        return e
+
+
+def ignore(exc_info) -> None:
+    pass
+
+
+def peak_bytes(results_factory) -> float:
+    tracemalloc.start()
+    try:
+        for _ in results_factory():
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(number: int = 1) -> Results:
+    # by default, suppressed exceptions are logged; the cost of logging isn't measured
+    boundary = ErrorBoundary(catch=ValueError, on_suppress_exception=ignore)
+    items = range(N_ITEMS)
+
+    def consume(results) -> None:
+        for _ in results:
+            pass
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return {
+            "inline_per_item_s": time_per_op(lambda: consume(boundary.map(process, items)), number)
+            / N_ITEMS,
+            "pool_per_item_s": time_per_op(
+                lambda: consume(boundary.map(process, items, executor=executor)), number
+            )
+            / N_ITEMS,
+            "pool_chunks_per_item_s": time_per_op(
+                lambda: consume(boundary.map(process, items, executor=executor, chunksize=256)),
+                number,
+            )
+            / N_ITEMS,
+            "executor_map_per_item_s": time_per_op(
+                lambda: consume(executor.map(by_hand, items)), number
+            )
+            / N_ITEMS,
+            "map_peak_bytes": peak_bytes(
+                lambda: boundary.map(process, items, executor=executor, chunksize=256)
+            ),
+            "executor_map_peak_bytes": peak_bytes(lambda: executor.map(by_hand, items)),
+        }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,34 @@
+"""
+Hot paths of errors built by `error_builder`: definition of an error class, construction
+of instances & their `str`, `repr`, `to_dict` & `clone`.
+"""
+from pca.packages.errors import error_builder
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+MyError = error_builder("MyError", hint="A hint.")
+CompactError = error_builder("CompactError", params=("field", "value"))
+
+
+def run(number: int = 100_000) -> Results:
+    error = MyError("an_arg", field="name", value=42)
+    return {
+        "define_error_class_s": time_per_op(lambda: error_builder("AnError"), number // 10),
+        "init_no_params_s": time_per_op(MyError, number),
+        "init_with_params_s": time_per_op(lambda: MyError(field="name", value=42), number),
+        "init_compact_s": time_per_op(lambda: CompactError(field="name", value=42), number),
+        "str_s": time_per_op(lambda: str(error), number),
+        "repr_s": time_per_op(lambda: repr(error), number),
+        "first_repr_s": time_per_op(lambda: repr(MyError("an_arg", field="name")), number),
+        "to_dict_s": time_per_op(error.to_dict, number),
+        "clone_s": time_per_op(lambda: error.clone(value=43), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,75 @@
+"""
+Templates of 20 locales of 10k errors kept in a memory-mapped bundle against the same
+templates loaded into dicts: memory taken by each process, time of opening & of looking up
+a template, cold & cached rendering.
+"""
+import json
+import os
+import tempfile
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    MessageBundle,
+    MessageRenderer,
+    build_bundle,
+)
+
+from ._utils import (
+    Results,
+    bytes_per_object,
+    print_results,
+    time_per_op,
+)
+
+
+N_LOCALES = 20
+N_ERRORS = 10_000
+
+LOCALES = [f"l{i}" for i in range(N_LOCALES)]
+HINTS = {f"Error{i}": "" for i in range(N_ERRORS)}
+
+Catalog = ErrorCatalog.from_hints("BenchBundleCatalog", HINTS, lazy=True)
+
+
+def run(number: int = 100_000) -> Results:
+    sources = {
+        locale: {code: f"{code} in {locale}: {{value}}." for code in HINTS} for locale in LOCALES
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        bundle_path = os.path.join(directory, "messages.bundle")
+        with open(bundle_path, "wb") as f:
+            build_bundle(f, [Catalog], sources)
+        json_path = os.path.join(directory, "messages.json")
+        with open(json_path, "w") as f:
+            json.dump(sources, f)
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        bundle = MessageBundle(bundle_path)
+        templates = bundle["l7"]
+        error = Catalog.Error42(value=1)
+        renderer = MessageRenderer(bundle=bundle)
+        results = {
+            "open_bundle_s": time_per_op(
+                lambda: MessageBundle(bundle_path).close(), number // 100
+            ),
+            "load_json_s": time_per_op(load_json, 3),
+            "bundle_bytes": bytes_per_object(lambda: MessageBundle(bundle_path), 10),
+            "json_bytes": bytes_per_object(load_json, 3),
+            "bundle_lookup_s": time_per_op(
+                lambda: templates.get("BenchBundleCatalog.Error4242"), number
+            ),
+            "dict_lookup_s": time_per_op(lambda: sources["l7"].get("Error4242"), number),
+            "render_cold_s": time_per_op(
+                lambda: MessageRenderer(bundle=bundle).render(error, "l3"), number // 10
+            ),
+            "render_cached_s": time_per_op(lambda: renderer.render(error, "l3"), number),
+        }
+        bundle.close()
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,67 @@
+"""
+Catalog operations: iteration, `len`, `in` & `all` for catalogs of 10, 1k & 10k errors,
+spread over nested catalogs & a catalog inheriting from another one.
+"""
+import itertools
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorCatalogMeta,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+SIZES = (10, 1_000, 10_000)
+N_NESTED = 5
+
+_names = itertools.count()
+
+
+def _catalog(name: str, n_errors: int, bases=(ErrorCatalog,)) -> ErrorCatalogMeta:
+    namespace = {f"{name}Error{i}": error_builder() for i in range(n_errors)}
+    return ErrorCatalogMeta(name, bases, namespace)
+
+
+def build_catalog(size: int) -> ErrorCatalogMeta:
+    """
+    A catalog of `size` errors: half of them in nested catalogs, a quarter in the base catalog
+    & the rest in the catalog itself.
+    """
+    prefix = f"BenchCatalog{next(_names)}_"
+    per_nested = size // 2 // N_NESTED
+    nested = {f"Nested{i}": _catalog(f"{prefix}Nested{i}", per_nested) for i in range(N_NESTED)}
+    base = _catalog(f"{prefix}Base", size // 4)
+    n_own = size - len(base) - N_NESTED * per_nested
+    own = {f"{prefix}Error{i}": error_builder() for i in range(n_own)}
+    return ErrorCatalogMeta(f"{prefix}Catalog", (base,), {**own, **nested})
+
+
+def run(number: int = 100_000) -> Results:
+    results: Results = {}
+    for size in SIZES:
+        catalog = build_catalog(size)
+        assert len(catalog) == size
+        last = catalog.all[-1]
+        missing = error_builder("Missing")
+        # iteration is linear, so it's measured fewer times for big catalogs
+        scaled = max(number * 10 // size, 10)
+        results.update(
+            {
+                f"iter_{size}_s": time_per_op(lambda: list(catalog), scaled),
+                f"all_{size}_s": time_per_op(lambda: catalog.all, number),
+                f"len_{size}_s": time_per_op(lambda: len(catalog), number),
+                f"contains_{size}_s": time_per_op(lambda: last in catalog, number),
+                f"not_contains_{size}_s": time_per_op(lambda: missing in catalog, number),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
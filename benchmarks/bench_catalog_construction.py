@@ -0,0 +1,63 @@
+"""
+Construction of big catalogs: definition of a catalog of 1k & 10k errors with `from_hints`,
+eager & lazy, its first use, ie. definition & flattening, and the same for a chain of 10
+catalogs inheriting from one another. The times should grow linearly with the number
+of errors.
+"""
+import itertools
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorCatalogMeta,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+SIZES = (1_000, 10_000)
+DEPTH = 10
+
+_names = itertools.count()
+
+
+def define_catalog(size: int, lazy: bool = False, base=ErrorCatalog) -> ErrorCatalogMeta:
+    # each catalog gets its own path, so that their errors don't collide in the registry
+    name = f"BenchConstructionCatalog{next(_names)}"
+    hints = {f"{name}Error{i}": f"Hint of error {i}." for i in range(size)}
+    return base.from_hints(name, hints, lazy=lazy)
+
+
+def define_chain(size: int) -> ErrorCatalogMeta:
+    """A chain of `DEPTH` catalogs, each inheriting from the previous one, `size` errors in all."""
+    catalog = ErrorCatalog
+    for _ in range(DEPTH):
+        catalog = define_catalog(size // DEPTH, base=catalog)
+    return catalog
+
+
+def run(number: int = 3) -> Results:
+    results: Results = {}
+    for size in SIZES:
+        results.update(
+            {
+                f"define_{size}_s": time_per_op(lambda: define_catalog(size), number),
+                f"define_lazy_{size}_s": time_per_op(
+                    lambda: define_catalog(size, lazy=True), number
+                ),
+                f"first_use_{size}_s": time_per_op(lambda: len(define_catalog(size)), number),
+                f"first_use_chain_{size}_s": time_per_op(
+                    # each catalog of the chain is used, as if it was iterated over
+                    lambda: [len(c) for c in define_chain(size).__mro__[:DEPTH]],
+                    number,
+                ),
+            }
+        )
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,34 @@
+"""
+Memory footprint & attribute access of compact (slotted) errors against the default layout.
+"""
+from pca.packages.errors import error_builder
+
+from ._utils import (
+    Results,
+    bytes_per_object,
+    print_results,
+    time_per_op,
+)
+
+
+DefaultError = error_builder("DefaultError")
+CompactError = error_builder("CompactError", params=("field", "value"))
+
+
+def run(number: int = 100_000) -> Results:
+    default = DefaultError(field="name", value=42)
+    compact = CompactError(field="name", value=42)
+    return {
+        "default_instance_bytes": bytes_per_object(lambda: DefaultError(field="name", value=42)),
+        "compact_instance_bytes": bytes_per_object(lambda: CompactError(field="name", value=42)),
+        "default_init_s": time_per_op(lambda: DefaultError(field="name", value=42), number),
+        "compact_init_s": time_per_op(lambda: CompactError(field="name", value=42), number),
+        "default_getattr_s": time_per_op(lambda: default.value, number),
+        "compact_getattr_s": time_per_op(lambda: compact.value, number),
+        "default_to_dict_s": time_per_op(default.to_dict, number),
+        "compact_to_dict_s": time_per_op(compact.to_dict, number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
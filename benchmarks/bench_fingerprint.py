@@ -0,0 +1,52 @@
+"""
+Grouping of errors: `fingerprint` against hashing of the formatted traceback.
+"""
+import hashlib
+import traceback
+
+from pca.packages.errors import (
+    Fingerprinter,
+    error_builder,
+    fingerprint,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+MyError = error_builder("MyError")
+
+
+def _nested(depth: int) -> None:
+    if depth:
+        _nested(depth - 1)
+    raise MyError(field="name")
+
+
+def _caught(depth: int) -> BaseException:  # type: ignore
+    try:
+        _nested(depth)
+    except MyError as e:
+        return e
+
+
+def _formatted_hash(error: BaseException) -> str:
+    lines = traceback.format_exception(type(error), error, error.__traceback__)
+    return hashlib.blake2b("".join(lines).encode(), digest_size=8).hexdigest()
+
+
+def run(number: int = 10_000) -> Results:
+    error = _caught(10)
+    return {
+        "formatted_traceback_hash_s": time_per_op(lambda: _formatted_hash(error), number),
+        "fingerprint_s": time_per_op(lambda: fingerprint(error), number),
+        # a new fingerprinter has empty caches
+        "fingerprint_uncached_s": time_per_op(lambda: Fingerprinter()(error), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,60 @@
+"""
+Rendering of localized messages: a single error, a batch of 500 validation errors with
+`render_many` & the same batch formatted by hand from `code` & `kwargs`, for comparison.
+"""
+from pca.packages.errors import (
+    ErrorCatalog,
+    MessageRenderer,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+BATCH = 500
+
+
+class BenchL10nCatalog(ErrorCatalog):
+    Required = error_builder()
+    TooLong = error_builder()
+    NotFound = error_builder()
+
+
+TEMPLATES = {
+    "en": {"Required": "Field {field} is required.", "NotFound": "{resource} not found."},
+    "pl": {"BenchL10nCatalog.TooLong": "Pole {field} ma ponad {max_length:d} znaków."},
+}
+# the same templates, as a presentation layer would keep them
+BY_HAND = {
+    "Required": "Field {field} is required.",
+    "TooLong": "Pole {field} ma ponad {max_length:d} znaków.",
+}
+
+
+def run(number: int = 100_000) -> Results:
+    renderer = MessageRenderer(TEMPLATES)
+    error = BenchL10nCatalog.NotFound(resource="User")
+    batch = [
+        BenchL10nCatalog.Required(field=f"field{i}")
+        if i % 2
+        else BenchL10nCatalog.TooLong(field=f"field{i}", max_length=i)
+        for i in range(BATCH)
+    ]
+    missing = BenchL10nCatalog.NotFound()
+    batch_number = max(number // BATCH, 10)
+    return {
+        "render_s": time_per_op(lambda: renderer.render(error), number),
+        "render_missing_param_s": time_per_op(lambda: renderer.render(missing), number),
+        "render_many_500_s": time_per_op(lambda: renderer.render_many(batch, "pl"), batch_number),
+        "by_hand_500_s": time_per_op(
+            lambda: [BY_HAND[e.code].format(**e.kwargs) for e in batch], batch_number
+        ),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
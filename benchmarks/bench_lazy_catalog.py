@@ -0,0 +1,46 @@
+"""
+Definition of a big catalog with lazy errors against regular ones: the time & memory it takes
+& the cost of the first use of a lazy error.
+"""
+import itertools
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorCatalogMeta,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    bytes_per_object,
+    print_results,
+    time_per_op,
+)
+
+
+N_ERRORS = 1000
+
+_names = itertools.count()
+
+
+def define_catalog(lazy: bool) -> ErrorCatalogMeta:
+    # each catalog gets its own path, so that their errors don't collide in the registry
+    namespace = {
+        f"Error{i}": error_builder(hint=f"Hint of error {i}.", lazy=lazy) for i in range(N_ERRORS)
+    }
+    return ErrorCatalogMeta(f"BenchLazyCatalog{next(_names)}", (ErrorCatalog,), namespace)
+
+
+def run(number: int = 20) -> Results:
+    lazy_catalogs = iter([define_catalog(lazy=True) for _ in range(number * 5)])
+    return {
+        "eager_catalog_s": time_per_op(lambda: define_catalog(lazy=False), number),
+        "lazy_catalog_s": time_per_op(lambda: define_catalog(lazy=True), number),
+        "eager_catalog_bytes": bytes_per_object(lambda: define_catalog(lazy=False), number),
+        "lazy_catalog_bytes": bytes_per_object(lambda: define_catalog(lazy=True), number),
+        "first_use_of_lazy_error_s": time_per_op(lambda: next(lazy_catalogs).Error0, number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
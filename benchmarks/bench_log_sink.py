@@ -0,0 +1,45 @@
+"""
+Cost of a suppressed exception on the thread that hits it, logged by the default hook
+of ErrorBoundary against QueueLogSink, keeping the traceback or a summary of the frames.
+The formatting & writing done by the background thread of the sink isn't measured directly.
+"""
+import io
+import logging
+
+from pca.packages.errors import (
+    ErrorBoundary,
+    QueueLogSink,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+MyError = error_builder("MyError")
+
+
+def _suppress(boundary: ErrorBoundary) -> None:
+    with boundary:
+        raise MyError(field="name")
+
+
+def run(number: int = 20_000) -> Results:
+    default_logger = logging.getLogger(ErrorBoundary.__module__)
+    default_logger.propagate = False
+    default_logger.addHandler(logging.StreamHandler(io.StringIO()))
+
+    default = ErrorBoundary(name="default")
+    results = {"default_logging_s": time_per_op(lambda: _suppress(default), number)}
+    for frames in ("reference", "summary"):
+        with QueueLogSink(io.StringIO(), maxsize=number, frames=frames) as sink:
+            boundary = ErrorBoundary(name=frames, on_suppress_exception=sink)
+            results[f"queue_sink_{frames}_s"] = time_per_op(lambda: _suppress(boundary), number)
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
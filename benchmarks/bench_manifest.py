@@ -0,0 +1,78 @@
+"""
+Cold start: importing large catalogs against loading their manifest, to look up a hint.
+Each measurement is a whole run of a new interpreter, so they include its startup
+& the import of the package, measured on its own as `baseline_s`.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import typing as t
+
+from pathlib import Path
+
+from ._utils import (
+    Results,
+    print_results,
+)
+
+
+N_CATALOGS = 50
+N_ERRORS = 40
+# the generated module is run from a temporary directory, so the package has to be found
+# where the benchmarks are
+ENV = {**os.environ, "PYTHONPATH": str(Path(__file__).resolve().parents[1])}
+
+
+def _catalogs_source() -> str:
+    lines = ["from pca.packages.errors import ErrorCatalog, error_builder", ""]
+    for i in range(N_CATALOGS):
+        lines.append(f"class Catalog{i}(ErrorCatalog):")
+        lines.append("    class Nested(ErrorCatalog):")
+        lines.extend(
+            f"        Error{i}_{j} = error_builder(hint='Hint of error {j}.')"
+            for j in range(N_ERRORS)
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _run(code: str, cwd: Path, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=cwd, env=ENV, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(repeat: int = 5) -> Results:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory)
+        (path / "bench_catalogs.py").write_text(_catalogs_source())
+        with (path / "errors.json").open("w") as manifest:
+            subprocess.run(
+                [sys.executable, "-m", "pca.packages.errors", "export", "bench_catalogs"],
+                cwd=path,
+                env=ENV,
+                check=True,
+                stdout=manifest,
+            )
+        lookup_code = "Catalog7.Nested.Error7_3"
+        runs: t.Dict[str, str] = {
+            "baseline_s": "import pca.packages.errors",
+            "import_catalogs_s": (
+                "from pca.packages.errors import error_registry\n"
+                "import bench_catalogs\n"
+                f"error_registry[{lookup_code!r}].hint"
+            ),
+            "load_manifest_s": (
+                "from pca.packages.errors import Manifest\n"
+                f"Manifest.load(open('errors.json'))[{lookup_code!r}].hint"
+            ),
+        }
+        return {name: _run(code, path, repeat) for name, code in runs.items()}
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,76 @@
+"""
+Transfer of errors between processes: pickling errors against the workaround needed before
+errors could be pickled, ie. sending `to_dict` forms & rebuilding errors with `from_dict`.
+Measured for a batch of 1000 errors in-process & for 10 batches sent back from
+a `multiprocessing` pool.
+"""
+import multiprocessing
+import pickle
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    error_builder,
+    from_dict,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+BATCH = 1000
+N_BATCHES = 10
+
+
+class BenchPicklingCatalog(ErrorCatalog):
+    NotFound = error_builder()
+    Invalid = error_builder(params=("field", "value"))
+
+
+def make_errors(seed: int = 0) -> list:
+    return [
+        BenchPicklingCatalog.Invalid(field=f"field{i}", value=seed + i)
+        if i % 2
+        else BenchPicklingCatalog.NotFound(resource="User", id=seed + i)
+        for i in range(BATCH)
+    ]
+
+
+def make_dicts(seed: int) -> list:
+    return [e.to_dict() for e in make_errors(seed)]
+
+
+def run(number: int = 20) -> Results:
+    errors = make_errors()
+    pickled = pickle.dumps(errors)
+    dicts = pickle.dumps([e.to_dict() for e in errors])
+    results = {
+        "pickle_1000_s": time_per_op(lambda: pickle.loads(pickle.dumps(errors)), number),
+        "dicts_1000_s": time_per_op(
+            lambda: [
+                from_dict(d) for d in pickle.loads(pickle.dumps([e.to_dict() for e in errors]))
+            ],
+            number,
+        ),
+        "pickle_per_error_bytes": len(pickled) / BATCH,
+        "dicts_per_error_bytes": len(dicts) / BATCH,
+    }
+    if "fork" in multiprocessing.get_all_start_methods():
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            results["pool_pickle_s"] = time_per_op(
+                lambda: pool.map(make_errors, range(N_BATCHES)), number // 4, repeat=3
+            )
+            results["pool_dicts_s"] = time_per_op(
+                lambda: [
+                    from_dict(d) for batch in pool.map(make_dicts, range(N_BATCHES)) for d in batch
+                ],
+                number // 4,
+                repeat=3,
+            )
+    return results
+
+
+if __name__ == "__main__":
+    print_results(run())
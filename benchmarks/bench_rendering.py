@@ -0,0 +1,35 @@
+"""
+Rendering of errors: repeated `str`/`repr` of the same instance against the first one, and
+the cost of the cache on errors created & rendered once, ie. logged.
+"""
+from pca.packages.errors import (
+    error_builder,
+    error_code,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+MyError = error_builder("MyError")
+
+
+def run(number: int = 100_000) -> Results:
+    error = MyError("an_arg", field="name", value=42, values=[1, 2, 3])
+    return {
+        "construct_and_repr_once_s": time_per_op(
+            lambda: repr(MyError("an_arg", field="name", value=42, values=[1, 2, 3])), number
+        ),
+        "construction_s": time_per_op(
+            lambda: MyError("an_arg", field="name", value=42, values=[1, 2, 3]), number
+        ),
+        "repeated_repr_s": time_per_op(lambda: repr(error), number),
+        "error_code_s": time_per_op(lambda: error_code(error), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,51 @@
+"""
+Cost of a suppressed exception logged by the default hook of ErrorBoundary against
+RateLimitedSuppressionLog, once its burst is exhausted.
+"""
+import io
+import logging
+
+from pca.packages.errors import (
+    ErrorBoundary,
+    RateLimitedSuppressionLog,
+    error_builder,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+MyError = error_builder("MyError")
+
+
+def _suppress(boundary: ErrorBoundary) -> None:
+    with boundary:
+        raise MyError(field="name")
+
+
+def run(number: int = 20_000) -> Results:
+    logger = logging.getLogger("benchmarks.suppression_log")
+    logger.propagate = False
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    default_logger = logging.getLogger(ErrorBoundary.__module__)
+    default_logger.propagate = False
+    default_logger.addHandler(logging.StreamHandler(io.StringIO()))
+
+    default = ErrorBoundary(name="default")
+    silent = ErrorBoundary(name="silent", on_suppress_exception=lambda exc_info: None)
+    rate_limited = ErrorBoundary(
+        name="rate_limited",
+        on_suppress_exception=RateLimitedSuppressionLog(burst=1, window=3600, logger=logger),
+    )
+    return {
+        "no_logging_s": time_per_op(lambda: _suppress(silent), number),
+        "default_logging_s": time_per_op(lambda: _suppress(default), number),
+        "rate_limited_logging_s": time_per_op(lambda: _suppress(rate_limited), number),
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -0,0 +1,72 @@
+"""
+Serialization of errors: the binary `wire` codec against `to_dict` + `json`, for a single error
+and for a batch of errors (per error).
+"""
+import json
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorIds,
+    decode_many,
+    encode_many,
+    error_builder,
+    from_bytes,
+    from_dict,
+    iter_from_json_lines,
+    to_bytes,
+)
+
+from ._utils import (
+    Results,
+    print_results,
+    time_per_op,
+)
+
+
+class BenchWireCatalog(ErrorCatalog):
+    class Validation(ErrorCatalog):
+        InvalidField = error_builder()
+
+
+BATCH = 1000
+
+
+def run(number: int = 10_000) -> Results:
+    error_class = BenchWireCatalog.Validation.InvalidField
+    error = error_class(field="name", reason="too_long", max_length=64, value=None)
+    # IDs pinned by a lock of all the errors registered so far
+    ids = ErrorIds(pinned=ErrorIds().lock())
+    errors = [
+        error_class(field=f"field_{i % 10}", reason="too_long", max_length=i, value=None)
+        for i in range(BATCH)
+    ]
+    data = to_bytes(error)
+    payload = json.dumps(error.to_dict())
+    frame = encode_many(errors)
+    lines = [json.dumps(e.to_dict()) for e in errors]
+    batches = max(number // BATCH, 1)
+    return {
+        "json_encode_s": time_per_op(lambda: json.dumps(error.to_dict()), number),
+        "wire_encode_s": time_per_op(lambda: to_bytes(error), number),
+        "json_decode_s": time_per_op(lambda: from_dict(json.loads(payload)), number),
+        "wire_decode_s": time_per_op(lambda: from_bytes(data), number),
+        "json_batch_encode_s": time_per_op(
+            lambda: "\n".join(json.dumps(e.to_dict()) for e in errors), batches
+        )
+        / BATCH,
+        "wire_batch_encode_s": time_per_op(lambda: encode_many(errors), batches) / BATCH,
+        "json_batch_decode_s": time_per_op(lambda: list(iter_from_json_lines(lines)), batches)
+        / BATCH,
+        "wire_batch_decode_s": time_per_op(lambda: decode_many(frame), batches) / BATCH,
+        "json_bytes": len(payload),
+        "wire_bytes": len(data),
+        "json_batch_bytes": (sum(map(len, lines)) + BATCH) / BATCH,
+        "wire_batch_bytes": len(frame) / BATCH,
+        "json_ids_bytes": len(json.dumps(error.to_dict(ids))),
+        "wire_ids_bytes": len(to_bytes(error, ids)),
+        "wire_ids_batch_bytes": len(encode_many(errors, ids)) / BATCH,
+    }
+
+
+if __name__ == "__main__":
+    print_results(run())
@@ -1,7 +1,20 @@
 from .boundary import *  # noqa: F401, F403
 from .builder import *  # noqa: F401, F403
+from .bundle import *  # noqa: F401, F403
 from .catalog import *  # noqa: F401, F403
+from .collecting import *  # noqa: F401, F403
+from .fingerprint import *  # noqa: F401, F403
+from .ids import *  # noqa: F401, F403
+from .l10n import *  # noqa: F401, F403
+from .log import *  # noqa: F401, F403
+from .manifest import *  # noqa: F401, F403
+from .metrics import *  # noqa: F401, F403
+from .registry import *  # noqa: F401, F403
+from .rules import *  # noqa: F401, F403
+from .serialization import *  # noqa: F401, F403
+from .translator import *  # noqa: F401, F403
 from .types import *  # noqa: F401, F403
+from .wire import *  # noqa: F401, F403
 
 
 VERSION = (0, 2, 0)
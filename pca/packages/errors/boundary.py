@@ -1,20 +1,152 @@
+import collections
+import inspect
+import itertools
 import logging
 import typing as t
+import weakref
 
-from functools import wraps
+from contextvars import ContextVar
+from functools import (
+    partial,
+    wraps,
+)
+from time import perf_counter
 
+from .metrics import BoundaryMetrics
+from .rules import (
+    Action,
+    DecisionTable,
+    Rule,
+)
 from .types import (
     ExceptionInfo,
     ExceptionTypeOrTypes,
+    error_code,
+)
+
+
+if t.TYPE_CHECKING:
+    import concurrent.futures
+
+
+__all__ = (
+    "BoundaryHook",
+    "ErrorBoundary",
+    "ItemResult",
 )
 
+# shared by all the exits without an exception, so that they don't allocate
+_NO_EXCEPTION = ExceptionInfo(None, None, None)  # type: ignore
+
+
+class _Slot:
+    """
+    Stands for an exception handled by a boundary in the context variable of the boundary,
+    while the boundary itself keeps the information about the exception, keyed by the slot.
+    So the information, with the traceback & its frames, doesn't outlive the boundary, even
+    if the contexts holding the slot do.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+def _set_exc_info(boundary: "ErrorBoundary", value: t.Optional[ExceptionInfo]) -> None:
+    if value is None or value is _NO_EXCEPTION:
+        boundary._exc_info_var.set(value)
+        return
+    exc_infos = boundary._exc_infos
+    slot = _Slot()
+    key = id(slot)
+    # the entry is removed once no context refers to the slot anymore
+    exc_infos[key] = (value, weakref.ref(slot, partial(exc_infos.pop, key)))
+    boundary._exc_info_var.set(slot)
+
+
+def _mark_no_exception(boundary: "ErrorBoundary") -> None:
+    # the usual case of many successful exits in a row doesn't write anything
+    if boundary._exc_info_var.get() is not _NO_EXCEPTION:
+        boundary._exc_info_var.set(_NO_EXCEPTION)
+
+
+# the result of a hook that has raised an exception
+_FAILED = object()
+
+
+def _not_awaitable(hook_name: str, result: t.Any) -> t.Any:
+    # the usual results, None & booleans, are told apart without the check of the type
+    if result is not None and result is not True and result is not False:
+        if inspect.iscoroutine(result):
+            result.close()
+            raise TypeError(
+                f"{hook_name} is a coroutine function, so it can be used only when "
+                "the boundary is entered asynchronously."
+            )
+    return result
+
+
+async def _awaited(result: t.Any) -> t.Any:
+    return await result if inspect.isawaitable(result) else result
+
+
+# outcomes of the calls of a chunk of items: whether the call has succeeded & its result
+# or the exception it has raised
+ChunkOutcomes = t.List[t.Tuple[bool, t.Any]]
+
+
+class ItemResult(t.NamedTuple):
+    """The result of the call of a function on an item by `ErrorBoundary.map`."""
+
+    index: int
+    item: t.Any
+    value: t.Any = None
+    # the exception suppressed by the boundary, if the call has failed
+    error: t.Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _call(func: t.Callable, item: t.Any) -> t.Tuple[bool, t.Any]:
+    # a frame of its own, so that the traceback of the exception doesn't keep the outcomes
+    # of the whole chunk alive
+    try:
+        return True, func(item)
+    except Exception as e:
+        return False, e
 
-__all__ = ("ErrorBoundary",)
+
+def _run_chunk(func: t.Callable, items: t.Sequence[t.Any]) -> ChunkOutcomes:
+    """Calls the `func` on each of the `items`, possibly in a worker of a pool."""
+    return [_call(func, item) for item in items]
+
+
+class BoundaryHook:
+    """
+    Base class for hooks which have to know the boundary they are used by, ie. to be shared
+    by many boundaries. When passed to the `ErrorBoundary` constructor, the hook is bound to
+    the boundary and called with it as the first argument, followed by the usual arguments
+    of the hook.
+    """
+
+    def bind(self, boundary: "ErrorBoundary") -> t.Callable:
+        return partial(self, boundary)
+
+
+def _bind(hook: t.Callable, boundary: "ErrorBoundary") -> t.Callable:
+    return hook.bind(boundary) if isinstance(hook, BoundaryHook) else hook
 
 
 class ErrorBoundary:
+    """
+    Context manager & decorator guarding the code inside from exceptions: the ones it catches
+    are silenced or propagated, possibly transformed, according to its hooks.
 
-    exc_info: t.Optional[ExceptionInfo] = None
+    A single boundary instance may be used by many threads & asyncio tasks at the same time:
+    the information about the exception it has handled most recently is kept separately
+    for each of them. Its hooks, `metrics`, `catch` & `rules` may be changed any time, also
+    for the functions it has already decorated.
+    """
 
     def __init__(
         self,
@@ -28,6 +160,8 @@ class ErrorBoundary:
         on_no_exception: t.Callable[["ErrorBoundary"], None] = None,
         on_propagate_exception: t.Callable[["ErrorBoundary", ExceptionInfo], None] = None,
         on_suppress_exception: t.Callable[["ErrorBoundary", ExceptionInfo], None] = None,
+        metrics: t.Optional[BoundaryMetrics] = None,
+        rules: t.Sequence[Rule] = (),
     ) -> None:
         """
         :param name:
@@ -38,78 +172,471 @@ class ErrorBoundary:
         :param on_no_exception:
         :param on_propagate_exception:
         :param on_suppress_exception:
+        :param metrics: if given, outcomes of the boundary & latencies of the functions it
+            decorates are counted there.
+        :param rules: ordered rules deciding whether to propagate, suppress or transform
+            an exception; the first one matching the exception applies. Exceptions matched
+            by none of them are suppressed if they are instances of `catch`.
+
+        When the boundary is used as an async context manager or decorates a coroutine function
+        or an async generator function, hooks may be coroutine functions; they are awaited then.
         """
         self.name = str(id(self)) if name is None else name
+        # information about the last exit of the boundary in each context, ie. thread
+        # or asyncio task, see `_Slot`
+        self._exc_info_var: ContextVar[t.Any] = ContextVar(f"{__name__}.exc_info", default=None)
+        self._exc_infos: t.Dict[int, t.Tuple[ExceptionInfo, weakref.ref]] = {}
         # TODO py-compatibility: __future__.annotations & removing " from typing of the class
+        self._rules = tuple(rules)
         self.catch = catch
+        self.metrics = metrics
         # for all the callbacks, if defined, override appropriate methods instance-wide without
         # inheritance
         if log_inner_error:
-            self.log_inner_error = log_inner_error  # type: ignore
+            self.log_inner_error = _bind(log_inner_error, self)  # type: ignore
         if should_propagate_exception:
-            self.should_propagate_exception = should_propagate_exception  # type: ignore
+            self.should_propagate_exception = _bind(should_propagate_exception, self)  # type: ignore
         if transform_propagated_exception:
-            self.transform_propagated_exception = transform_propagated_exception  # type: ignore
+            self.transform_propagated_exception = _bind(transform_propagated_exception, self)  # type: ignore
         if on_no_exception:
-            self.on_no_exception = on_no_exception  # type: ignore
+            self.on_no_exception = _bind(on_no_exception, self)  # type: ignore
         if on_propagate_exception:
-            self.on_propagate_exception = on_propagate_exception  # type: ignore
+            self.on_propagate_exception = _bind(on_propagate_exception, self)  # type: ignore
         if on_suppress_exception:
-            self.on_suppress_exception = on_suppress_exception  # type: ignore
+            self.on_suppress_exception = _bind(on_suppress_exception, self)  # type: ignore
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        super().__setattr__(name, value)
+        if name == "on_no_exception":
+            self._update_silent_on_success()
+
+    def __delattr__(self, name: str) -> None:
+        super().__delattr__(name)
+        if name == "on_no_exception":
+            self._update_silent_on_success()
+
+    def _update_silent_on_success(self) -> None:
+        # when nothing has to be done on a successful exit, it takes a fast path which doesn't
+        # allocate; kept up to date when the `metrics` or the `on_no_exception` hook are set
+        metrics = getattr(self, "_metrics", None)
+        self._silent_on_success = metrics is None and not self._is_overridden("on_no_exception")
+
+    def _is_overridden(self, hook_name: str) -> bool:
+        return hook_name in self.__dict__ or getattr(type(self), hook_name) is not getattr(
+            ErrorBoundary, hook_name
+        )
+
+    def _overrides(self, *method_names: str) -> bool:
+        # the fast paths of decorated functions skip entering & exiting the boundary
+        # on success, so they can't be taken when a subclass customizes them
+        return any(getattr(type(self), n) is not getattr(ErrorBoundary, n) for n in method_names)
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(name={repr(self.name)})"
 
+    @property
+    def catch(self) -> ExceptionTypeOrTypes:
+        return self._catch
+
+    @catch.setter
+    def catch(self, value: ExceptionTypeOrTypes) -> None:
+        self._catch = value
+        self._update_decisions()
+
+    @property
+    def rules(self) -> t.Tuple[Rule, ...]:
+        return self._rules
+
+    @rules.setter
+    def rules(self, value: t.Sequence[Rule]) -> None:
+        self._rules = tuple(value)
+        self._update_decisions()
+
+    def _update_decisions(self) -> None:
+        catch_rules = (Rule(self._catch, Action.SUPPRESS),) if self._catch else ()
+        self._decisions = DecisionTable(self._rules + catch_rules)
+
+    @property
+    def metrics(self) -> t.Optional[BoundaryMetrics]:
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, value: t.Optional[BoundaryMetrics]) -> None:
+        self._metrics = value
+        self._update_silent_on_success()
+
+    @property
+    def exc_info(self) -> t.Optional[ExceptionInfo]:
+        """
+        Information about the last exit of the boundary in the current context, ie. the current
+        thread or asyncio task.
+        """
+        value = self._exc_info_var.get()
+        if value is None or value is _NO_EXCEPTION:
+            return value
+        return self._exc_infos[id(value)][0]
+
+    @exc_info.setter
+    def exc_info(self, value: t.Optional[ExceptionInfo]) -> None:
+        _set_exc_info(self, value)
+
     def __call__(self, func: t.Callable) -> t.Callable:
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def async_generator_inner(*args, **kwargs):
+                await self.__aenter__()
+                generator = func(*args, **kwargs)
+                # there's no `yield from` for async generators: values sent & exceptions
+                # thrown in are forwarded to the generator the way `yield from` does it
+                try:
+                    item = await generator.__anext__()
+                    while True:
+                        try:
+                            sent = yield item
+                        except GeneratorExit:
+                            # closed by the consumer before the end, ie. by breaking the loop;
+                            # that's not an exception to handle
+                            await generator.aclose()
+                            raise
+                        except BaseException as e:
+                            item = await generator.athrow(e)
+                        else:
+                            item = await generator.asend(sent)
+                except StopAsyncIteration:
+                    pass
+                except GeneratorExit:
+                    raise
+                except BaseException as e:
+                    if await self.__aexit__(type(e), e, e.__traceback__):
+                        return
+                    raise
+                await self.__aexit__(None, None, None)
+
+            return async_generator_inner
+
+        # the fast paths don't enter nor exit the boundary on success, as long as nothing has
+        # to be done then; that's checked on each call, as hooks & metrics may be set any time
+        if inspect.iscoroutinefunction(func):
+            if self._overrides("__aenter__", "__aexit__"):
+
+                @wraps(func)
+                async def coroutine_inner(*args, **kwargs):
+                    return await self._guarded_coroutine_call(func, args, kwargs)
+
+                return coroutine_inner
+
+            @wraps(func)
+            async def fast_coroutine_inner(*args, **kwargs):
+                if not self._silent_on_success:
+                    return await self._guarded_coroutine_call(func, args, kwargs)
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:
+                    if await self.__aexit__(type(e), e, e.__traceback__):
+                        return None
+                    raise
+                _mark_no_exception(self)
+                return result
+
+            return fast_coroutine_inner
+
+        if inspect.isgeneratorfunction(func):
+
+            @wraps(func)
+            def generator_inner(*args, **kwargs):
+                self.__enter__()
+                try:
+                    result = yield from func(*args, **kwargs)
+                except GeneratorExit:
+                    # closed by the consumer before the end, see `async_generator_inner`
+                    raise
+                except BaseException as e:
+                    if self.__exit__(type(e), e, e.__traceback__):
+                        return None
+                    raise
+                self.__exit__(None, None, None)
+                return result
+
+            return generator_inner
+
+        if self._overrides("__enter__", "__exit__"):
+
+            @wraps(func)
+            def inner(*args, **kwargs):
+                return self._guarded_call(func, args, kwargs)
+
+            return inner
+
         @wraps(func)
-        def inner(*args, **kwargs):
+        def fast_inner(*args, **kwargs):
+            if not self._silent_on_success:
+                return self._guarded_call(func, args, kwargs)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                if self.__exit__(type(e), e, e.__traceback__):
+                    return None
+                raise
+            _mark_no_exception(self)
+            return result
+
+        return fast_inner
+
+    def _guarded_call(self, func: t.Callable, args: tuple, kwargs: t.Dict[str, t.Any]) -> t.Any:
+        metrics = self.metrics
+        if metrics is None:
             with self:
                 return func(*args, **kwargs)
+        start = perf_counter()
+        try:
+            with self:
+                return func(*args, **kwargs)
+        finally:
+            metrics.observe_latency(self.name, perf_counter() - start)
+
+    async def _guarded_coroutine_call(
+        self, func: t.Callable, args: tuple, kwargs: t.Dict[str, t.Any]
+    ) -> t.Any:
+        metrics = self.metrics
+        if metrics is None:
+            async with self:
+                return await func(*args, **kwargs)
+        start = perf_counter()
+        try:
+            async with self:
+                return await func(*args, **kwargs)
+        finally:
+            metrics.observe_latency(self.name, perf_counter() - start)
+
+    def map(
+        self,
+        func: t.Callable[[t.Any], t.Any],
+        iterable: t.Iterable[t.Any],
+        executor: t.Optional["concurrent.futures.Executor"] = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+        max_in_flight: int = 64,
+    ) -> t.Iterator[ItemResult]:
+        """
+        Calls the `func` on each item of the `iterable`, in the `executor` if given, and yields
+        an `ItemResult` for each item, guarded by the boundary:
+
+        >>> for result in boundary.map(process, rows, executor=pool, chunksize=100):
+        ...     if not result.ok:
+        ...         report(result.index, result.error)
+
+        Exceptions raised by the calls are handled by the boundary in the calling thread, one
+        item at a time, as if the call was made within it: its hooks & metrics see each item.
+        A suppressed exception comes back as the `error` of the result of its item; a propagated
+        one, possibly transformed, is raised by the iterator, which stops then & cancels the
+        work not started yet. For a `ProcessPoolExecutor`, the `func`, the items, their
+        results & exceptions have to be picklable; tracebacks of exceptions raised in worker
+        processes don't reach the boundary.
+
+        Items are sent to the executor in chunks of `chunksize` items. At most `max_in_flight`
+        chunks are submitted & not yet yielded at any time, so the `iterable` is consumed as
+        the results are, in constant memory. Results are yielded in order of the items, or,
+        if not `ordered`, in order of completion of their chunks. Both `chunksize`
+        & `max_in_flight` have to be at least 1, otherwise ValueError is raised right away.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1.")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1.")
+        return self._map(func, iterable, executor, chunksize, ordered, max_in_flight)
+
+    def _map(
+        self,
+        func: t.Callable[[t.Any], t.Any],
+        iterable: t.Iterable[t.Any],
+        executor: t.Optional["concurrent.futures.Executor"],
+        chunksize: int,
+        ordered: bool,
+        max_in_flight: int,
+    ) -> t.Iterator[ItemResult]:
+        items = iter(iterable)
+        chunks = iter(lambda: list(itertools.islice(items, chunksize)), [])
+        if executor is None:
+            index = 0
+            for chunk in chunks:
+                yield from self._item_results(index, chunk, _run_chunk(func, chunk))
+                index += len(chunk)
+            return
 
-        return inner
+        # imported here, as it takes a while & only `map` with an executor needs it
+        import concurrent.futures
+
+        # submitted chunks: index of their first item, the items & the future of their outcomes
+        in_flight: t.Deque[t.Tuple[int, t.List[t.Any], concurrent.futures.Future]]
+        in_flight = collections.deque()
+        next_index = 0
+
+        def submit() -> bool:
+            nonlocal next_index
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            in_flight.append((next_index, chunk, executor.submit(_run_chunk, func, chunk)))
+            next_index += len(chunk)
+            return True
+
+        try:
+            while len(in_flight) < max_in_flight and submit():
+                pass
+            while in_flight:
+                if ordered:
+                    index, chunk, future = in_flight.popleft()
+                else:
+                    done = concurrent.futures.wait(
+                        [f for _, _, f in in_flight],
+                        return_when=concurrent.futures.FIRST_COMPLETED,
+                    ).done
+                    entry = next(e for e in in_flight if e[2] in done)
+                    in_flight.remove(entry)
+                    index, chunk, future = entry
+                try:
+                    outcomes = future.result()
+                except Exception as e:
+                    # the chunk as a whole has failed, ie. it couldn't be pickled
+                    outcomes = [(False, e)] * len(chunk)
+                submit()
+                yield from self._item_results(index, chunk, outcomes)
+        finally:
+            for _, _, future in in_flight:
+                future.cancel()
+
+    def _item_results(
+        self, index: int, chunk: t.List[t.Any], outcomes: ChunkOutcomes
+    ) -> t.Iterator[ItemResult]:
+        for item, (ok, value) in zip(chunk, outcomes):
+            if ok:
+                self.__exit__(None, None, None)
+                yield ItemResult(index, item, value)
+            else:
+                # raised here, so the hooks see it as the exception being handled
+                try:
+                    raise value
+                except Exception as e:
+                    if not self.__exit__(type(e), e, e.__traceback__):
+                        raise
+                yield ItemResult(index, item, error=value)
+            index += 1
 
     def __enter__(self):
         """Return `self` upon entering the runtime context."""
         return self
 
-    def __exit__(self, *exc_info) -> bool:
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
         """Raise any exception triggered within the runtime context."""
-        exc_info = self.exc_info = ExceptionInfo(*exc_info)
-        if exc_info.type is None:
+        if exc_type is None:
+            _mark_no_exception(self)
+            if self._silent_on_success:
+                return False
             try:
-                self.on_no_exception()
+                _not_awaitable("on_no_exception", self.on_no_exception())
             except Exception as e:
-                self.log_inner_error("on_no_exception", exc_info.value, e)
+                self.log_inner_error("on_no_exception", None, e)
+            self._record("passed", _NO_EXCEPTION)
             return False
 
+        exc_info = ExceptionInfo(exc_type, exc_value, traceback)
+        _set_exc_info(self, exc_info)
         try:
-            should_propagate = self.should_propagate_exception(exc_info)
+            should_propagate = _not_awaitable(
+                "should_propagate_exception", self.should_propagate_exception(exc_info)
+            )
         except Exception as e:
             should_propagate = True
-            self.log_inner_error("should_propagate_exception", exc_info.value, e)
+            self.log_inner_error("should_propagate_exception", exc_value, e)
         if bool(should_propagate):
             try:
-                self.on_propagate_exception(exc_info)
+                _not_awaitable("on_propagate_exception", self.on_propagate_exception(exc_info))
             except Exception as e:
-                self.log_inner_error("on_propagate_exception", exc_info.value, e)
+                self.log_inner_error("on_propagate_exception", exc_value, e)
             try:
-                transformed_exception = self.transform_propagated_exception(exc_info)
+                transformed_exception = _not_awaitable(
+                    "transform_propagated_exception",
+                    self.transform_propagated_exception(exc_info),
+                )
             except Exception as e:
-                transformed_exception = None
-                self.log_inner_error("transform_propagated_exception", exc_info.value, e)
-                # reraise original exception, because now the traceback module remembers
-                # the last occurence (the error from callback), not the original error
-                raise exc_info.value
-            if transformed_exception:
-                raise transformed_exception from exc_info.value
+                transformed_exception = _FAILED
+                self.log_inner_error("transform_propagated_exception", exc_value, e)
+            return self._propagate(exc_info, transformed_exception)
+
+        try:
+            _not_awaitable("on_suppress_exception", self.on_suppress_exception(exc_info))
+        except Exception as e:
+            self.log_inner_error("on_suppress_exception", exc_value, e)
+        self._record("suppressed", exc_info)
+        return True
+
+    async def __aenter__(self):
+        """Return `self` upon entering the asynchronous runtime context."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool:
+        """
+        Raise any exception triggered within the asynchronous runtime context.
+        Hooks returning awaitables are awaited.
+        """
+        if exc_type is None:
+            _mark_no_exception(self)
+            if self._silent_on_success:
+                return False
+            try:
+                await _awaited(self.on_no_exception())
+            except Exception as e:
+                self.log_inner_error("on_no_exception", None, e)
+            self._record("passed", _NO_EXCEPTION)
             return False
 
+        exc_info = ExceptionInfo(exc_type, exc_value, traceback)
+        _set_exc_info(self, exc_info)
         try:
-            self.on_suppress_exception(exc_info)
+            should_propagate = await _awaited(self.should_propagate_exception(exc_info))
         except Exception as e:
-            self.log_inner_error("on_suppress_exception", exc_info.value, e)
+            should_propagate = True
+            self.log_inner_error("should_propagate_exception", exc_value, e)
+        if bool(should_propagate):
+            try:
+                await _awaited(self.on_propagate_exception(exc_info))
+            except Exception as e:
+                self.log_inner_error("on_propagate_exception", exc_value, e)
+            try:
+                transformed_exception = await _awaited(
+                    self.transform_propagated_exception(exc_info)
+                )
+            except Exception as e:
+                transformed_exception = _FAILED
+                self.log_inner_error("transform_propagated_exception", exc_value, e)
+            return self._propagate(exc_info, transformed_exception)
+
+        try:
+            await _awaited(self.on_suppress_exception(exc_info))
+        except Exception as e:
+            self.log_inner_error("on_suppress_exception", exc_value, e)
+        self._record("suppressed", exc_info)
         return True
 
+    def _propagate(self, exc_info: ExceptionInfo, transformed_exception: t.Any) -> bool:
+        if transformed_exception is _FAILED:
+            self._record("propagated", exc_info)
+            # reraise original exception, because now the traceback module remembers
+            # the last occurence (the error from callback), not the original error
+            raise exc_info.value
+        if transformed_exception:
+            self._record("transformed", exc_info)
+            raise transformed_exception from exc_info.value
+        self._record("propagated", exc_info)
+        return False
+
+    def _record(self, outcome: str, exc_info: ExceptionInfo) -> None:
+        metrics = self.metrics
+        if metrics is not None:
+            code = error_code(exc_info.value) if exc_info.value is not None else None
+            metrics.record(self.name, outcome, code)
+
     def log_inner_error(
         self, where: str, main_error: t.Optional[BaseException], callback_error: Exception
     ) -> None:
@@ -145,9 +672,9 @@ class ErrorBoundary:
         States whether the exception catched by the boundary should be propagated (aka reraised)
         or silenced.
 
-        Silences all catched errors by default.
+        By default, follows the `rules` of the boundary and silences all catched errors.
         """
-        return not self.catch or not isinstance(exc_info.value, self.catch)
+        return self._decisions.lookup(exc_info.type).action is not Action.SUPPRESS
 
     def transform_propagated_exception(self, exc_info: ExceptionInfo) -> t.Optional[Exception]:
         """
@@ -159,9 +686,10 @@ class ErrorBoundary:
         context managers: https://docs.python.org/3/reference/datamodel.html#object.__exit__
         To have another exception raised, you have to raise it by yourself inside this function.
 
-        It does not transform the exception by default.
+        By default, it transforms the exception only if a rule of the boundary says so.
         """
-        return None
+        rule = self._decisions.lookup(exc_info.type)
+        return rule.transform(exc_info) if rule.transform else None
 
     def on_propagate_exception(self, exc_info: ExceptionInfo) -> None:
         """
@@ -1,6 +1,16 @@
+import copyreg
+import importlib
+import keyword
+import operator
+import pickle
+import sys
+import threading
 import typing as t
 
+from pca.packages.errors.fingerprint import fingerprint
+from pca.packages.errors.registry import error_registry
 from pca.packages.errors.types import (
+    ErrorCatalogType,
     ExceptionTypeOrTypes,
     ExceptionWithCode,
     ExceptionWithCodeType,
@@ -8,11 +18,20 @@ from pca.packages.errors.types import (
 )
 
 
+if t.TYPE_CHECKING:
+    from pca.packages.errors.ids import ErrorIds
+
+
 __all__ = (
     "error_builder",
     "ErrorMeta",
+    "LazyError",
 )
 
+_UNSET = object()
+# names that can't be used as params of compact errors as they are taken by the error itself
+_RESERVED_NAMES = frozenset(("args", "catalog", "cls", "code", "hint", "kwargs"))
+
 
 def _get_cls(error: ExceptionWithCode) -> t.Type[ExceptionWithCodeType]:
     return error.__class__
@@ -23,6 +42,37 @@ def _init(error: ExceptionWithCode, *args, **kwargs) -> None:
     error.kwargs = kwargs
 
 
+def _compile_compact_methods(params: t.Sequence[str]) -> t.Dict[str, t.Any]:
+    """
+    Generates `__init__` & `kwargs` getter specialized for the declared params, the same way
+    `collections.namedtuple` does, so that no loop over params is run for each instance.
+    """
+    for name in params:
+        if (
+            not name.isidentifier()
+            or keyword.iskeyword(name)
+            or name.startswith("_")
+            or name in _RESERVED_NAMES
+        ):
+            raise ValueError(f"{name!r} can't be used as a name of a param.")
+    signature = "".join(f", {name}=_UNSET" for name in params)
+    init_body = "".join(
+        f"    if {name} is not _UNSET:\n        _error.{name} = {name}\n" for name in params
+    )
+    kwargs_body = "".join(
+        f"    _value = getattr(_error, {name!r}, _UNSET)\n"
+        f"    if _value is not _UNSET:\n        _kwargs[{name!r}] = _value\n"
+        for name in params
+    )
+    source = (
+        f"def __init__(_error, *_args{signature}):\n    _error.args = _args\n{init_body}"
+        f"def kwargs(_error):\n    _kwargs = {{}}\n{kwargs_body}    return _kwargs\n"
+    )
+    namespace: t.Dict[str, t.Any] = {"_UNSET": _UNSET}
+    exec(source, namespace)
+    return {"__init__": namespace["__init__"], "kwargs": property(namespace["kwargs"])}
+
+
 def _getattr(error: ExceptionWithCode, name: str) -> t.Any:
     try:
         return error.kwargs[name]
@@ -39,10 +89,36 @@ def _repr(error: ExceptionWithCode) -> str:
     return f"{error.code}({repr_str})"
 
 
-def _to_dict(error: ExceptionWithCode) -> t.Dict[str, t.Any]:
+def _cached_repr(error: ExceptionWithCode) -> str:
+    """
+    Renders the error lazily, at most once per instance, unless its `args` or `kwargs` change
+    in the meantime.
+    """
+    state = error.__dict__
+    args = error.args
+    kwargs = error.kwargs
+    cached = state.get("_rendered")
+    # the keys & values the error was rendered with are kept, so mutations of the `kwargs`
+    # are told apart by identity without making it a dict subclass, which is slow to create
+    if (
+        cached is not None
+        and cached[0] is args
+        and cached[1] is kwargs
+        and cached[2] == tuple(kwargs)
+        and all(map(operator.is_, cached[3], kwargs.values()))
+    ):
+        return cached[4]
+    rendered = _repr(error)
+    state["_rendered"] = (args, kwargs, tuple(kwargs), tuple(kwargs.values()), rendered)
+    return rendered
+
+
+def _to_dict(error: ExceptionWithCode, ids: t.Optional["ErrorIds"] = None) -> t.Dict[str, t.Any]:
+    if ids is not None:
+        return {"id": ids.id_of(error), "kwargs": error.kwargs}
     return {
         "code": error.code,
-        "catalog": str(error.catalog) if error.catalog else None,
+        "catalog": error.catalog.__qualname__ if error.catalog else None,
         "kwargs": error.kwargs,
     }
 
@@ -56,12 +132,50 @@ def _is_conforming(error: ExceptionWithCode, error_class: t.Type[Exception]) ->
     return isinstance(error, error_class)
 
 
+def _reduce(error: ExceptionWithCode) -> t.Tuple[t.Any, ...]:
+    # the class is pickled once per pickle, see `_reduce_error_class`
+    return _rebuild, (error.__class__, error.args, error.kwargs)
+
+
+def _rebuild(
+    error_class: ExceptionWithCodeType, args: tuple, kwargs: t.Dict[str, t.Any]
+) -> ExceptionWithCode:
+    return error_class(*args, **kwargs)
+
+
+def _reduce_error_class(error_class: ExceptionWithCodeType) -> t.Tuple[t.Any, ...]:
+    """
+    Pickles an error class as the module & the path of its catalog and its code, as the class
+    can't be found by its name. When unpickled, the class is looked up in the registry among
+    the errors of the catalogs of the module, so it's the same class in the process that
+    unpickles it, as long as it defines the same catalogs.
+    """
+    catalog = error_class.catalog
+    if catalog is None:
+        raise pickle.PicklingError(f"Can't pickle {error_class!r}: it isn't in a catalog")
+    return _error_class_of, (catalog.__module__, catalog.__qualname__, error_class.code)
+
+
+def _error_class_of(module: str, catalog_path: str, code: str) -> ExceptionWithCodeType:
+    if module not in sys.modules:
+        importlib.import_module(module)
+    return error_registry.in_module(module, f"{catalog_path}.{code}")
+
+
 def error_builder(
     name: str = "",
     base: ExceptionTypeOrTypes = Exception,
     hint: str = "",
+    params: t.Optional[t.Sequence[str]] = None,
+    lazy: bool = False,
 ) -> ExceptionWithCodeType:
-    return ErrorMeta(name=name, base=base, hint=hint)  # type: ignore
+    """
+    Builds an error class, see `ErrorMeta`. With `lazy`, returns a `LazyError` placeholder
+    instead, to build the class when it's used for the first time.
+    """
+    if lazy:
+        return LazyError(name, base, hint, params)  # type: ignore
+    return ErrorMeta(name=name, base=base, hint=hint, params=params)  # type: ignore
 
 
 class ErrorMeta(type):
@@ -78,6 +192,17 @@ class ErrorMeta(type):
       equality
     * error can have a `hint`, only for the purpose of giving developer a hint, what this
       error class is made for.
+
+    If names of the `params` are declared, the error class is compact: its instances keep
+    the params in slots instead of the `kwargs` dict, which saves memory when lots of instances
+    are kept alive. Params are then available as plain attributes and `kwargs` is computed
+    on demand. Params can be passed only as keyword arguments; passing an undeclared one
+    raises TypeError.
+
+    Error classes attached to catalogs & their instances can be pickled, ie. to be sent
+    between processes: a class is pickled by the path of its catalog & its code and rebuilt
+    from the registry, so `conforms` & `except` clauses work for an error sent back from
+    a worker process. Instances carry their `args` & `kwargs`.
     """
 
     def __new__(
@@ -85,6 +210,7 @@ class ErrorMeta(type):
         name: str = "",
         base: ExceptionTypeOrTypes = ExceptionWithCode,
         hint: str = "",
+        params: t.Optional[t.Sequence[str]] = None,
     ) -> ExceptionWithCodeType:
         if is_error_class(base):
             base = (base,)  # type: ignore
@@ -96,12 +222,23 @@ class ErrorMeta(type):
             "kwargs": None,
             "__init__": _init,
             "__getattr__": _getattr,
-            "__str__": _repr,
-            "__repr__": _repr,
+            "__str__": _cached_repr,
+            "__repr__": _cached_repr,
             "to_dict": _to_dict,
             "clone": _clone,
             "is_conforming": _is_conforming,
+            "fingerprint": fingerprint,
+            "__reduce__": _reduce,
         }
+        if params is not None:
+            del namespace["__getattr__"]
+            # compact errors don't cache their rendered form as it would take their `__dict__`
+            namespace.update(
+                _compile_compact_methods(params),
+                __slots__=tuple(params),
+                __str__=_repr,
+                __repr__=_repr,
+            )
         return super().__new__(cls, name, base, namespace)  # type: ignore
 
     def __init__(self, *args, **kwargs):
@@ -118,9 +255,7 @@ class ErrorMeta(type):
         Setting an instance on an ErrorCatalog subclass as a filed closely bounds both
         and can set value to its name.
         """
-        from .catalog import ErrorCatalog
-
-        if not issubclass(owner, ErrorCatalog):
+        if not isinstance(owner, ErrorCatalogType):
             return
         self.catalog = owner
         name = self.code or name
@@ -128,3 +263,95 @@ class ErrorMeta(type):
 
     def conforms(self, error: Exception) -> bool:
         return isinstance(error, self)
+
+
+class LazyError:
+    """
+    Placeholder of an error class in a catalog, which builds the class only when it's used
+    for the first time. It saves the time & memory of building classes of errors that are never
+    raised in the process, ie. for catalogs with thousands of errors:
+
+    >>> class HugeCatalog(ErrorCatalog):
+    ...     NotFound = error_builder(hint="Not found.", lazy=True)
+
+    The `code`, `hint` & `catalog` of the error are available without building it, so are
+    iteration over the catalog & lookups in the registry. The class is built & replaces
+    the placeholder in its catalog on the first access as the catalog's attribute, ie.
+    `HugeCatalog.NotFound`, on a call or `isinstance` check with the placeholder & on getting
+    any other attribute of the placeholder. Lookups in the registry & `ErrorCatalog.all` build
+    the classes they return.
+    """
+
+    __slots__ = (
+        "code",
+        "hint",
+        "catalog",
+        "materialized",
+        "_base",
+        "_params",
+        "_name",
+        "__weakref__",
+    )
+
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str = "",
+        base: ExceptionTypeOrTypes = Exception,
+        hint: str = "",
+        params: t.Optional[t.Sequence[str]] = None,
+    ) -> None:
+        self.code = name
+        self.hint = hint
+        self.catalog: t.Any = None
+        # the built error class, None until the placeholder is used
+        self.materialized: t.Optional[ExceptionWithCodeType] = None
+        self._base = base
+        self._params = params
+        self._name = ""
+
+    def __set_name__(self, owner: t.Any, name: str) -> None:
+        if not isinstance(owner, ErrorCatalogType):
+            return
+        self.catalog = owner
+        self.code = self.code or name
+        self._name = name
+
+    def materialize(self) -> ExceptionWithCodeType:
+        """Returns the error class, building it & putting it into the catalog if needed."""
+        error_class = self.materialized
+        if error_class is not None:
+            return error_class
+        with self._lock:
+            if self.materialized is None:
+                error_class = ErrorMeta(self.code, self._base, self.hint, self._params)
+                self.materialized = error_class
+                catalog = self.catalog
+                if catalog is not None:
+                    catalog._replace_lazy(self._name or self.code, error_class)  # type: ignore
+        return self.materialized  # type: ignore
+
+    def __get__(self, instance: t.Any, owner: t.Any) -> ExceptionWithCodeType:
+        return self.materialize()
+
+    def __call__(self, *args, **kwargs) -> ExceptionWithCode:
+        return self.materialize()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self.materialize(), name)
+
+    def __instancecheck__(self, instance: t.Any) -> bool:
+        return isinstance(instance, self.materialize())
+
+    def __subclasscheck__(self, subclass: t.Any) -> bool:
+        return issubclass(subclass, self.materialize())
+
+    def __repr__(self) -> str:
+        catalog_str = f"{str(self.catalog)}." if self.catalog else ""
+        return f"{catalog_str}{self.code}"
+
+    __str__ = __repr__
+
+
+copyreg.pickle(ErrorMeta, _reduce_error_class)
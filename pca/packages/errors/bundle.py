@@ -0,0 +1,232 @@
+import mmap
+import struct
+import typing as t
+import zlib
+
+from collections.abc import Mapping
+
+from .catalog import ErrorCatalogMeta
+from .l10n import MessageTemplate
+
+
+__all__ = (
+    "BundleLocale",
+    "MessageBundle",
+    "build_bundle",
+)
+
+# Layout of a bundle, all numbers little-endian:
+#
+#   header:     magic "PB", version (B), padding, number of locales (I)
+#   locales:    for each locale: offset & length of its name, offset of its table, number
+#               of slots & number of templates of the table (5 x I)
+#   tables:     a hash table of the templates of each locale, with linear probing; a slot is
+#               the CRC32 of the key, offset & length of the key, offset & length of the template
+#               (5 x I); a slot with a key of zero length is empty
+#   strings:    UTF-8 bytes of all the names, keys & templates, each stored once
+#
+# Keys are dotted paths of the errors, ie. "Catalog.Nested.NotFound". All offsets are from
+# the beginning of the file.
+MAGIC = b"PB"
+VERSION = 1
+
+_HEADER = struct.Struct("<2sBxI")
+_LOCALE = struct.Struct("<IIIII")
+_SLOT = struct.Struct("<IIIII")
+_EMPTY_SLOT = _SLOT.pack(0, 0, 0, 0, 0)
+
+
+def _slots_for(n_templates: int) -> int:
+    # a power of two, at least twice the number of templates, so that probing stays short
+    n_slots = 1
+    while n_slots < 2 * n_templates:
+        n_slots *= 2
+    return n_slots
+
+
+def build_bundle(
+    fp: t.BinaryIO,
+    catalogs: t.Iterable[ErrorCatalogMeta],
+    sources: t.Mapping[str, t.Mapping[str, str]],
+) -> None:
+    """
+    Writes a bundle of the templates of all the errors of the `catalogs` into the binary file
+    object `fp`. The `sources` give the templates of each locale by the dotted paths of
+    the errors or their bare codes, as `MessageRenderer` takes them; sources of the other
+    errors are skipped. Templates are validated, so an invalid one raises ValueError.
+    """
+    paths = {}
+    for catalog in catalogs:
+        # lazy errors aren't built, see `LazyError`
+        for error_class in catalog:
+            paths[f"{error_class.catalog.__qualname__}.{error_class.code}"] = error_class.code
+    strings: t.Dict[bytes, int] = {}
+    blob = bytearray()
+
+    def string(text: str) -> t.Tuple[bytes, int]:
+        raw = text.encode()
+        offset = strings.get(raw)
+        if offset is None:
+            offset = strings[raw] = len(blob)
+            blob.extend(raw)
+        return raw, offset
+
+    locales = []
+    for locale, templates in sources.items():
+        entries = []
+        for path, code in paths.items():
+            text = templates.get(path)
+            if text is None:
+                text = templates.get(code)
+            if text is not None:
+                MessageTemplate(text)
+                entries.append((string(path), string(text)))
+        locales.append((string(locale), entries))
+
+    # offsets of the strings are relative to the blob until the size of the tables is known
+    blob_offset = _HEADER.size + _LOCALE.size * len(locales)
+    blob_offset += sum(_SLOT.size * _slots_for(len(entries)) for _, entries in locales)
+    directory = [_HEADER.pack(MAGIC, VERSION, len(locales))]
+    tables = []
+    table_offset = _HEADER.size + _LOCALE.size * len(locales)
+    for (name, name_offset), entries in locales:
+        n_slots = _slots_for(len(entries))
+        directory.append(
+            _LOCALE.pack(blob_offset + name_offset, len(name), table_offset, n_slots, len(entries))
+        )
+        slots = [_EMPTY_SLOT] * n_slots
+        mask = n_slots - 1
+        for (key, key_offset), (text, text_offset) in entries:
+            key_hash = zlib.crc32(key)
+            i = key_hash & mask
+            while slots[i] is not _EMPTY_SLOT:
+                i = (i + 1) & mask
+            slots[i] = _SLOT.pack(
+                key_hash, blob_offset + key_offset, len(key), blob_offset + text_offset, len(text)
+            )
+        tables.extend(slots)
+        table_offset += _SLOT.size * n_slots
+    fp.write(b"".join(directory))
+    fp.write(b"".join(tables))
+    fp.write(blob)
+
+
+def _read_directory(buffer: mmap.mmap, path: str) -> t.Dict[str, int]:
+    try:
+        magic, version, n_locales = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a bundle of messages (version {VERSION}): {path!r}")
+        directory = {}
+        for i in range(n_locales):
+            offset = _HEADER.size + i * _LOCALE.size
+            name_offset, name_length = _LOCALE.unpack_from(buffer, offset)[:2]
+            directory[buffer[name_offset : name_offset + name_length].decode()] = offset
+    except struct.error as e:
+        raise ValueError(f"Truncated or corrupted bundle: {path!r}") from e
+    return directory
+
+
+class BundleLocale(Mapping):
+    """
+    Templates of a locale of a `MessageBundle`, by the dotted paths of the errors. Each lookup
+    is a probe of the hash table in the mapped file; nothing is read into memory beforehand.
+    """
+
+    def __init__(self, buffer: mmap.mmap, table_offset: int, n_slots: int, size: int) -> None:
+        self._buffer = buffer
+        self._table_offset = table_offset
+        self._mask = n_slots - 1
+        self._size = size
+
+    def get(self, key: str, default: t.Optional[str] = None) -> t.Optional[str]:  # type: ignore
+        buffer = self._buffer
+        raw = key.encode()
+        key_hash = zlib.crc32(raw)
+        i = key_hash & self._mask
+        while True:
+            slot_hash, key_offset, key_length, text_offset, text_length = _SLOT.unpack_from(
+                buffer, self._table_offset + i * _SLOT.size
+            )
+            if not key_length:
+                return default
+            if slot_hash == key_hash and buffer[key_offset : key_offset + key_length] == raw:
+                return buffer[text_offset : text_offset + text_length].decode()
+            i = (i + 1) & self._mask
+
+    def __getitem__(self, key: str) -> str:
+        text = self.get(key)
+        if text is None:
+            raise KeyError(key)
+        return text
+
+    def __iter__(self) -> t.Iterator[str]:
+        buffer = self._buffer
+        for i in range(self._mask + 1):
+            _, key_offset, key_length, _, _ = _SLOT.unpack_from(
+                buffer, self._table_offset + i * _SLOT.size
+            )
+            if key_length:
+                yield buffer[key_offset : key_offset + key_length].decode()
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class MessageBundle:
+    """
+    Templates of messages of many locales, read from a bundle file made by `build_bundle`:
+
+    >>> with open("messages.bundle", "wb") as f:
+    ...     build_bundle(f, [Catalog], {"en": {"NotFound": "{resource} not found."}})
+    >>> renderer = MessageRenderer(bundle=MessageBundle("messages.bundle"))
+
+    The file is memory-mapped read-only, so the pages of the bundle are loaded by the OS on
+    demand & shared by all the processes using it, ie. forked workers. Only the list of
+    locales is read on opening; the table of a locale is located on its first use & each
+    template is looked up in the table without reading the rest of the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # offsets of the entries of the locales, by their names
+            self._directory = _read_directory(self._buffer, path)
+        except ValueError:
+            self._buffer.close()
+            raise
+        self._locales: t.Dict[str, BundleLocale] = {}
+
+    @property
+    def locales(self) -> t.Tuple[str, ...]:
+        return tuple(self._directory)
+
+    def get(self, locale: str) -> t.Optional[BundleLocale]:
+        """Returns the templates of the `locale` or None if the bundle hasn't got the locale."""
+        templates = self._locales.get(locale)
+        if templates is None:
+            offset = self._directory.get(locale)
+            if offset is None:
+                return None
+            _, _, table_offset, n_slots, size = _LOCALE.unpack_from(self._buffer, offset)
+            templates = self._locales[locale] = BundleLocale(
+                self._buffer, table_offset, n_slots, size
+            )
+        return templates
+
+    def __getitem__(self, locale: str) -> BundleLocale:
+        templates = self.get(locale)
+        if templates is None:
+            raise KeyError(locale)
+        return templates
+
+    def close(self) -> None:
+        self._locales.clear()
+        self._buffer.close()
+
+    def __enter__(self) -> "MessageBundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
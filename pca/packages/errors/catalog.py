@@ -1,26 +1,129 @@
+import sys
 import typing as t
+import weakref
 
 from collections import OrderedDict
 
+from .builder import (
+    LazyError,
+    error_builder,
+)
+from .registry import error_registry
 from .types import (
+    ErrorCatalogType,
     ExceptionWithCodeType,
     is_error_class,
 )
 
 
-class ErrorCatalogMeta(type):
+__all__ = (
+    "ErrorCatalog",
+    "ErrorCatalogMeta",
+)
+
+
+# A process-wide counter bumped on every mutation of any catalog. Catalogs compare it with
+# the generation their index was built for, which covers changes made to super catalogs and
+# nested catalogs without tracking the dependencies between them.
+_generation = 0
+
+
+def _invalidate_indexes() -> None:
+    global _generation
+    _generation += 1
+
+
+class _CatalogIndex(t.NamedTuple):
+    generation: int
+    errors: t.Tuple[ExceptionWithCodeType, ...]
+
+
+class _CatalogViews:
+    """
+    Errors & nested catalogs of a catalog, merged over the inheritance. Building a lazy error
+    updates the views including its placeholder in place, see `ErrorCatalogMeta._replace_lazy`.
+    """
+
+    __slots__ = ("generation", "errors", "nested_catalogs", "tree", "members", "_positions")
+
+    def __init__(
+        self,
+        generation: int,
+        errors: t.Dict[str, ExceptionWithCodeType],
+        nested_catalogs: t.Dict[str, "ErrorCatalogMeta"],
+        tree: t.List[ExceptionWithCodeType],
+    ):
+        self.generation = generation
+        self.errors = errors
+        self.nested_catalogs = nested_catalogs
+        # errors of the whole tree, in order of iteration; lazy errors not built yet are
+        # included as their placeholders
+        self.tree = tree
+        # the tree & the classes built from its placeholders
+        self.members = set(tree)
+        # where the placeholders are in the tree; the same one might be there more than once
+        self._positions: t.Dict[LazyError, t.List[int]] = {}
+        for i, e in enumerate(tree):
+            if isinstance(e, LazyError):
+                if e.materialized is None:
+                    self._positions.setdefault(e, []).append(i)
+                else:
+                    tree[i] = e.materialized
+                    self.members.add(e.materialized)
+
+    def replace(self, placeholder: LazyError, error_class: ExceptionWithCodeType) -> None:
+        for i in self._positions.pop(placeholder, ()):
+            self.tree[i] = error_class
+        self.members.add(error_class)
+        if self.errors.get(error_class.code) is placeholder:
+            self.errors[error_class.code] = error_class
+
+
+class ErrorCatalogMeta(ErrorCatalogType):
 
     _errors: t.Dict[str, ExceptionWithCodeType]
     _own_nested_catalogs: t.Dict[str, "ErrorCatalogMeta"]
+    _containers: "weakref.WeakSet[ErrorCatalogMeta]"
+    _views: t.Optional[_CatalogViews]
+    _index: t.Optional[_CatalogIndex]
+    _frozen: bool
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._errors = OrderedDict(
-            (v.code, v) for _, v in self.__dict__.items() if is_error_class(v)
-        )
-        self._own_nested_catalogs = OrderedDict(
-            (v.__name__, v) for _, v in self.__dict__.items() if isinstance(v, ErrorCatalogMeta)
+        errors: t.Dict[str, ExceptionWithCodeType] = OrderedDict()
+        nested_catalogs: t.Dict[str, "ErrorCatalogMeta"] = OrderedDict()
+        own_errors = []
+        for name, value in self.__dict__.items():
+            if isinstance(value, ErrorCatalogMeta):
+                nested_catalogs[value.__name__] = value
+                value._containers.add(self)
+                error_registry.link(self, name, value)
+            elif is_error_class(value) or isinstance(value, LazyError):
+                errors[value.code] = value
+                own_errors.append(value)
+        error_registry.register_many(own_errors)
+        bases = self.__mro__[1:]
+        error_registry.inherit(
+            self, [c for c in bases if isinstance(c, ErrorCatalogMeta) and c is not ErrorCatalog]
         )
+        self._errors = errors
+        self._own_nested_catalogs = nested_catalogs
+        # catalogs nesting this one, so building its lazy errors can update their views; weak,
+        # not to keep alive the catalogs that include a long-lived one
+        self._containers = weakref.WeakSet()
+        self._views = None
+        self._index = None
+        self._frozen = False
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"Can't set {name!r}: {self} is frozen.")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"Can't delete {name!r}: {self} is frozen.")
+        super().__delattr__(name)
 
     def __str__(self) -> str:
         return self.__name__
@@ -33,8 +136,7 @@ class ErrorCatalogMeta(type):
         Iterate over errors, including inheritance, and then, iterate over nested catalogs
         (which might include its own nested catalogs). Supports field overriding by inheritance.
         """
-        yield from self._not_nested_errors.values()
-        yield from (e for c in self._nested_catalogs.values() for e in c)
+        return iter(self._merged_views.tree)
 
     @property
     def _super_catalogs(self) -> t.Iterable["ErrorCatalogMeta"]:
@@ -54,41 +156,123 @@ class ErrorCatalogMeta(type):
         """
         Dict of errors NOT in nested catalogs. Supports field overriding by inheritance.
         """
-        return {
-            name: error_class
-            for catalog in self._super_catalogs
-            for name, error_class in catalog._errors.items()
-        }
+        return self._merged_views.errors
 
     @property
     def _nested_catalogs(self) -> t.Dict[str, "ErrorCatalogMeta"]:
         """
         Dict of nested catalogs. Supports field overriding by inheritance.
         """
-        return {
-            name: nested
-            for catalog in self._super_catalogs
-            for name, nested in catalog._own_nested_catalogs.items()
-        }
+        return self._merged_views.nested_catalogs
+
+    @property
+    def _merged_views(self) -> _CatalogViews:
+        """
+        Errors & nested catalogs merged over the inheritance, computed once and reused until
+        any catalog is mutated, the same way as `_flat_index`.
+        """
+        views = self._views
+        if views is None or not (self._frozen or views.generation == _generation):
+            views = self._views = self._merge()
+        return views
+
+    def _merge(self) -> _CatalogViews:
+        generation = _generation
+        errors: t.Dict[str, ExceptionWithCodeType] = {}
+        nested_catalogs: t.Dict[str, "ErrorCatalogMeta"] = {}
+        for catalog in self._super_catalogs:
+            errors.update(catalog._errors)
+            nested_catalogs.update(catalog._own_nested_catalogs)
+        tree = list(errors.values())
+        for nested in nested_catalogs.values():
+            tree.extend(nested._merged_views.tree)
+        return _CatalogViews(generation, errors, nested_catalogs, tree)
+
+    @property
+    def _flat_index(self) -> _CatalogIndex:
+        """
+        Flattened view of the catalog, built once and reused until any catalog is mutated.
+        A frozen catalog keeps its index for good.
+        """
+        index = self._index
+        if index is None or not (self._frozen or index.generation == _generation):
+            index = self._index = self._build_index()
+        return index
+
+    def _build_index(self) -> _CatalogIndex:
+        errors = tuple(e.materialize() if isinstance(e, LazyError) else e for e in self.__iter__())
+        return _CatalogIndex(_generation, errors)
 
     @property
     def all(self) -> t.Tuple[ExceptionWithCodeType, ...]:
         """
         A tuple containing all the errors defined in the catalog, including nesting & inheritance.
+        Lazy errors are built, see `LazyError`; iterate over the catalog to avoid that.
         """
-        return tuple(self.__iter__())
+        return self._flat_index.errors
+
+    @property
+    def is_frozen(self) -> bool:
+        return self._frozen
 
     def __len__(self) -> int:
-        return len(self.all)
+        return len(self._merged_views.tree)
 
     def __contains__(self, item: ExceptionWithCodeType) -> bool:
-        return item in self.all
+        return item in self._merged_views.members
 
     def add_instance(self, error_class: ExceptionWithCodeType) -> None:
         """Registers an ExceptionWithCode subtype as an element of the ErrorCatalog."""
+        if self._frozen:
+            raise AttributeError(f"Can't add {error_class.code!r}: {self} is frozen.")
         self._errors[error_class.code] = error_class
         setattr(self, error_class.code, error_class)
         error_class.catalog = t.cast("ErrorCatalog", self)
+        error_registry.register(error_class)
+        _invalidate_indexes()
+
+    def freeze(self) -> None:
+        """
+        Makes the catalog immutable, together with the catalogs it inherits from and its nested
+        catalogs, so its flattened index never has to be rebuilt.
+        """
+        if self._frozen:
+            return
+        for catalog in self._super_catalogs:
+            if catalog is not self:
+                catalog.freeze()
+        for nested in self._nested_catalogs.values():
+            nested.freeze()
+        self._index = self._build_index()
+        self._views = self._merge()
+        self._frozen = True
+
+    def _replace_lazy(self, name: str, error_class: ExceptionWithCodeType) -> None:
+        """
+        Puts the error class built from a lazy placeholder in place of the placeholder, both in
+        this catalog and in the views of the catalogs including it, which are not rebuilt.
+        """
+        placeholder = self.__dict__[name]
+        # the placeholder is replaced even in a frozen catalog
+        type.__setattr__(self, name, error_class)
+        error_class.__set_name__(self, name)
+        self._errors[error_class.code] = error_class
+        error_registry.register(error_class)
+        for catalog in self._including_catalogs():
+            if catalog._views is not None:
+                catalog._views.replace(placeholder, error_class)
+
+    def _including_catalogs(self) -> t.Iterator["ErrorCatalogMeta"]:
+        """This catalog, the ones inheriting from it & the ones nesting any of those."""
+        seen: t.Set["ErrorCatalogMeta"] = set()
+        pending = [self]
+        while pending:
+            catalog = pending.pop()
+            if catalog not in seen:
+                seen.add(catalog)
+                yield catalog
+                pending.extend(type.__subclasses__(catalog))
+                pending.extend(catalog._containers)
 
 
 class ErrorCatalog(metaclass=ErrorCatalogMeta):
@@ -137,3 +321,35 @@ class ErrorCatalog(metaclass=ErrorCatalogMeta):
     >>> assert OldCatalog.OldCatalog.catalog == OldCatalog
     >>> assert NewCatalog.AnExistingError.catalog == NewCatalog
     """
+
+    @classmethod
+    def from_hints(
+        cls,
+        name: str,
+        hints: t.Mapping[str, str],
+        lazy: bool = False,
+        module: t.Optional[str] = None,
+        qualname: t.Optional[str] = None,
+    ) -> "ErrorCatalogMeta":
+        """
+        Builds a catalog, inheriting from the `cls`, of errors with the codes & hints given by
+        the `hints` mapping, ie. generated from a spec, in a single pass over the mapping:
+
+        >>> HttpErrors = ErrorCatalog.from_hints("HttpErrors", {"NotFound": "Not found."})
+        >>> HttpErrors.NotFound.hint
+        'Not found.'
+
+        With `lazy`, errors are `LazyError` placeholders. The catalog belongs to the `module`
+        & has the `qualname`, the module of the caller & the `name` by default; set them if
+        the catalog is to be nested in another one or found by its dotted path.
+        """
+        namespace: t.Dict[str, t.Any] = {}
+        for code, hint in hints.items():
+            if not code.isidentifier():
+                raise ValueError(f"{code!r} can't be used as a code of an error.")
+            namespace[code] = error_builder(hint=hint, lazy=lazy)
+        if module is None:
+            module = sys._getframe(1).f_globals.get("__name__", "__main__")
+        namespace["__module__"] = module
+        namespace["__qualname__"] = qualname or name
+        return type(cls)(name, (cls,), namespace)
@@ -0,0 +1,175 @@
+import copy
+import threading
+import traceback
+import typing as t
+
+from dataclasses import dataclass
+
+from .boundary import ErrorBoundary
+from .types import (
+    ExceptionInfo,
+    ExceptionTypeOrTypes,
+    error_code,
+)
+
+
+__all__ = (
+    "CollectedError",
+    "CollectingBoundary",
+    "CollectionReport",
+    "ErrorCollector",
+    "ErrorsCollected",
+)
+
+
+@dataclass
+class CollectedError:
+    """Exceptions of the same type & the same params, collected by an `ErrorCollector`."""
+
+    code: str
+    params: t.Any
+    count: int
+    # a copy of the first exception collected, without its traceback, or the exception itself
+    # if it can't be copied
+    error: BaseException
+    tracebacks: t.List[traceback.StackSummary]
+
+
+@dataclass(frozen=True)
+class CollectionReport:
+    errors: t.Tuple[CollectedError, ...]
+    # number of all the exceptions collected, including the dropped ones
+    total: int
+    # number of exceptions that weren't grouped, as there were too many groups already
+    dropped: int
+
+    def __bool__(self) -> bool:
+        return bool(self.total)
+
+
+class ErrorsCollected(Exception):
+    """
+    Aggregate of the exceptions collected by an `ErrorCollector`. Like `ExceptionGroup`,
+    it has `exceptions`: the first exception of each group.
+    """
+
+    def __init__(self, report: CollectionReport) -> None:
+        super().__init__(
+            f"{report.total} error(s) of {len(report.errors)} kind(s) collected"
+            + (f", {report.dropped} of them not grouped" if report.dropped else "")
+        )
+        self.report = report
+        self.exceptions = tuple(e.error for e in report.errors)
+
+
+def _detached(error: BaseException) -> BaseException:
+    # the exception belongs to the code that has raised it, so it's copied rather than stripped
+    # of its traceback, which would keep the frames & their locals alive in the group
+    try:
+        return copy.copy(error).with_traceback(None)
+    except Exception:
+        return error
+
+
+def _params_key(error: BaseException) -> t.Hashable:
+    kwargs = getattr(error, "kwargs", None)
+    params = tuple(sorted(kwargs.items())) if isinstance(kwargs, dict) else error.args
+    try:
+        hash(params)
+    except TypeError:
+        return repr(params)
+    return params
+
+
+class ErrorCollector:
+    """
+    `on_suppress_exception` hook collecting the suppressed exceptions, ie. to report all
+    the failures of a batch at once. Exceptions are grouped by their type & params; each group
+    keeps a count, the first exception and tracebacks of up to `max_tracebacks` of them.
+    Up to `max_groups` groups are kept; further kinds of exceptions are only counted.
+
+    A collector can be shared by many boundaries and threads.
+    """
+
+    def __init__(self, max_groups: int = 1000, max_tracebacks: int = 1) -> None:
+        self.max_groups = max_groups
+        self.max_tracebacks = max_tracebacks
+        self._lock = threading.Lock()
+        self._groups: t.Dict[t.Tuple[type, t.Hashable], CollectedError] = {}
+        self._total = 0
+        self._dropped = 0
+
+    def __call__(self, exc_info: ExceptionInfo) -> None:
+        error = exc_info.value
+        key = (exc_info.type, _params_key(error))
+        with self._lock:
+            self._total += 1
+            group = self._groups.get(key)
+            if group is not None:
+                group.count += 1
+                if len(group.tracebacks) >= self.max_tracebacks:
+                    return
+            elif len(self._groups) >= self.max_groups:
+                self._dropped += 1
+                return
+        # formatting of the traceback happens outside of the lock, only for the first ones
+        stack = traceback.extract_tb(exc_info.traceback)
+        first = _detached(error) if group is None else error
+        with self._lock:
+            if group is None:
+                # another thread might have created the group in the meantime
+                group = self._groups.setdefault(
+                    key, CollectedError(error_code(error), key[1], 0, first, [])
+                )
+                group.count += 1
+            if len(group.tracebacks) < self.max_tracebacks:
+                group.tracebacks.append(stack)
+
+    def report(self) -> CollectionReport:
+        with self._lock:
+            return CollectionReport(tuple(self._groups.values()), self._total, self._dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups = {}
+            self._total = self._dropped = 0
+
+    def raise_for_errors(self) -> None:
+        """Raises `ErrorsCollected` if any exception has been collected."""
+        report = self.report()
+        if report:
+            raise ErrorsCollected(report)
+
+
+class CollectingBoundary(ErrorBoundary):
+    """
+    A boundary that suppresses the exceptions it catches, collecting them into its `collector`,
+    so that a batch can be processed as a whole & all the failures reported at the end:
+
+    >>> boundary = CollectingBoundary(catch=ValidationError)
+    >>> for item in items:
+    ...     with boundary:
+    ...         process(item)
+    >>> boundary.raise_for_errors()
+    """
+
+    def __init__(
+        self,
+        name: t.Optional[str] = None,
+        catch: ExceptionTypeOrTypes = Exception,
+        max_groups: int = 1000,
+        max_tracebacks: int = 1,
+        **kwargs,
+    ) -> None:
+        super().__init__(name, catch, **kwargs)
+        self.collector = ErrorCollector(max_groups, max_tracebacks)
+
+    def on_suppress_exception(self, exc_info: ExceptionInfo) -> None:
+        """Collects the exception."""
+        self.collector(exc_info)
+
+    def report(self) -> CollectionReport:
+        return self.collector.report()
+
+    def raise_for_errors(self) -> None:
+        self.collector.raise_for_errors()
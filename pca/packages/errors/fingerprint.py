@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import typing as t
+
+from types import (
+    CodeType,
+    TracebackType,
+)
+
+
+__all__ = (
+    "Fingerprinter",
+    "fingerprint",
+    "fingerprinter",
+)
+
+# signature of a frame: its code object & the number of the line being executed
+FrameSignature = t.Tuple[CodeType, int]
+
+
+class Fingerprinter:
+    """
+    Computes fingerprints of errors, to group the recurring ones, ie. by log policies,
+    aggregators & metrics. A fingerprint combines the code & the catalog of the error with
+    the signatures of the frames of its traceback, ie. the code objects & the line numbers,
+    so errors raised of the same kind at the same place have the same fingerprint:
+
+    >>> fingerprinter(error)
+    '9c1e0f3a27d4b86e'
+
+    Fingerprints are stable between processes as long as the source code & its paths don't change.
+
+    The traceback is walked without formatting it. Identities of code objects & fingerprints of
+    recurring tracebacks are cached, so computing the fingerprint of an error seen before costs
+    a walk of its traceback & a dict lookup. Up to `maxsize` entries are cached in each of the
+    caches; the ones cached earliest are evicted first. `limit` is the number of the innermost
+    frames taken into account, all by default.
+    """
+
+    def __init__(self, limit: t.Optional[int] = None, maxsize: int = 4096) -> None:
+        self.limit = limit
+        self.maxsize = maxsize
+        self._code_ids: t.Dict[CodeType, bytes] = {}
+        self._fingerprints: t.Dict[t.Tuple[type, t.Tuple[FrameSignature, ...]], str] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, cache: t.Dict[t.Any, t.Any], key: t.Any, value: t.Any) -> None:
+        with self._lock:
+            if cache and len(cache) >= self.maxsize:
+                del cache[next(iter(cache))]
+            cache[key] = value
+
+    def _code_id(self, code: CodeType) -> bytes:
+        code_id = self._code_ids.get(code)
+        if code_id is None:
+            code_id = f"{code.co_filename}:{code.co_name}".encode()
+            self._store(self._code_ids, code, code_id)
+        return code_id
+
+    def frames(self, traceback: t.Optional[TracebackType]) -> t.Tuple[FrameSignature, ...]:
+        """Returns signatures of the frames of the `traceback`, the outermost first."""
+        frames = []
+        while traceback is not None:
+            frames.append((traceback.tb_frame.f_code, traceback.tb_lineno))
+            traceback = traceback.tb_next
+        if self.limit is not None:
+            frames = frames[-self.limit :] if self.limit else []
+        return tuple(frames)
+
+    def of(
+        self,
+        error_class: t.Type[BaseException],
+        traceback: t.Optional[TracebackType] = None,
+    ) -> str:
+        """Returns the fingerprint of an error of the `error_class` having the `traceback`."""
+        frames = self.frames(traceback)
+        key = (error_class, frames)
+        result = self._fingerprints.get(key)
+        if result is None:
+            catalog = getattr(error_class, "catalog", None)
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(catalog.__qualname__.encode() if catalog else b"")
+            digest.update(b"\n")
+            # the same as `error_code` but for the class
+            digest.update((getattr(error_class, "code", None) or error_class.__name__).encode())
+            for code, lineno in frames:
+                digest.update(b"\n")
+                digest.update(self._code_id(code))
+                digest.update(b":%d" % lineno)
+            result = digest.hexdigest()
+            self._store(self._fingerprints, key, result)
+        return result
+
+    def __call__(self, error: BaseException) -> str:
+        """Returns the fingerprint of the `error`, with its current traceback."""
+        return self.of(type(error), error.__traceback__)
+
+
+# the default fingerprinter, used by `ExceptionWithCode.fingerprint`
+# & `ExceptionInfo.fingerprint`
+fingerprinter = Fingerprinter()
+
+
+def fingerprint(error: BaseException) -> str:
+    """Returns the fingerprint of the `error`, see `Fingerprinter`."""
+    return fingerprinter(error)
@@ -0,0 +1,175 @@
+import json
+import threading
+import typing as t
+
+from .registry import (
+    ErrorRegistry,
+    error_registry,
+)
+from .types import (
+    ExceptionWithCode,
+    ExceptionWithCodeType,
+)
+
+
+__all__ = (
+    "ErrorIds",
+    "error_ids",
+)
+
+LOCK_VERSION = 1
+
+
+def _error_path(error_class: ExceptionWithCodeType) -> str:
+    """Returns the dotted path of an error attached to a catalog, ie. `Catalog.Nested.Code`."""
+    return f"{error_class.catalog.__qualname__}.{error_class.code}"  # type: ignore
+
+
+class ErrorIds:
+    """
+    Stable numeric IDs of the errors of a registry, to be used instead of codes where strings
+    are too costly, ie. in event streams & column stores:
+
+    >>> ids = ErrorIds.load(open("errors.lock"))
+    >>> ids.id_of(Catalog.NotFound)
+    7
+    >>> ids[7]
+    Catalog.NotFound
+
+    IDs are positive integers pinned to the dotted paths of the errors by a lock kept in
+    the repository, so all the processes running a release agree on them, whatever they have
+    imported & whenever they have asked for an ID. Errors without a pinned ID have no ID:
+    `id_of` raises KeyError for them rather than assigning one another process wouldn't know.
+    The serializers use the module-level `error_ids` by default; `pin` the lock on it:
+
+    >>> error_ids.pin(ErrorIds.read(open("errors.lock")))
+
+    To pin IDs of new errors, `dump` the lock with all the catalogs imported, ie. in a release
+    script. Errors in the lock keep their IDs; new errors get IDs greater than any in the lock,
+    in order of their dotted paths, & IDs of errors removed from the catalogs aren't assigned
+    again. An error class registered again under the same path, ie. after reloading its
+    module, takes over the ID. A path defined by catalogs of different modules is ambiguous,
+    so it has no ID.
+
+    Only the pinned paths are looked up in the registry, so lazy errors aren't built until
+    an error class is asked for by its ID.
+    """
+
+    def __init__(
+        self,
+        registry: ErrorRegistry = error_registry,
+        pinned: t.Optional[t.Mapping[str, int]] = None,
+    ) -> None:
+        self.registry = registry
+        self._pinned: t.Dict[str, int] = {}
+        self._paths: t.Dict[int, str] = {}
+        # memoized results of lookups, valid for the generation of the registry
+        self._by_id: t.Dict[int, ExceptionWithCodeType] = {}
+        self._by_class: t.Dict[ExceptionWithCodeType, int] = {}
+        self._generation = -1
+        self._lock = threading.Lock()
+        self.pin(pinned or {})
+
+    def pin(self, pinned: t.Mapping[str, int]) -> None:
+        """
+        Pins the IDs to the dotted paths, ie. the ones of a lock read by `read`. Paths already
+        pinned have to keep their IDs.
+        """
+        with self._lock:
+            merged = {**self._pinned, **pinned}
+            ids = list(merged.values())
+            if len(set(ids)) != len(ids) or not all(isinstance(i, int) and i > 0 for i in ids):
+                raise ValueError("Pinned IDs have to be unique positive integers.")
+            changed = [path for path, i in self._pinned.items() if merged[path] != i]
+            if changed:
+                raise ValueError(f"IDs of {changed!r} are already pinned.")
+            self._pinned = merged
+            self._paths = {i: path for path, i in merged.items()}
+            self._generation = -1
+
+    def refresh(self) -> None:
+        """Forgets the IDs looked up before the last change of the registry."""
+        with self._lock:
+            if self._generation != self.registry.generation:
+                self._generation = self.registry.generation
+                self._by_id = {}
+                self._by_class = {}
+
+    def _claims(self, path: str) -> t.Dict[str, ExceptionWithCodeType]:
+        claims = self.registry.claims(path)
+        if len(claims) > 1:
+            raise KeyError(f"{path!r} is defined by catalogs of many modules.")
+        return claims
+
+    def id_of(self, error: t.Union[ExceptionWithCode, ExceptionWithCodeType]) -> int:
+        """
+        Returns the ID of the error class or of the class of the error instance.
+        Raises KeyError if the error isn't registered or its ID isn't pinned.
+        """
+        error_class = error if isinstance(error, type) else type(error)
+        if self._generation != self.registry.generation:
+            self.refresh()
+        error_id = self._by_class.get(error_class)
+        if error_id is not None:
+            return error_id
+        if error_class.catalog is None:
+            raise KeyError(f"{error_class!r} isn't in a catalog.")
+        path = _error_path(error_class)
+        error_id = self._pinned.get(path)
+        if error_id is None:
+            raise KeyError(f"{path!r} has no pinned ID, see `ErrorIds.lock`.")
+        if not self._claims(path):
+            raise KeyError(f"{path!r} isn't registered.")
+        self._by_class[error_class] = error_id
+        return error_id
+
+    def __getitem__(self, error_id: int) -> ExceptionWithCodeType:
+        """Returns the error class of the ID. Raises KeyError if there's no such ID."""
+        if self._generation != self.registry.generation:
+            self.refresh()
+        error_class = self._by_id.get(error_id)
+        if error_class is not None:
+            return error_class
+        path = self._paths[error_id]
+        for module in self._claims(path):
+            error_class = self._by_id[error_id] = self.registry.in_module(module, path)
+            return error_class
+        raise KeyError(f"{path!r} isn't registered.")
+
+    def lock(self) -> t.Dict[str, int]:
+        """
+        Returns the dotted paths of all the errors with their IDs, ordered by the IDs: the pinned
+        ones, including the IDs of the errors that aren't registered anymore, and new IDs
+        of the registered errors without pinned IDs. The new IDs aren't assigned until
+        the lock is loaded.
+        """
+        paths = {_error_path(e) for e in self.registry.subtree(build=False)}
+        with self._lock:
+            lock = dict(self._pinned)
+        next_id = max(lock.values(), default=0) + 1
+        for path in sorted(paths - lock.keys()):
+            lock[path] = next_id
+            next_id += 1
+        return dict(sorted(lock.items(), key=lambda item: item[1]))
+
+    def dump(self, fp: t.TextIO) -> None:
+        """Writes the `lock` as JSON to the file object `fp`."""
+        json.dump({"version": LOCK_VERSION, "ids": self.lock()}, fp, indent=2)
+        fp.write("\n")
+
+    @staticmethod
+    def read(fp: t.TextIO) -> t.Dict[str, int]:
+        """Returns the IDs of a lock read from the file object `fp`, see `dump`."""
+        data = json.load(fp)
+        if data.get("version") != LOCK_VERSION:
+            raise ValueError(f"Unsupported version of the lock: {data.get('version')!r}")
+        return data["ids"]
+
+    @classmethod
+    def load(cls, fp: t.TextIO, registry: ErrorRegistry = error_registry) -> "ErrorIds":
+        """Returns IDs pinned by a lock read from the file object `fp`, see `dump`."""
+        return cls(registry, cls.read(fp))
+
+
+# IDs of the errors of the default registry, used by the serializers
+error_ids = ErrorIds()
@@ -0,0 +1,222 @@
+import functools
+import string
+import threading
+import typing as t
+
+from .types import ExceptionType
+
+
+if t.TYPE_CHECKING:
+    from .bundle import MessageBundle
+
+
+__all__ = (
+    "MessageRenderer",
+    "MessageTemplate",
+    "keep_field",
+)
+
+_MISSING = object()
+_parse = string.Formatter().parse
+
+
+def keep_field(field: str) -> str:
+    """Renders a missing param as the field of the template itself, ie. `{name}`."""
+    return f"{{{field}}}"
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class MessageTemplate:
+    """
+    A message template with `str.format` syntax, where fields refer to the kwargs of an error
+    by their names & to its args by their indexes, ie. "Invalid {field}: {value!r:.20}".
+    Attributes & items of params can be used too, ie. "{user.name}" or "{items[0]}".
+
+    The template is parsed once, when the instance is made; invalid templates raise ValueError
+    then. Rendering checks the params are there & makes a single `str.format` call. Missing
+    params don't raise: they are rendered by the `missing` function given to `render`.
+    """
+
+    __slots__ = ("text", "_format", "_keys", "_key_set", "_literals", "_fields", "_uses_args")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        # the template rewritten to refer to the values by their positions
+        format_parts: t.List[str] = []
+        keys: t.List[t.Union[str, int]] = []
+        # for each field: the literal text before it, and the text after the last one; escaped
+        # braces split the literal text into many parts, which are merged back here
+        literals: t.List[str] = []
+        literal_parts: t.List[str] = []
+        # for each field: its text & the template of rendering just the field
+        fields: t.List[t.Tuple[str, str]] = []
+        for literal, field_name, spec, conversion in _parse(text):
+            format_parts.append(_escape(literal))
+            literal_parts.append(literal)
+            if field_name is None:
+                continue
+            literals.append("".join(literal_parts))
+            literal_parts = []
+            if not field_name:
+                raise ValueError(f"Fields have to be named or numbered: {text!r}")
+            if spec and "{" in spec:
+                raise ValueError(f"Nested fields aren't supported: {text!r}")
+            root = field_name.partition(".")[0].partition("[")[0]
+            keys.append(int(root) if root.isdigit() else root)
+            suffix = field_name[len(root) :]
+            suffix += f"!{conversion}" if conversion else ""
+            suffix += f":{spec}" if spec else ""
+            format_parts.append(f"{{{len(keys) - 1}{suffix}}}")
+            fields.append((field_name, f"{{0{suffix}}}"))
+        literals.append("".join(literal_parts))
+        self._format = "".join(format_parts)
+        self._keys = tuple(keys)
+        self._key_set = frozenset(keys)
+        self._literals = tuple(literals)
+        self._fields = tuple(fields)
+        self._uses_args = any(isinstance(key, int) for key in keys)
+
+    @classmethod
+    def literal(cls, text: str) -> "MessageTemplate":
+        """A template rendering the `text` as it is, without fields."""
+        return cls(_escape(text))
+
+    def render(
+        self,
+        kwargs: t.Mapping[str, t.Any],
+        args: t.Sequence[t.Any] = (),
+        missing: t.Callable[[str], str] = keep_field,
+    ) -> str:
+        if not self._keys:
+            return "".join(self._literals)
+        params: t.Mapping[t.Any, t.Any] = kwargs
+        if self._uses_args:
+            params = {**dict(enumerate(args)), **kwargs}
+        if params.keys() >= self._key_set:
+            if self._uses_args:
+                return self._format.format(*map(params.__getitem__, self._keys))
+            return self.text.format_map(params)
+        values = [params.get(key, _MISSING) for key in self._keys]
+        # rendered field by field, so that the missing ones don't go through their format specs
+        parts = []
+        for literal, value, (field_name, field) in zip(self._literals, values, self._fields):
+            parts.append(literal)
+            parts.append(missing(field_name) if value is _MISSING else field.format(value))
+        parts.extend(self._literals[len(self._fields) :])
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.text!r})"
+
+
+class MessageRenderer:
+    """
+    Renders human-readable messages of errors in a locale, from templates given for each
+    locale by the dotted path of the error (ie. "Catalog.Nested.NotFound") or its bare code:
+
+    >>> renderer = MessageRenderer({
+    ...     "en": {"NotFound": "{resource} not found."},
+    ...     "pl": {"Catalog.Nested.NotFound": "Nie znaleziono: {resource}."},
+    ... })
+    >>> renderer.render(Catalog.Nested.NotFound(resource="User"), "pl_PL")
+    'Nie znaleziono: User.'
+
+    A template is looked up in the locale, then in its language, ie. "pl" for "pl_PL",
+    and then in the `default_locale`. Without any template, the message is the hint
+    of the error or its code.
+
+    Templates are compiled once & the compiled template of each error class & locale is kept
+    in an LRU cache of `maxsize` entries, so rendering the message of an error seen before
+    costs a cache lookup & a `str.format` call. Missing params are rendered by the `missing`
+    function, as their fields by default, see `MessageTemplate`.
+
+    Templates might also come from a `bundle`, see `MessageBundle`; the ones added to
+    the renderer take precedence over them.
+    """
+
+    def __init__(
+        self,
+        templates: t.Optional[t.Mapping[str, t.Mapping[str, str]]] = None,
+        default_locale: str = "en",
+        missing: t.Callable[[str], str] = keep_field,
+        maxsize: int = 1024,
+        bundle: t.Optional["MessageBundle"] = None,
+    ) -> None:
+        self.default_locale = default_locale
+        self.bundle = bundle
+        self.missing = missing
+        self._templates: t.Dict[str, t.Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._compiled = functools.lru_cache(maxsize)(self._compile)
+        for locale, locale_templates in (templates or {}).items():
+            self.add(locale, locale_templates)
+
+    def add(self, locale: str, templates: t.Mapping[str, str]) -> None:
+        """Adds or replaces the templates of the `locale`."""
+        with self._lock:
+            self._templates.setdefault(locale, {}).update(templates)
+            self._compiled.cache_clear()
+
+    def locales(self, locale: t.Optional[str] = None) -> t.Tuple[str, ...]:
+        """Locales searched for templates in the `locale`, in order."""
+        candidates = []
+        if locale:
+            candidates.append(locale)
+            language = locale.replace("-", "_").partition("_")[0]
+            candidates.append(language)
+        candidates.append(self.default_locale)
+        return tuple(dict.fromkeys(candidates))
+
+    def template(self, error_class: ExceptionType, locale: t.Optional[str] = None) -> str:
+        """
+        Returns the text of the template of the `error_class` in the `locale`, or of the message
+        rendered without a template.
+        """
+        return self._compiled(error_class, locale).text
+
+    def _compile(self, error_class: ExceptionType, locale: t.Optional[str]) -> MessageTemplate:
+        code = getattr(error_class, "code", None) or error_class.__name__
+        catalog = getattr(error_class, "catalog", None)
+        path = f"{catalog.__qualname__}.{code}" if catalog else code
+        for candidate in self.locales(locale):
+            sources = [self._templates.get(candidate)]
+            if self.bundle is not None:
+                sources.append(self.bundle.get(candidate))
+            for templates in sources:
+                if templates is None:
+                    continue
+                text = templates.get(path)
+                if text is None:
+                    text = templates.get(code)
+                if text is not None:
+                    return MessageTemplate(text)
+        return MessageTemplate.literal(getattr(error_class, "hint", None) or code)
+
+    def render(self, error: BaseException, locale: t.Optional[str] = None) -> str:
+        """Returns the message of the `error` in the `locale`."""
+        template = self._compiled(type(error), locale)
+        return template.render(getattr(error, "kwargs", None) or {}, error.args, self.missing)
+
+    def render_many(
+        self, errors: t.Iterable[BaseException], locale: t.Optional[str] = None
+    ) -> t.List[str]:
+        """
+        Returns the messages of the `errors` in the `locale`, ie. for a response carrying
+        many validation errors. Each error class is looked up in the cache once per call.
+        """
+        compiled = self._compiled
+        missing = self.missing
+        templates: t.Dict[type, MessageTemplate] = {}
+        messages = []
+        for error in errors:
+            error_class = type(error)
+            template = templates.get(error_class)
+            if template is None:
+                template = templates[error_class] = compiled(error_class, locale)
+            messages.append(
+                template.render(getattr(error, "kwargs", None) or {}, error.args, missing)
+            )
+        return messages
@@ -0,0 +1,411 @@
+import collections
+import json
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+import typing as t
+
+from .boundary import (
+    BoundaryHook,
+    ErrorBoundary,
+)
+from .types import (
+    ExceptionInfo,
+    error_code,
+)
+
+
+__all__ = (
+    "ErrorCodeFilter",
+    "QueueLogSink",
+    "RateLimitedSuppressionLog",
+)
+
+
+class ErrorCodeFilter(logging.Filter):
+    """
+    Logging filter that sets `error_code` attribute of each record logged with an exception,
+    so a formatter can use `%(error_code)s` instead of rendering the whole error. Records
+    without an exception get an empty string.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exc_info = record.exc_info
+        record.error_code = error_code(exc_info[1]) if exc_info and exc_info[1] else ""
+        return True
+
+
+class _Bucket:
+    __slots__ = ("window_start", "logged", "suppressed", "examples")
+
+    def __init__(self, window_start: float) -> None:
+        self.window_start = window_start
+        self.logged = 0
+        self.suppressed = 0
+        self.examples: t.List[t.Any] = []
+
+
+_Summary = t.Tuple[t.Tuple[str, str], int, t.List[t.Any]]
+
+
+def _summary(key: t.Tuple[str, str], bucket: _Bucket) -> _Summary:
+    return key, bucket.suppressed, bucket.examples
+
+
+class RateLimitedSuppressionLog(BoundaryHook):
+    """
+    `on_suppress_exception` hook logging suppressed exceptions without flooding the logs.
+
+    For each pair of a boundary & an error code, only the first `burst` occurrences within
+    a `window` of seconds are logged in full, with traceback. The others are only counted and
+    a summary line, with the count & up to `max_examples` examples of their kwargs, is logged
+    when the window has ended: by the first exception logged afterwards, of any boundary
+    & code, or on `flush`.
+
+    >>> suppression_log = RateLimitedSuppressionLog(burst=5, window=60.0)
+    >>> boundary = ErrorBoundary(name="api", on_suppress_exception=suppression_log)
+
+    A single instance can be shared by many boundaries. Logging an exception takes a lock for
+    a dict lookup & a few counters, the formatting happens outside of it.
+    """
+
+    def __init__(
+        self,
+        burst: int = 10,
+        window: float = 60.0,
+        max_examples: int = 3,
+        logger: t.Optional[logging.Logger] = None,
+        level: int = logging.WARNING,
+        clock: t.Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.burst = burst
+        self.window = window
+        self.max_examples = max_examples
+        self.logger = logger or logging.getLogger(ErrorBoundary.__module__)
+        self.level = level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: t.Dict[t.Tuple[str, str], _Bucket] = {}
+        # when the earliest of the windows ends
+        self._next_sweep = math.inf
+
+    def __call__(self, boundary: ErrorBoundary, exc_info: ExceptionInfo) -> None:
+        error = exc_info.value
+        key = (boundary.name, error_code(error))
+        now = self._clock()
+        summaries: t.List[_Summary] = []
+        with self._lock:
+            if now >= self._next_sweep:
+                summaries = self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(now)
+                self._next_sweep = min(self._next_sweep, now + self.window)
+            if bucket.logged < self.burst:
+                bucket.logged += 1
+                log_in_full = True
+            else:
+                bucket.suppressed += 1
+                if len(bucket.examples) < self.max_examples:
+                    bucket.examples.append(getattr(error, "kwargs", None) or error.args)
+                log_in_full = False
+        for summary in summaries:
+            self._log_summary(summary)
+        if log_in_full:
+            self.logger.log(
+                self.level,
+                repr(error),
+                exc_info=(exc_info.type, error, exc_info.traceback),
+            )
+
+    def flush(self) -> None:
+        """Logs summaries of all the exceptions counted, but not logged yet, and resets them."""
+        with self._lock:
+            summaries = [_summary(k, b) for k, b in self._buckets.items() if b.suppressed]
+            self._buckets.clear()
+            self._next_sweep = math.inf
+        for summary in summaries:
+            self._log_summary(summary)
+
+    def _sweep(self, now: float) -> t.List[_Summary]:
+        # closes all the windows that have ended, of any key; their buckets are made again
+        # by the next exceptions of their keys
+        summaries = []
+        next_sweep = math.inf
+        for key, bucket in list(self._buckets.items()):
+            if now - bucket.window_start >= self.window:
+                del self._buckets[key]
+                if bucket.suppressed:
+                    summaries.append(_summary(key, bucket))
+            else:
+                next_sweep = min(next_sweep, bucket.window_start + self.window)
+        self._next_sweep = next_sweep
+        return summaries
+
+    def _log_summary(self, summary: _Summary) -> None:
+        (boundary_name, code), count, examples = summary
+        self.logger.log(
+            self.level,
+            f"{code} suppressed by {boundary_name} {count} more time(s); "
+            f"examples: {', '.join(repr(e) for e in examples)}",
+        )
+
+
+# a record of the sink: time, name of the boundary, event, details of the error, its frames
+# (the `ExceptionInfo`, a `StackSummary` or None) & extra fields
+_Record = t.Tuple[float, str, str, t.Dict[str, t.Any], t.Any, t.Optional[t.Dict[str, t.Any]]]
+
+
+def _details(error: BaseException) -> t.Dict[str, t.Any]:
+    to_dict = getattr(type(error), "to_dict", None)
+    if to_dict is not None:
+        details = to_dict(error)
+        # the record is formatted later, so it mustn't see the kwargs changed in the meantime
+        if "kwargs" in details:
+            details = {**details, "kwargs": dict(details["kwargs"])}
+        return details
+    error_class = type(error)
+    return {
+        "code": error_code(error),
+        "type": f"{error_class.__module__}.{error_class.__qualname__}",
+        "args": error.args,
+    }
+
+
+class _EventHook(BoundaryHook):
+    def __init__(self, sink: "QueueLogSink", event: str) -> None:
+        self.sink = sink
+        self.event = event
+
+    def __call__(self, boundary: ErrorBoundary, exc_info: ExceptionInfo) -> None:
+        self.sink.put(boundary, self.event, exc_info)
+
+
+class _InnerErrorHook(BoundaryHook):
+    def __init__(self, sink: "QueueLogSink") -> None:
+        self.sink = sink
+
+    def __call__(
+        self,
+        boundary: ErrorBoundary,
+        where: str,
+        main_error: t.Optional[BaseException],
+        callback_error: Exception,
+    ) -> None:
+        exc_info = ExceptionInfo(
+            type(callback_error), callback_error, callback_error.__traceback__
+        )
+        extra = {
+            "where": where,
+            "handled": error_code(main_error) if main_error is not None else None,
+        }
+        self.sink.put(boundary, "inner_error", exc_info, extra)
+
+
+class QueueLogSink(BoundaryHook):
+    """
+    `on_suppress_exception` hook writing the exceptions as JSON lines to the `stream`
+    (`sys.stderr` by default) without formatting nor writing anything on the thread that has
+    hit the exception:
+
+    >>> sink = QueueLogSink(open("errors.jsonl", "a"))
+    >>> boundary = ErrorBoundary(
+    ...     name="api",
+    ...     on_suppress_exception=sink,
+    ...     on_propagate_exception=sink.propagated,
+    ...     log_inner_error=sink.inner_errors,
+    ... )
+
+    The hooks only put a small record into a bounded queue: the time, the name of
+    the boundary, `to_dict` of the error (or its code, type & args) and its frames. With
+    `frames="reference"` the traceback is kept as it is & formatted later, which keeps
+    the frames & their locals alive until then; `frames="summary"` extracts a summary of
+    the frames, without their source lines, right away, and `frames="none"` skips them.
+
+    A background thread takes the records in batches of up to `batch_size`, or whatever has
+    been queued within `flush_interval` seconds, formats them & writes each batch at once.
+    When the queue is full, a record is dropped according to the `drop_policy`: the new one
+    ("drop_newest") or the oldest one in the queue ("drop_oldest"). The sink counts records
+    `enqueued`, `dropped`, `written` and `failed` to be formatted or written.
+
+    A single instance can be shared by many boundaries. Call `close` on shutdown, so that
+    the records still in the queue are written.
+    """
+
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+
+    def __init__(
+        self,
+        stream: t.Optional[t.TextIO] = None,
+        maxsize: int = 10_000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        drop_policy: str = DROP_NEWEST,
+        frames: str = "reference",
+        traceback_limit: t.Optional[int] = None,
+        clock: t.Callable[[], float] = time.time,
+    ) -> None:
+        if drop_policy not in (self.DROP_NEWEST, self.DROP_OLDEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy!r}")
+        if frames not in ("reference", "summary", "none"):
+            raise ValueError(f"Unknown way of keeping frames: {frames!r}")
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError("Both maxsize & batch_size have to be positive.")
+        self.stream = stream
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.frames = frames
+        self.traceback_limit = traceback_limit
+        self.propagated = _EventHook(self, "propagated")
+        self.inner_errors = _InnerErrorHook(self)
+        self.enqueued = self.dropped = self.written = self.failed = 0
+        self._clock = clock
+        self._queue: t.Deque[_Record] = collections.deque()
+        self._lock = threading.Lock()
+        # the background thread waits for records & the callers of `flush` for it to be idle
+        self._ready = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._flushing = 0
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self.__class__.__name__}-{id(self)}", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, boundary: ErrorBoundary, exc_info: ExceptionInfo) -> None:
+        self.put(boundary, "suppressed", exc_info)
+
+    def put(
+        self,
+        boundary: ErrorBoundary,
+        event: str,
+        exc_info: ExceptionInfo,
+        extra: t.Optional[t.Dict[str, t.Any]] = None,
+    ) -> None:
+        """Queues a record of the exception, without blocking on the background thread."""
+        if self.frames == "reference":
+            frames: t.Any = exc_info
+        elif self.frames == "summary":
+            frames = traceback.StackSummary.extract(
+                traceback.walk_tb(exc_info.traceback),
+                limit=self.traceback_limit,
+                lookup_lines=False,
+            )
+        else:
+            frames = None
+        record = (self._clock(), boundary.name, event, _details(exc_info.value), frames, extra)
+        with self._lock:
+            queue = self._queue
+            if self._closed:
+                self.dropped += 1
+                return
+            if len(queue) >= self.maxsize:
+                self.dropped += 1
+                if self.drop_policy == self.DROP_NEWEST:
+                    return
+                queue.popleft()
+            queue.append(record)
+            self.enqueued += 1
+            # otherwise, the background thread wakes up after the `flush_interval`
+            if len(queue) >= self.batch_size:
+                self._ready.notify()
+
+    @property
+    def pending(self) -> int:
+        """Number of the records in the queue."""
+        return len(self._queue)
+
+    def flush(self, timeout: t.Optional[float] = None) -> bool:
+        """
+        Waits until all the records queued so far are written. Returns False if they haven't
+        been within the `timeout` seconds.
+        """
+        with self._lock:
+            self._flushing += 1
+            self._ready.notify()
+            try:
+                return self._idle.wait_for(lambda: not self._queue and not self._busy, timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: t.Optional[float] = None) -> None:
+        """Writes the records still in the queue & stops the background thread."""
+        with self._lock:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join(timeout)
+
+    def __enter__(self) -> "QueueLogSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        queue = self._queue
+        while True:
+            with self._lock:
+                if not self._closed and (
+                    not queue or (len(queue) < self.batch_size and not self._flushing)
+                ):
+                    self._ready.wait(self.flush_interval)
+                batch = [queue.popleft() for _ in range(min(len(queue), self.batch_size))]
+                if not batch:
+                    self._idle.notify_all()
+                    if self._closed:
+                        return
+                    continue
+                self._busy = True
+            written, failed = self._write(batch)
+            with self._lock:
+                self.written += written
+                self.failed += failed
+                self._busy = False
+                if not queue:
+                    self._idle.notify_all()
+
+    def _write(self, batch: t.List[_Record]) -> t.Tuple[int, int]:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(self._format(record), default=repr))
+            except Exception:
+                # the error can't be logged: there's nowhere to report failures of the sink
+                pass
+        failed = len(batch) - len(lines)
+        if not lines:
+            return 0, failed
+        stream = self.stream or sys.stderr
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            return 0, len(batch)
+        return len(lines), failed
+
+    def _format(self, record: _Record) -> t.Dict[str, t.Any]:
+        timestamp, boundary_name, event, details, frames, extra = record
+        line = {
+            "time": timestamp,
+            "boundary": boundary_name,
+            "event": event,
+            "error": details,
+        }
+        if extra:
+            line.update(extra)
+        if isinstance(frames, ExceptionInfo):
+            line["traceback"] = "".join(
+                traceback.format_exception(
+                    frames.type, frames.value, frames.traceback, self.traceback_limit
+                )
+            )
+        elif frames is not None:
+            line["traceback"] = "".join(frames.format())
+        return line
@@ -0,0 +1,199 @@
+"""
+Manifest of error catalogs: a JSON file describing all the errors of the catalogs, so that
+a service can tell which codes exist, what their hints & catalog paths are without importing
+the catalogs. Error classes are imported only on demand.
+
+Export the catalogs defined in modules into a manifest:
+
+    $ python -m pca.packages.errors export my_app.errors -o errors.json
+
+Check whether the manifest is up to date, ie. in CI:
+
+    $ python -m pca.packages.errors check errors.json my_app.errors
+"""
+import argparse
+import importlib
+import json
+import sys
+import typing as t
+
+from .catalog import ErrorCatalogMeta
+from .registry import (
+    ErrorRegistry,
+    error_registry,
+)
+from .types import ExceptionWithCodeType
+
+
+__all__ = (
+    "Manifest",
+    "ManifestEntry",
+)
+
+MANIFEST_VERSION = 1
+
+
+class ManifestEntry(t.NamedTuple):
+    module: str
+    catalog: str
+    code: str
+    hint: str
+
+    @property
+    def path(self) -> str:
+        return f"{self.catalog}.{self.code}"
+
+
+class Manifest:
+    """
+    Errors described by a manifest. Lookups are answered from the manifest itself; an error
+    class is imported only when asked for with `error_class`. Dotted paths of the errors have
+    to be unique, so catalogs of the same path in different modules raise ValueError.
+
+    >>> manifest = Manifest.load(open("errors.json"))
+    >>> manifest["Catalog.Nested.NotFound"].hint
+    'The resource has not been found.'
+    >>> manifest.error_class("NotFound")
+    Catalog.Nested.NotFound
+    """
+
+    def __init__(
+        self, entries: t.Iterable[ManifestEntry], registry: ErrorRegistry = error_registry
+    ) -> None:
+        self.registry = registry
+        self._by_path: t.Dict[str, ManifestEntry] = {}
+        for entry in entries:
+            known = self._by_path.get(entry.path)
+            if known is not None and known.module != entry.module:
+                raise ValueError(
+                    f"Catalogs of many modules define {entry.path!r}: "
+                    f"{known.module!r} & {entry.module!r}."
+                )
+            self._by_path[entry.path] = entry
+        self._by_code: t.Dict[str, t.List[ManifestEntry]] = {}
+        for entry in self._by_path.values():
+            self._by_code.setdefault(entry.code, []).append(entry)
+
+    @classmethod
+    def from_catalogs(
+        cls, catalogs: t.Iterable[ErrorCatalogMeta], registry: ErrorRegistry = error_registry
+    ) -> "Manifest":
+        """Describes all the errors of the `catalogs`, including their nested catalogs."""
+        return cls(
+            (
+                ManifestEntry(
+                    e.catalog.__module__,  # type: ignore
+                    e.catalog.__qualname__,  # type: ignore
+                    e.code,
+                    e.hint,
+                )
+                for catalog in catalogs
+                for e in catalog
+            ),
+            registry,
+        )
+
+    @classmethod
+    def from_modules(
+        cls, module_names: t.Iterable[str], registry: ErrorRegistry = error_registry
+    ) -> "Manifest":
+        """Describes all the catalogs defined at the top level of the modules."""
+        catalogs = []
+        for module_name in module_names:
+            module = importlib.import_module(module_name)
+            catalogs.extend(
+                value
+                for value in vars(module).values()
+                if isinstance(value, ErrorCatalogMeta) and value.__module__ == module_name
+            )
+        return cls.from_catalogs(catalogs, registry)
+
+    @classmethod
+    def load(cls, fp: t.TextIO, registry: ErrorRegistry = error_registry) -> "Manifest":
+        data = json.load(fp)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported version of the manifest: {data.get('version')!r}")
+        return cls((ManifestEntry(**e) for e in data["errors"]), registry)
+
+    def dump(self, fp: t.TextIO) -> None:
+        errors = [e._asdict() for e in self]
+        json.dump({"version": MANIFEST_VERSION, "errors": errors}, fp, indent=2)
+        fp.write("\n")
+
+    def __iter__(self) -> t.Iterator[ManifestEntry]:
+        return iter(self._by_path.values())
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def __getitem__(self, key: str) -> ManifestEntry:
+        """
+        Returns the entry of the error by its dotted path or its bare code.
+        Raises KeyError if there's no such error or the bare code is ambiguous.
+        """
+        entry = self._by_path.get(key)
+        if entry is not None:
+            return entry
+        same_code = self._by_code.get(key, ())
+        if len(same_code) > 1:
+            raise KeyError(f"Code {key!r} is ambiguous: {[e.path for e in same_code]!r}.")
+        if not same_code:
+            raise KeyError(key)
+        return same_code[0]
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def find(self, code: str) -> t.Tuple[ManifestEntry, ...]:
+        """Returns the entries of all the errors with the bare `code`."""
+        return tuple(self._by_code.get(code, ()))
+
+    def error_class(self, key: str) -> ExceptionWithCodeType:
+        """Returns the error class by its dotted path or bare code, importing its module."""
+        entry = self[key]
+        importlib.import_module(entry.module)
+        return self.registry.in_module(entry.module, entry.path)
+
+    def diff(self, other: "Manifest") -> t.Dict[str, t.Tuple[str, str]]:
+        """
+        Returns errors that differ between the manifests: dotted paths with the descriptions
+        of both versions, an empty string for the missing one.
+        """
+        result = {}
+        for path in sorted(self._by_path.keys() | other._by_path.keys()):
+            mine, theirs = self._by_path.get(path), other._by_path.get(path)
+            if mine != theirs:
+                result[path] = (_describe(mine), _describe(theirs))
+        return result
+
+
+def _describe(entry: t.Optional[ManifestEntry]) -> str:
+    return f"{entry.module}:{entry.path} {entry.hint!r}" if entry else ""
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pca.packages.errors",
+        description="Exports catalogs of errors into a manifest or checks the manifest.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="export catalogs defined in the modules")
+    export.add_argument("modules", nargs="+")
+    export.add_argument("-o", "--output", type=argparse.FileType("w"), default=sys.stdout)
+    check = commands.add_parser("check", help="check the manifest against the modules")
+    check.add_argument("manifest", type=argparse.FileType("r"))
+    check.add_argument("modules", nargs="+")
+    args = parser.parse_args(argv)
+
+    manifest = Manifest.from_modules(args.modules)
+    if args.command == "export":
+        manifest.dump(args.output)
+        return 0
+    differences = Manifest.load(args.manifest).diff(manifest)
+    for path, (expected, actual) in differences.items():
+        print(f"{path}:\n  manifest: {expected or '-'}\n  modules:  {actual or '-'}")
+    return 1 if differences else 0
@@ -0,0 +1,192 @@
+import bisect
+import threading
+import typing as t
+import weakref
+
+
+__all__ = (
+    "BoundaryMetrics",
+    "DEFAULT_LATENCY_BUCKETS",
+)
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+
+class _Shard:
+    """Counters of a single thread; only this thread writes to them."""
+
+    __slots__ = ("outcomes", "codes", "latencies", "thread")
+
+    def __init__(self, thread: t.Optional[threading.Thread] = None) -> None:
+        self.outcomes: t.Dict[t.Tuple[str, str], int] = {}
+        self.codes: t.Dict[t.Tuple[str, str, str], int] = {}
+        # boundary name -> [count for each bucket..., count over the last bucket, total, sum]
+        self.latencies: t.Dict[str, t.List[float]] = {}
+        self.thread = weakref.ref(thread) if thread is not None else None
+
+    def is_dead(self) -> bool:
+        thread = self.thread() if self.thread is not None else None
+        return thread is None or not thread.is_alive()
+
+    def add(self, other: "_Shard") -> None:
+        for key, count in other.outcomes.items():
+            self.outcomes[key] = self.outcomes.get(key, 0) + count
+        for code_key, count in other.codes.items():
+            self.codes[code_key] = self.codes.get(code_key, 0) + count
+        for name, histogram in other.latencies.items():
+            total = self.latencies.get(name)
+            if total is None:
+                self.latencies[name] = list(histogram)
+            else:
+                self.latencies[name] = [a + b for a, b in zip(total, histogram)]
+
+
+class BoundaryMetrics:
+    """
+    In-process counters of what happened at error boundaries, to be exported to a metrics
+    system. Pass an instance to `ErrorBoundary` to have it counted:
+
+    >>> metrics = BoundaryMetrics()
+    >>> boundary = ErrorBoundary(name="api", metrics=metrics)
+
+    For each boundary, it counts its outcomes ("passed", "suppressed", "propagated",
+    "transformed"), the outcomes for each error code and the latency of the functions
+    the boundary decorates, in a histogram of fixed buckets.
+
+    Each thread writes to its own shard of counters, so recording takes no locks. Shards are
+    merged on `snapshot`. Shards of threads that have ended are folded into a single one then,
+    or when new threads have doubled the number of shards, so that thread churn doesn't make
+    them pile up.
+    """
+
+    OUTCOMES = ("passed", "suppressed", "propagated", "transformed")
+
+    def __init__(self, latency_buckets: t.Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: t.List[_Shard] = []
+        # counters of the threads that have ended
+        self._ended = _Shard()
+        # number of shards at which the ones of ended threads are folded
+        self._fold_at = 8
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                if len(self._shards) >= self._fold_at:
+                    self._fold_ended()
+            return shard
+
+    def _fold_ended(self) -> None:
+        # called with the lock held; no thread writes to the shard of an ended thread anymore
+        shards = []
+        for shard in self._shards:
+            if shard.is_dead():
+                self._ended.add(shard)
+            else:
+                shards.append(shard)
+        self._shards = shards
+        self._fold_at = max(8, 2 * len(shards))
+
+    def record(self, boundary_name: str, outcome: str, code: t.Optional[str] = None) -> None:
+        """Counts an `outcome` of the boundary, for the `code` of the error if there's one."""
+        shard = self._shard()
+        key = (boundary_name, outcome)
+        outcomes = shard.outcomes
+        outcomes[key] = outcomes.get(key, 0) + 1
+        if code is not None:
+            code_key = (boundary_name, code, outcome)
+            codes = shard.codes
+            codes[code_key] = codes.get(code_key, 0) + 1
+
+    def observe_latency(self, boundary_name: str, seconds: float) -> None:
+        """Adds a duration of a call of a function decorated by the boundary to its histogram."""
+        latencies = self._shard().latencies
+        histogram = latencies.get(boundary_name)
+        if histogram is None:
+            histogram = latencies[boundary_name] = [0] * (len(self.latency_buckets) + 3)
+        histogram[bisect.bisect_left(self.latency_buckets, seconds)] += 1
+        histogram[-2] += 1
+        histogram[-1] += seconds
+
+    def snapshot(self) -> t.Dict[str, t.Dict[str, t.Any]]:
+        """
+        Returns the counters merged from all the threads, as plain dicts:
+
+        {
+            "api": {
+                "outcomes": {"passed": 10, "suppressed": 1, "propagated": 0, "transformed": 0},
+                "codes": {"NotFound": {"suppressed": 1}},
+                "latency": {
+                    "buckets": [0.0001, 0.0005, ...],
+                    "counts": [3, 7, ..., 0],  # the last one is over the last bucket
+                    "count": 10,
+                    "sum": 0.0042,
+                },
+            },
+        }
+        """
+        with self._lock:
+            self._fold_ended()
+            ended = _Shard()
+            ended.add(self._ended)
+            shards = [ended, *self._shards]
+        result: t.Dict[str, t.Dict[str, t.Any]] = {}
+
+        def boundary_entry(name: str) -> t.Dict[str, t.Any]:
+            entry = result.get(name)
+            if entry is None:
+                entry = result[name] = {
+                    "outcomes": dict.fromkeys(self.OUTCOMES, 0),
+                    "codes": {},
+                    "latency": {
+                        "buckets": list(self.latency_buckets),
+                        "counts": [0] * (len(self.latency_buckets) + 1),
+                        "count": 0,
+                        "sum": 0.0,
+                    },
+                }
+            return entry
+
+        for shard in shards:
+            # copies are made by C code, so they are consistent even if the owning thread
+            # writes to the shard at the same time
+            for (name, outcome), count in shard.outcomes.copy().items():
+                boundary_entry(name)["outcomes"][outcome] += count
+            for (name, code, outcome), count in shard.codes.copy().items():
+                code_entry = boundary_entry(name)["codes"].setdefault(code, {})
+                code_entry[outcome] = code_entry.get(outcome, 0) + count
+            for name, histogram in shard.latencies.copy().items():
+                histogram = list(histogram)
+                latency = boundary_entry(name)["latency"]
+                for i, count in enumerate(histogram[:-2]):
+                    latency["counts"][i] += count
+                latency["count"] += histogram[-2]
+                latency["sum"] += histogram[-1]
+        return result
+
+    def reset(self) -> None:
+        """Drops all the counters."""
+        with self._lock:
+            self._shards = []
+            self._ended = _Shard()
+            self._fold_at = 8
+            self._local = threading.local()
@@ -0,0 +1,350 @@
+import typing as t
+import weakref
+
+from .types import ExceptionWithCodeType
+
+
+if t.TYPE_CHECKING:
+    from .catalog import ErrorCatalogMeta
+
+
+__all__ = (
+    "ErrorRegistry",
+    "error_registry",
+)
+
+
+# the registry holds errors by weak references, see `ErrorRegistry`
+_Ref = "weakref.ref[ExceptionWithCodeType]"
+
+
+class _Node:
+    """A node of the trie of catalog paths; each segment of a dotted path is one level."""
+
+    __slots__ = ("children", "errors", "claims", "bases")
+
+    def __init__(self) -> None:
+        self.children: t.Dict[str, "_Node"] = {}
+        self.errors: t.Dict[str, _Ref] = {}
+        # error classes of the codes claimed by catalogs of the same path in many modules,
+        # by the modules; only the codes that have collided are there
+        self.claims: t.Dict[str, t.Dict[str, _Ref]] = {}
+        # nodes of all the catalogs the catalog of this node inherits from, in order of the MRO
+        self.bases: t.List["_Node"] = []
+
+    def child(self, segment: str) -> t.Optional["_Node"]:
+        child = self.children.get(segment)
+        if child is None:
+            for base in self.bases:
+                child = base.children.get(segment)
+                if child is not None:
+                    break
+        return child
+
+    def get(self, code: str) -> t.Optional[ExceptionWithCodeType]:
+        """The error registered last with the code, or claimed by any module if it's gone."""
+        error_class = _deref(self.errors.get(code))
+        if error_class is None and code in self.claims:
+            claimed = _alive(self.claims[code].values())
+            error_class = claimed[-1] if claimed else None
+        return error_class
+
+    def claimed(self, code: str) -> t.Dict[str, ExceptionWithCodeType]:
+        """The errors of the code by the modules that have claimed it, if it has collided."""
+        claims = self.claims.get(code, {})
+        errors = zip(claims, map(_deref, claims.values()))
+        return {module: e for module, e in errors if e is not None}
+
+    def owner(self, code: str) -> t.Optional["_Node"]:
+        """The node defining the code: this one or, for an inherited error, one of its bases."""
+        for node in (self, *self.bases):
+            if node.get(code) is not None:
+                return node
+        return None
+
+
+def _deref(ref: t.Optional[_Ref]) -> t.Optional[ExceptionWithCodeType]:
+    return ref() if ref is not None else None
+
+
+def _alive(refs: t.Iterable[_Ref]) -> t.List[ExceptionWithCodeType]:
+    errors = [ref() for ref in refs]
+    return [e for e in errors if e is not None]
+
+
+def _materialize(error_class: t.Any) -> ExceptionWithCodeType:
+    # lazy errors (see `LazyError`) are registered as placeholders & built when looked up
+    return error_class if isinstance(error_class, type) else error_class.materialize()
+
+
+def _same(error_class: t.Any) -> t.Any:
+    return error_class
+
+
+class ErrorRegistry:
+    """
+    Index of all the errors attached to catalogs, which makes it possible to resolve an error
+    class by its code.
+
+    An error can be looked up by its bare code (if it's unique among all the catalogs) or by its
+    dotted path, ie. path of the catalog followed by the code of the error:
+
+    >>> error_registry["CompositeCatalog.NestedCatalog.NestedError"]
+    CompositeCatalog.NestedCatalog.NestedError
+
+    A catalog included into another one is reachable by both its paths & errors inherited
+    by a catalog are reachable by its path too. If catalogs of the same path in different
+    modules define errors with the same code, the dotted path of the errors is ambiguous,
+    just like a bare code of many errors, and looking it up raises KeyError.
+
+    The registry holds the errors by weak references, so errors of catalogs that are gone,
+    ie. ones defined in functions, are dropped.
+    """
+
+    def __init__(self) -> None:
+        # incremented on each change of the registry
+        self.generation = 0
+        self._root = _Node()
+        self._by_code: t.Dict[str, t.List[_Ref]] = {}
+        self._collisions: t.Dict[str, t.List[_Ref]] = {}
+        # memoized results of lookups; cleared on any registration & when an error is collected
+        self._resolved: t.Dict[str, _Ref] = {}
+        self._resolved_pairs: t.Dict[t.Tuple[t.Optional[str], str], t.Optional[_Ref]] = {}
+
+    def _clear_resolved(self, *args: t.Any) -> None:
+        self.generation += 1
+        self._resolved.clear()
+        self._resolved_pairs.clear()
+
+    def _node(self, path: str) -> _Node:
+        node = self._root
+        for segment in path.split(".") if path else ():
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node()
+            node = child
+        return node
+
+    def _find_node(self, path: str) -> t.Optional[_Node]:
+        node: t.Optional[_Node] = self._root
+        for segment in path.split(".") if path else ():
+            node = node.child(segment)  # type: ignore
+            if node is None:
+                return None
+        return node
+
+    def _same_code(self, code: str) -> t.List[ExceptionWithCodeType]:
+        return _alive(self._by_code.get(code, ()))
+
+    def register(self, error_class: ExceptionWithCodeType) -> None:
+        """Adds an error class, attached to a catalog, to the registry."""
+        self.register_many((error_class,))
+
+    def register_many(self, error_classes: t.Iterable[ExceptionWithCodeType]) -> None:
+        """Adds error classes, ie. all the errors of a catalog, to the registry at once."""
+        catalog_path, node = None, None
+        for error_class in error_classes:
+            catalog = error_class.catalog
+            if catalog is None:
+                continue
+            if catalog.__qualname__ != catalog_path:
+                catalog_path = catalog.__qualname__
+                node = self._node(catalog_path)
+            code = error_class.code
+            module = catalog.__module__
+            registered = _deref(node.errors.get(code))  # type: ignore
+            claims = node.claims.get(code)  # type: ignore
+            if claims is not None:
+                registered = _deref(claims.get(module)) or node.get(code)  # type: ignore
+            # a class built from a lazy placeholder takes its place
+            replacing = getattr(registered, "materialized", None) is error_class
+            if registered is not None and registered is not error_class and not replacing:
+                path = f"{catalog_path}.{code}"
+                collisions = self._collisions.setdefault(path, [weakref.ref(registered)])
+                collisions.append(weakref.ref(error_class))
+                registered_module = registered.catalog.__module__  # type: ignore
+                if registered_module == module:
+                    # a class of the same module, ie. of a reloaded module, replaces the other
+                    replacing = True
+                elif claims is None:
+                    claims = node.claims[code] = {  # type: ignore
+                        registered_module: node.errors[code]  # type: ignore
+                    }
+            # the callback drops lookups memoized while the error was there
+            ref = weakref.ref(error_class, self._clear_resolved)
+            if claims is not None:
+                claims[module] = ref
+            node.errors[code] = ref  # type: ignore
+            same_code = self._by_code.get(code)
+            if same_code is None:
+                self._by_code[code] = [ref]
+                continue
+            same_code[:] = [r for r in same_code if r() is not None]
+            errors = [r() for r in same_code]
+            if replacing and registered in errors:
+                same_code[errors.index(registered)] = ref
+            elif error_class not in errors:
+                same_code.append(ref)
+        if catalog_path is not None:
+            self._clear_resolved()
+
+    def link(self, catalog: "ErrorCatalogMeta", name: str, nested: "ErrorCatalogMeta") -> None:
+        """Makes the `nested` catalog reachable as the `name` field of the `catalog`."""
+        path = f"{catalog.__qualname__}.{name}"
+        if nested.__qualname__ == path:
+            return
+        parent = self._node(catalog.__qualname__)
+        parent.children[name] = self._node(nested.__qualname__)
+        self._clear_resolved()
+
+    def inherit(self, catalog: "ErrorCatalogMeta", bases: t.Iterable["ErrorCatalogMeta"]) -> None:
+        """
+        Makes the errors & nested catalogs of the `bases`, ie. all the catalogs in the MRO
+        of the `catalog`, reachable by the `catalog` path too.
+        """
+        node = self._node(catalog.__qualname__)
+        node.bases = [self._node(base.__qualname__) for base in bases]
+        if node.bases:
+            self._clear_resolved()
+
+    def __getitem__(self, key: str) -> ExceptionWithCodeType:
+        """
+        Returns the error class registered under the dotted path or the bare code.
+        Raises KeyError if there's no such error or the path or the bare code is ambiguous.
+        """
+        ref = self._resolved.get(key)
+        error_class = ref() if ref is not None else None
+        if error_class is not None:
+            return error_class
+        path, _, code = key.rpartition(".")
+        if path:
+            node = self._find_node(path)
+            node = node.owner(code) if node is not None else None
+            if node is None:
+                raise KeyError(key)
+            claims = node.claimed(code)
+            if len(claims) > 1:
+                raise KeyError(f"Path {key!r} is ambiguous: {list(claims.values())!r}.")
+            error_class = node.get(code)
+        else:
+            same_code = self._same_code(code)
+            if len(same_code) > 1:
+                raise KeyError(f"Code {key!r} is ambiguous: {same_code!r}.")
+            error_class = same_code[0] if same_code else None
+        if error_class is None:
+            raise KeyError(key)
+        error_class = _materialize(error_class)
+        self._resolved[key] = weakref.ref(error_class)
+        return error_class
+
+    def in_module(self, module: str, key: str) -> ExceptionWithCodeType:
+        """
+        Returns the error class registered under the dotted path by a catalog of the `module`,
+        even if catalogs of other modules have claimed the path too.
+        Raises KeyError if there's no such error.
+        """
+        path, _, code = key.rpartition(".")
+        node = self._find_node(path) if path else None
+        node = node.owner(code) if node is not None else None
+        if node is None:
+            raise KeyError(f"{module}:{key}")
+        error_class = node.claimed(code).get(module) or node.get(code)
+        if error_class is None or error_class.catalog.__module__ != module:
+            raise KeyError(f"{module}:{key}")
+        return _materialize(error_class)
+
+    def claims(self, key: str) -> t.Dict[str, ExceptionWithCodeType]:
+        """
+        Returns the errors registered under the dotted path by the modules of their catalogs,
+        more than one if the path is ambiguous. Lazy errors are returned as their placeholders.
+        """
+        path, _, code = key.rpartition(".")
+        node = self._find_node(path) if path else None
+        node = node.owner(code) if node is not None else None
+        if node is None:
+            return {}
+        claims = node.claimed(code)
+        if claims:
+            return claims
+        error_class = node.get(code)
+        return {error_class.catalog.__module__: error_class}  # type: ignore
+
+    def get(
+        self, key: str, default: t.Optional[ExceptionWithCodeType] = None
+    ) -> t.Optional[ExceptionWithCodeType]:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def resolve(self, catalog: t.Optional[str], code: str) -> ExceptionWithCodeType:
+        """
+        Returns the error class described by the `catalog` & `code` fields of the serialized form
+        of an error (see `ExceptionWithCode.to_dict`). The `catalog` might be either a path
+        or, as in forms produced by older versions, just a name of the catalog. Results are
+        memoized, so it's a single dict lookup for any pair seen before.
+        """
+        key = (catalog, code)
+        try:
+            ref = self._resolved_pairs[key]
+        except KeyError:
+            error_class = self._resolve(catalog, code)
+            ref = self._resolved_pairs[key] = (
+                weakref.ref(error_class) if error_class is not None else None
+            )
+        error_class = ref() if ref is not None else None
+        if error_class is None:
+            raise KeyError(f"{catalog}.{code}" if catalog else code)
+        return error_class
+
+    def _resolve(self, catalog: t.Optional[str], code: str) -> t.Optional[ExceptionWithCodeType]:
+        if not catalog:
+            return self.get(code)
+        error_class = self.get(f"{catalog}.{code}")
+        if error_class is not None:
+            return error_class
+        candidates = [e for e in self._same_code(code) if str(e.catalog) == catalog]
+        return _materialize(candidates[0]) if len(candidates) == 1 else None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def find(self, code: str) -> t.Tuple[ExceptionWithCodeType, ...]:
+        """Returns all the error classes registered with the bare `code`, in order."""
+        return tuple(_materialize(e) for e in self._same_code(code))
+
+    def subtree(self, path: str = "", build: bool = True) -> t.Iterator[ExceptionWithCodeType]:
+        """
+        Iterates over all the errors of the catalog under the `path` and of its nested catalogs.
+        Empty path means all the registered errors. Lazy errors are built, see `LazyError`,
+        unless `build` is false: then their placeholders are yielded.
+        """
+        get = _materialize if build else _same
+        node = self._find_node(path)
+        if node is None:
+            return
+        visited: t.Set[int] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            for code in list(node.errors):
+                claims = node.claimed(code)
+                if claims:
+                    yield from map(get, claims.values())
+                else:
+                    error_class = node.get(code)
+                    if error_class is not None:
+                        yield get(error_class)
+            stack.extend(reversed(list(node.children.values())))
+
+    @property
+    def collisions(self) -> t.Dict[str, t.Tuple[ExceptionWithCodeType, ...]]:
+        """Dotted paths that were claimed by more than one error class."""
+        collisions = ((path, _alive(refs)) for path, refs in self._collisions.items())
+        return {path: tuple(errors) for path, errors in collisions if errors}
+
+
+error_registry = ErrorRegistry()
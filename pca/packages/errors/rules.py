@@ -0,0 +1,92 @@
+import enum
+import threading
+import typing as t
+
+from dataclasses import dataclass
+
+from .catalog import ErrorCatalogMeta
+from .types import (
+    ExceptionInfo,
+    ExceptionTypeOrTypes,
+)
+
+
+__all__ = (
+    "Action",
+    "DecisionTable",
+    "Rule",
+)
+
+
+class Action(enum.Enum):
+    PROPAGATE = "propagate"
+    SUPPRESS = "suppress"
+    TRANSFORM = "transform"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Tells what an `ErrorBoundary` should do with exceptions matching the rule, ie. instances of
+    the given exception type(s) or of errors of the given `ErrorCatalog`:
+
+    >>> Rule(KeyError, Action.SUPPRESS)
+    >>> Rule(SomeCatalog, Action.PROPAGATE)
+    >>> Rule((TimeoutError, ConnectionError), Action.TRANSFORM, lambda exc_info: Unavailable())
+
+    `transform` is required for the TRANSFORM action; it gets the `ExceptionInfo` and returns
+    the exception to be raised instead.
+    """
+
+    match: t.Union[ExceptionTypeOrTypes, ErrorCatalogMeta]
+    action: Action
+    transform: t.Optional[t.Callable[[ExceptionInfo], t.Optional[Exception]]] = None
+
+    def __post_init__(self) -> None:
+        if (self.action is Action.TRANSFORM) != (self.transform is not None):
+            raise ValueError("Only a rule with the TRANSFORM action has to define `transform`.")
+
+    @property
+    def types(self) -> t.Tuple[t.Type[BaseException], ...]:
+        match = self.match
+        if isinstance(match, ErrorCatalogMeta):
+            return match.all
+        return match if isinstance(match, tuple) else (match,)  # type: ignore
+
+
+_NO_MATCH = Rule((), Action.PROPAGATE)
+
+
+class DecisionTable:
+    """
+    Ordered rules compiled into a lookup by the concrete type of an exception: the first rule
+    matching the type is found once and cached, so deciding on an exception is a single dict
+    lookup no matter how many rules there are. When no rule matches, the exception is
+    propagated.
+
+    Up to `maxsize` exception types are cached; the ones cached earliest are evicted first.
+    Errors of a catalog are taken as they are when the table is built.
+    """
+
+    def __init__(self, rules: t.Iterable[Rule], maxsize: int = 1024) -> None:
+        self.rules = tuple(rules)
+        self.maxsize = maxsize
+        self._compiled = tuple((rule.types, rule) for rule in self.rules)
+        self._cache: t.Dict[type, Rule] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, exc_type: t.Type[BaseException]) -> Rule:
+        """Returns the first rule matching the `exc_type`."""
+        try:
+            return self._cache[exc_type]
+        except KeyError:
+            return self._resolve(exc_type)
+
+    def _resolve(self, exc_type: t.Type[BaseException]) -> Rule:
+        rule = next((r for types, r in self._compiled if issubclass(exc_type, types)), _NO_MATCH)
+        cache = self._cache
+        with self._lock:
+            if cache and len(cache) >= self.maxsize:
+                del cache[next(iter(cache))]
+            cache[exc_type] = rule
+        return rule
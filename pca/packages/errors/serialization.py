@@ -0,0 +1,75 @@
+import json
+import typing as t
+
+from .ids import (
+    ErrorIds,
+    error_ids,
+)
+from .registry import (
+    ErrorRegistry,
+    error_registry,
+)
+from .types import (
+    DictStrAny,
+    ExceptionWithCode,
+    ExceptionWithCodeType,
+)
+
+
+__all__ = (
+    "from_dict",
+    "iter_from_dicts",
+    "iter_from_json_lines",
+)
+
+
+def _error_class(
+    data: t.Mapping[str, t.Any], registry: ErrorRegistry, ids: ErrorIds
+) -> ExceptionWithCodeType:
+    error_id = data.get("id")
+    if error_id is not None:
+        return ids[error_id]
+    return registry.resolve(data.get("catalog"), data["code"])
+
+
+def from_dict(
+    data: t.Mapping[str, t.Any],
+    registry: ErrorRegistry = error_registry,
+    ids: ErrorIds = error_ids,
+):
+    """
+    Rebuilds an error instance from its serialized form, as returned by
+    `ExceptionWithCode.to_dict`. The error class has to be registered in the `registry`,
+    ie. attached to an ErrorCatalog. A form with the numeric ID of the error is resolved
+    by the `ids`.
+
+    Raises KeyError if there's no such error class.
+    """
+    return _error_class(data, registry, ids)(**(data.get("kwargs") or {}))
+
+
+def iter_from_dicts(
+    payloads: t.Iterable[t.Mapping[str, t.Any]],
+    registry: ErrorRegistry = error_registry,
+    ids: ErrorIds = error_ids,
+) -> t.Iterator[ExceptionWithCode]:
+    """Lazily rebuilds error instances from an iterable of their serialized forms."""
+    for data in payloads:
+        kwargs: t.Optional[DictStrAny] = data.get("kwargs")
+        yield _error_class(data, registry, ids)(**(kwargs or {}))
+
+
+def iter_from_json_lines(
+    source: t.Iterable[t.Union[str, bytes]],
+    registry: ErrorRegistry = error_registry,
+    ids: ErrorIds = error_ids,
+) -> t.Iterator[ExceptionWithCode]:
+    """
+    Lazily rebuilds error instances from JSON lines, each line being a serialized error.
+    The `source` might be a file object or any iterable of lines. Blank lines are skipped.
+
+    Only one line is held in the memory at a time.
+    """
+    loads = json.loads
+    payloads = (loads(line) for line in source if line.strip())
+    return iter_from_dicts(payloads, registry, ids)
@@ -0,0 +1,90 @@
+import typing as t
+
+from .rules import (
+    Action,
+    DecisionTable,
+    Rule,
+)
+from .types import (
+    ExceptionInfo,
+    ExceptionTypeOrTypes,
+    ExceptionWithCode,
+    ExceptionWithCodeType,
+)
+
+
+__all__ = ("ExceptionTranslator",)
+
+AttributeSource = t.Union[str, t.Callable[[BaseException], t.Any]]
+
+_MISSING = object()
+
+
+class _Translation:
+    __slots__ = ("error_class", "sources")
+
+    def __init__(
+        self, error_class: ExceptionWithCodeType, sources: t.Mapping[str, AttributeSource]
+    ) -> None:
+        self.error_class = error_class
+        self.sources = tuple(sources.items())
+
+    def __call__(self, exc_info: ExceptionInfo) -> ExceptionWithCode:
+        error = exc_info.value
+        kwargs = {}
+        for name, source in self.sources:
+            if callable(source):
+                kwargs[name] = source(error)
+            else:
+                value = getattr(error, source, _MISSING)
+                if value is not _MISSING:
+                    kwargs[name] = value
+        return self.error_class(**kwargs)
+
+
+class ExceptionTranslator:
+    """
+    Translates foreign exceptions, ie. raised by 3rd party code, into errors of your catalogs.
+
+    >>> translator = ExceptionTranslator()
+    >>> translator.register(KeyError, Catalog.NotFound, key=lambda e: e.args[0])
+    >>> translator.register(DriverTimeout, Catalog.Unavailable, attrs=("host", "timeout"))
+
+    Selected attributes of the exception are copied into kwargs of the error: `attrs` names
+    the attributes to copy (missing ones are skipped) and keyword arguments give functions
+    computing a value from the exception.
+
+    The translator may be used as the `transform_propagated_exception` hook or as
+    the `transform` of a `Rule`, and can be shared by many boundaries:
+
+    >>> boundary = ErrorBoundary(catch=(), transform_propagated_exception=translator)
+
+    The first registered translation matching an exception is used, so more specific types
+    should be registered first. The translation for a type of exception is looked up once and
+    cached; registering a new translation drops the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._rules: t.List[Rule] = []
+        self._table = DecisionTable(self._rules, maxsize)
+
+    def register(
+        self,
+        exc_types: ExceptionTypeOrTypes,
+        error_class: ExceptionWithCodeType,
+        attrs: t.Iterable[str] = (),
+        **sources: t.Callable[[BaseException], t.Any],
+    ) -> None:
+        """Makes exceptions of `exc_types` translated into instances of `error_class`."""
+        translation = _Translation(error_class, {**{a: a for a in attrs}, **sources})
+        self._rules.append(Rule(exc_types, Action.TRANSFORM, translation))
+        self._table = DecisionTable(self._rules, self.maxsize)
+
+    def translate(self, error: BaseException) -> t.Optional[ExceptionWithCode]:
+        """Returns the translated error or None if there's no translation for the `error`."""
+        return self(ExceptionInfo(type(error), error, error.__traceback__))
+
+    def __call__(self, exc_info: ExceptionInfo) -> t.Optional[ExceptionWithCode]:
+        transform = self._table.lookup(exc_info.type).transform
+        return transform(exc_info) if transform else None  # type: ignore
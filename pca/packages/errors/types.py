@@ -3,9 +3,12 @@ import typing as t
 from dataclasses import dataclass
 from types import TracebackType
 
+from .fingerprint import fingerprinter
+
 
 if t.TYPE_CHECKING:
     from .catalog import ErrorCatalog
+    from .ids import ErrorIds
 
 DictStrAny = t.Dict[str, t.Any]
 
@@ -24,8 +27,8 @@ class ExceptionWithCode(Exception):
     def __getattr__(self, *args, **kwargs) -> None:
         """Returns arbitrary fields."""
 
-    def to_dict(self) -> DictStrAny:
-        "Returns serializable form."
+    def to_dict(self, ids: t.Optional["ErrorIds"] = None) -> DictStrAny:
+        "Returns serializable form; with the numeric ID instead of the code if `ids` are given."
 
     def clone(self) -> "ExceptionWithCode":
         "Duplicates the `self` instance, updating its `kwargs` iff such update is defined."
@@ -37,6 +40,16 @@ class ExceptionWithCode(Exception):
     def is_conforming(self, error_class: t.Type[Exception]) -> bool:
         "Checks iff the instance conforms error type `error_class`."
 
+    def fingerprint(self) -> str:
+        "Returns the fingerprint of the instance, to group errors of the same kind & origin."
+
+
+class ErrorCatalogType(type):
+    """
+    Base of the metaclass of catalogs, `ErrorCatalogMeta`. Error classes recognize catalogs
+    by it without importing the `catalog` module, which depends on them.
+    """
+
 
 @dataclass(frozen=True)
 class ExceptionInfo:
@@ -44,11 +57,28 @@ class ExceptionInfo:
     value: BaseException
     traceback: TracebackType
 
+    def fingerprint(self) -> t.Optional[str]:
+        """
+        Returns the fingerprint of the exception with the traceback, see `Fingerprinter`,
+        or None if there's no exception.
+        """
+        return fingerprinter.of(self.type, self.traceback) if self.type else None
+
 
 def is_error_class(sth: t.Any) -> bool:
     return isinstance(sth, type) and issubclass(sth, Exception)
 
 
+def error_code(error: BaseException) -> str:
+    """
+    Returns the code of the error without rendering it, ie. its `code` if it's an instance
+    of an `ExceptionWithCode` or the name of its class otherwise. Cheap enough to be used
+    as a label of metrics or in a log record.
+    """
+    error_class = type(error)
+    return getattr(error_class, "code", None) or error_class.__name__
+
+
 ExceptionType = t.Type[Exception]
 ExceptionTypeOrTypes = t.Union[ExceptionType, t.Tuple[ExceptionType, ...]]
 ExceptionWithCodeType = t.Type[ExceptionWithCode]
@@ -0,0 +1,288 @@
+import struct
+import typing as t
+
+from .ids import (
+    ErrorIds,
+    error_ids,
+)
+from .registry import (
+    ErrorRegistry,
+    error_registry,
+)
+from .types import (
+    ExceptionWithCode,
+    ExceptionWithCodeType,
+)
+
+
+__all__ = (
+    "decode_many",
+    "encode_many",
+    "from_bytes",
+    "to_bytes",
+)
+
+# Layout of a frame, all numbers little-endian:
+#
+#   header:   magic "PE", version (B), flags (B), number of strings (I), number of errors (I)
+#   strings:  lengths of all the strings, then all their UTF-8 bytes; all the strings of
+#             the frame, ie. codes, catalog paths, names & values of kwargs, are stored once
+#             & referenced by their index
+#   errors:   index of the catalog path ("" for no catalog) & index of the code, or the numeric
+#             ID of the error (I) when the frame has the IDS flag, then number of kwargs (H)
+#             & pairs of: index of the name, value
+#
+# Indexes & lengths of strings are H, or I when the frame has the WIDE flag.
+# A value is a tag (B) followed by its payload, see `_encode_value`.
+MAGIC = b"PE"
+VERSION = 1
+WIDE = 0x01
+IDS = 0x02
+
+_HEADER = struct.Struct("<2sBBII")
+_LENGTH = struct.Struct("<I")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+# structs of an index of a string & of the beginning of an error, for both widths of indexes
+_NARROW_STRUCTS = (struct.Struct("<H"), struct.Struct("<HHH"))
+_WIDE_STRUCTS = (struct.Struct("<I"), struct.Struct("<IIH"))
+_ID_ERROR = struct.Struct("<IH")
+
+_INT_MIN = -(2**63)
+_INT_MAX = 2**63 - 1
+
+# tags of values
+_NONE = ord("N")
+_TRUE = ord("T")
+_FALSE = ord("F")
+_SMALL_INT = ord("i")
+_BIG_INT = ord("n")
+_FLOAT_TAG = ord("f")
+_STR = ord("s")
+_BYTES = ord("y")
+_LIST = ord("l")
+_TUPLE = ord("t")
+_DICT = ord("d")
+
+Buffer = t.Union[bytes, bytearray, memoryview]
+
+
+def _encode_value(
+    value: t.Any, fmt: t.List[str], values: t.List[t.Any], strings: t.Dict[str, int]
+) -> None:
+    # `fmt` collects the struct format of the frame, where "L" stands for an index of a string,
+    # to be replaced with the actual width of indexes; `values` collects the items to pack
+    kind = type(value)
+    if kind is str:
+        fmt.append("BL")
+        values += (_STR, strings.setdefault(value, len(strings)))
+    elif kind is int:
+        if _INT_MIN <= value <= _INT_MAX:
+            fmt.append("Bq")
+            values += (_SMALL_INT, value)
+        else:
+            raw = value.to_bytes((value.bit_length() + 8) // 8, "little", signed=True)
+            fmt.append(f"BI{len(raw)}s")
+            values += (_BIG_INT, len(raw), raw)
+    elif value is None:
+        fmt.append("B")
+        values.append(_NONE)
+    elif kind is bool:
+        fmt.append("B")
+        values.append(_TRUE if value else _FALSE)
+    elif kind is float:
+        fmt.append("Bd")
+        values += (_FLOAT_TAG, value)
+    elif kind is bytes:
+        fmt.append(f"BI{len(value)}s")
+        values += (_BYTES, len(value), value)
+    elif kind is list or kind is tuple:
+        fmt.append("BI")
+        values += (_LIST if kind is list else _TUPLE, len(value))
+        for item in value:
+            _encode_value(item, fmt, values, strings)
+    elif kind is dict:
+        fmt.append("BI")
+        values += (_DICT, len(value))
+        for key, item in value.items():
+            _encode_value(key, fmt, values, strings)
+            _encode_value(item, fmt, values, strings)
+    else:
+        raise TypeError(f"Object of type {kind.__name__} can't be encoded: {value!r}")
+
+
+def encode_many(errors: t.Iterable[ExceptionWithCode], ids: t.Optional[ErrorIds] = None) -> bytes:
+    """
+    Encodes errors into a compact binary frame. Strings, ie. codes, catalog paths and names
+    & values of kwargs, are stored once per frame, so encoding many errors at once is
+    considerably smaller than encoding each of them alone. If `ids` are given, errors are
+    identified by their numeric IDs instead of codes & catalog paths.
+
+    Values of kwargs may be None, bool, int, float, str, bytes and lists, tuples & dicts of
+    these; TypeError is raised for any other type.
+    """
+    # indexes of the strings, in order of appearance
+    strings: t.Dict[str, int] = {"": 0}
+    string = strings.setdefault
+    fmt: t.List[str] = []
+    values: t.List[t.Any] = []
+    count = 0
+    for error in errors:
+        catalog = error.catalog
+        kwargs = error.kwargs
+        if len(kwargs) > 0xFFFF:
+            raise ValueError(f"Too many kwargs to encode: {len(kwargs)}")
+        if ids is None:
+            fmt.append("LLH")
+            values += (
+                string(catalog.__qualname__, len(strings)) if catalog else 0,
+                string(error.code, len(strings)),
+                len(kwargs),
+            )
+        else:
+            fmt.append("IH")
+            values += (ids.id_of(error), len(kwargs))
+        for name, value in kwargs.items():
+            fmt.append("L")
+            values.append(string(name, len(strings)))
+            _encode_value(value, fmt, values, strings)
+        count += 1
+
+    raw_strings = [s.encode() for s in strings]
+    wide = len(strings) > 0xFFFF or max(map(len, raw_strings)) > 0xFFFF
+    width = "I" if wide else "H"
+    body = "".join(fmt).replace("L", width)
+    blob = b"".join(raw_strings)
+    return struct.pack(
+        f"{_HEADER.format}{len(raw_strings)}{width}{len(blob)}s{body}",
+        MAGIC,
+        VERSION,
+        (WIDE if wide else 0) | (IDS if ids is not None else 0),
+        len(raw_strings),
+        count,
+        *map(len, raw_strings),
+        blob,
+        *values,
+    )
+
+
+def _decode_value(
+    view: memoryview, offset: int, strings: t.List[str], index: struct.Struct
+) -> t.Tuple[t.Any, int]:
+    tag = view[offset]
+    offset += 1
+    if tag == _STR:
+        return strings[index.unpack_from(view, offset)[0]], offset + index.size
+    if tag == _SMALL_INT:
+        return _INT.unpack_from(view, offset)[0], offset + 8
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _FLOAT_TAG:
+        return _FLOAT.unpack_from(view, offset)[0], offset + 8
+    if tag == _BYTES or tag == _BIG_INT:
+        length = _LENGTH.unpack_from(view, offset)[0]
+        start = offset + 4
+        offset = start + length
+        if offset > len(view):
+            raise ValueError("Truncated data")
+        raw = bytes(view[start:offset])
+        return (raw if tag == _BYTES else int.from_bytes(raw, "little", signed=True)), offset
+    if tag == _LIST or tag == _TUPLE or tag == _DICT:
+        length = _LENGTH.unpack_from(view, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(length * 2 if tag == _DICT else length):
+            item, offset = _decode_value(view, offset, strings, index)
+            items.append(item)
+        if tag == _DICT:
+            return dict(zip(items[::2], items[1::2])), offset
+        return (items if tag == _LIST else tuple(items)), offset
+    raise ValueError(f"Unknown tag of a value: {tag:#x}")
+
+
+def _decode(view: memoryview, registry: ErrorRegistry, ids: ErrorIds) -> t.List[ExceptionWithCode]:
+    magic, version, flags, n_strings, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not an encoded frame of errors (version {VERSION})")
+    index, header = _WIDE_STRUCTS if flags & WIDE else _NARROW_STRUCTS
+    offset = _HEADER.size
+    lengths = struct.unpack_from(f"<{n_strings}{index.format[1]}", view, offset)
+    offset += n_strings * index.size
+    end = offset + sum(lengths)
+    if end > len(view):
+        raise ValueError("Truncated data")
+    text = str(view[offset:end], "utf-8")
+    strings = []
+    if len(text) == end - offset:
+        # ASCII only, so the text can be sliced by the lengths in bytes
+        start = 0
+        for length in lengths:
+            strings.append(text[start : start + length])
+            start += length
+    else:
+        for length in lengths:
+            strings.append(str(view[offset : offset + length], "utf-8"))
+            offset += length
+    offset = end
+
+    with_ids = flags & IDS
+    if with_ids:
+        header = _ID_ERROR
+    # error classes resolved within the frame, by the indexes of their catalog & code or the ID
+    resolved: t.Dict[t.Tuple[int, ...], ExceptionWithCodeType] = {}
+    errors = []
+    for _ in range(count):
+        record = header.unpack_from(view, offset)
+        offset += header.size
+        key, n_kwargs = record[:-1], record[-1]
+        error_class = resolved.get(key)
+        if error_class is None:
+            if with_ids:
+                error_class = ids[key[0]]
+            else:
+                error_class = registry.resolve(strings[key[0]] or None, strings[key[1]])
+            resolved[key] = error_class
+        kwargs = {}
+        for _ in range(n_kwargs):
+            name = strings[index.unpack_from(view, offset)[0]]
+            kwargs[name], offset = _decode_value(view, offset + index.size, strings, index)
+        errors.append(error_class(**kwargs))
+    if offset != len(view):
+        raise ValueError("Unexpected data after the last error")
+    return errors
+
+
+def decode_many(
+    data: Buffer, registry: ErrorRegistry = error_registry, ids: ErrorIds = error_ids
+) -> t.List[ExceptionWithCode]:
+    """
+    Rebuilds errors from a frame made by `encode_many`. The `data` might be any bytes-like
+    object, ie. a memoryview of a bigger buffer; it isn't copied. Errors identified by their
+    numeric IDs are resolved by the `ids`.
+
+    Raises ValueError if the data isn't a valid frame and KeyError if an error class isn't
+    registered in the `registry`.
+    """
+    try:
+        return _decode(memoryview(data).cast("B"), registry, ids)
+    except (struct.error, IndexError) as e:
+        raise ValueError("Truncated or corrupted data") from e
+
+
+def to_bytes(error: ExceptionWithCode, ids: t.Optional[ErrorIds] = None) -> bytes:
+    """Encodes a single error, see `encode_many`."""
+    return encode_many((error,), ids)
+
+
+def from_bytes(
+    data: Buffer, registry: ErrorRegistry = error_registry, ids: ErrorIds = error_ids
+) -> ExceptionWithCode:
+    """Rebuilds a single error encoded by `to_bytes`, see `decode_many`."""
+    errors = decode_many(data, registry, ids)
+    if len(errors) != 1:
+        raise ValueError(f"Expected a single error, got {len(errors)}")
+    return errors[0]
@@ -1,9 +1,29 @@
+import asyncio
+import gc
+import itertools
+import threading
+import time
+import tracemalloc
+import typing as t
+import weakref
+
 from collections import namedtuple
+from concurrent.futures import (
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+)
 
 import mock
 import pytest
 
-from pca.packages.errors import ErrorBoundary
+from pca.packages.errors import (
+    BoundaryHook,
+    BoundaryMetrics,
+    ErrorBoundary,
+    ExceptionInfo,
+    ItemResult,
+)
 
 
 Callbacks = namedtuple(
@@ -241,3 +261,765 @@ class TestCallbackErrors:
         callbacks.log_inner_error.assert_called_once_with(
             "on_suppress_exception", main_exception, callback_exception
         )
+
+
+class TestGenerators:
+    def test_exception_in_generator(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        def foo():
+            yield 1
+            raise exception
+
+        assert list(foo()) == [1]
+        assert catchall_boundary.exc_info.value is exception
+
+    def test_generator_return_value(self, catchall_boundary) -> None:
+        @catchall_boundary
+        def foo():
+            yield 1
+            return 2
+
+        def bar():
+            result = yield from foo()
+            yield result
+
+        assert list(bar()) == [1, 2]
+
+    def test_closed_early(self, callbacks) -> None:
+        metrics = BoundaryMetrics()
+        boundary = ErrorBoundary(name="api", metrics=metrics, **callbacks._asdict())
+        closed = []
+
+        @boundary
+        def foo():
+            try:
+                yield 1
+                yield 2  # pragma: no cover
+            finally:
+                closed.append(True)
+
+        for item in foo():
+            break
+        assert closed == [True]
+        callbacks.on_propagate_exception.assert_not_called()
+        callbacks.should_propagate_exception.assert_not_called()
+        assert "propagated" not in metrics.snapshot().get("api", {}).get("outcomes", {})
+
+    def test_async_closed_early(self, callbacks) -> None:
+        metrics = BoundaryMetrics()
+        boundary = ErrorBoundary(name="api", metrics=metrics, **callbacks._asdict())
+        closed = []
+
+        @boundary
+        async def foo():
+            try:
+                yield 1
+                yield 2  # pragma: no cover
+            finally:
+                closed.append(True)
+
+        async def consume():
+            generator = foo()
+            async for item in generator:
+                break
+            await generator.aclose()
+
+        asyncio.run(consume())
+        assert closed == [True]
+        callbacks.on_propagate_exception.assert_not_called()
+        callbacks.should_propagate_exception.assert_not_called()
+        assert "propagated" not in metrics.snapshot().get("api", {}).get("outcomes", {})
+
+    def test_generator_propagating(self, specific_boundary) -> None:
+        @specific_boundary
+        def foo():
+            yield 1
+            raise AnotherException()
+
+        with pytest.raises(AnotherException):
+            list(foo())
+
+    def test_async_generator_to_the_end(self, catchall_boundary) -> None:
+        @catchall_boundary
+        async def foo():
+            yield 1
+            yield 2
+
+        async def consume():
+            return [item async for item in foo()], catchall_boundary.exc_info
+
+        assert asyncio.run(consume()) == ([1, 2], ExceptionInfo(None, None, None))
+
+    def test_async_generator_asend(self, catchall_boundary) -> None:
+        @catchall_boundary
+        async def foo():
+            value = yield 1
+            yield value * 2
+
+        async def consume():
+            generator = foo()
+            return [await generator.__anext__(), await generator.asend(21)]
+
+        assert asyncio.run(consume()) == [1, 42]
+
+    def test_async_generator_athrow(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        async def foo():
+            try:
+                yield 1
+            except AnException as e:
+                yield e
+            yield 2
+
+        async def consume():
+            generator = foo()
+            items = [await generator.__anext__(), await generator.athrow(exception)]
+            return items + [item async for item in generator]
+
+        assert asyncio.run(consume()) == [1, exception, 2]
+
+    def test_async_generator_athrow_not_handled(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        async def foo():
+            yield 1
+            yield 2  # pragma: no cover
+
+        async def consume():
+            generator = foo()
+            await generator.__anext__()
+            with pytest.raises(StopAsyncIteration):
+                await generator.athrow(exception)
+            return catchall_boundary.exc_info
+
+        assert asyncio.run(consume()).value is exception
+
+    def test_async_generator_propagating(self, specific_boundary) -> None:
+        exception = AnotherException()
+
+        @specific_boundary
+        async def foo():
+            yield 1
+            raise exception
+
+        async def consume():
+            return [item async for item in foo()]
+
+        with pytest.raises(AnotherException):
+            asyncio.run(consume())
+
+
+class TestAsync:
+    def test_async_context_manager(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        async def foo():
+            async with catchall_boundary as error_boundary:
+                raise exception
+            return error_boundary.exc_info
+
+        assert asyncio.run(foo()).value is exception
+
+    def test_async_propagation(self, specific_boundary) -> None:
+        exception = AnotherException()
+
+        async def foo():
+            async with specific_boundary:
+                raise exception
+
+        with pytest.raises(AnotherException) as error_info:
+            asyncio.run(foo())
+        assert error_info.value is exception
+
+    def test_coroutine_function(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        async def foo(value):
+            await asyncio.sleep(0)
+            if value:
+                return value
+            raise exception
+
+        async def call(value):
+            return await foo(value), catchall_boundary.exc_info
+
+        assert asyncio.iscoroutinefunction(foo)
+        assert asyncio.run(call(42)) == (42, ExceptionInfo(None, None, None))
+        result, exc_info = asyncio.run(call(0))
+        assert result is None
+        assert exc_info.value is exception
+
+    def test_async_generator_function(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        async def foo():
+            yield 1
+            await asyncio.sleep(0)
+            yield 2
+            raise exception
+
+        async def consume():
+            return [item async for item in foo()], catchall_boundary.exc_info
+
+        items, exc_info = asyncio.run(consume())
+        assert items == [1, 2]
+        assert exc_info.value is exception
+
+    def test_async_hooks(self) -> None:
+        exception = AnException()
+        transformed_exception = AnotherException()
+        suppressed = []
+
+        async def on_suppress_exception(exc_info):
+            await asyncio.sleep(0)
+            suppressed.append(exc_info.value)
+
+        async def should_propagate_exception(exc_info):
+            return exc_info.value is not exception
+
+        async def transform_propagated_exception(exc_info):
+            return transformed_exception
+
+        boundary = ErrorBoundary(
+            on_suppress_exception=on_suppress_exception,
+            should_propagate_exception=should_propagate_exception,
+            transform_propagated_exception=transform_propagated_exception,
+        )
+
+        @boundary
+        async def foo(error):
+            raise error
+
+        asyncio.run(foo(exception))
+        assert suppressed == [exception]
+        with pytest.raises(AnotherException) as error_info:
+            asyncio.run(foo(AnException()))
+        assert error_info.value is transformed_exception
+
+    @pytest.mark.parametrize(
+        "hook, raised, propagated",
+        [
+            ("on_no_exception", False, False),
+            ("should_propagate_exception", True, True),
+            ("on_propagate_exception", True, True),
+            ("transform_propagated_exception", True, True),
+            ("on_suppress_exception", True, False),
+        ],
+    )
+    def test_async_hook_failing(
+        self, boundary_with_callbacks, callbacks, hook, raised, propagated
+    ) -> None:
+        main_exception = AnException("main_exception") if raised else None
+        callback_exception = AnotherException("callback_exception")
+        callbacks.should_propagate_exception.return_value = propagated
+        getattr(callbacks, hook).side_effect = callback_exception
+
+        async def foo():
+            async with boundary_with_callbacks:
+                if main_exception:
+                    raise main_exception
+
+        if propagated:
+            with pytest.raises(AnException) as error_info:
+                asyncio.run(foo())
+            assert error_info.value is main_exception
+        else:
+            asyncio.run(foo())
+        callbacks.log_inner_error.assert_called_once_with(hook, main_exception, callback_exception)
+
+    def test_async_hook_in_sync_context(self) -> None:
+        log_inner_error = mock.Mock()
+
+        async def on_suppress_exception(exc_info):
+            raise AssertionError("never awaited")  # pragma: no cover
+
+        boundary = ErrorBoundary(
+            log_inner_error=log_inner_error, on_suppress_exception=on_suppress_exception
+        )
+        exception = AnException()
+        with boundary:
+            raise exception
+
+        where, main_error, callback_error = log_inner_error.call_args[0]
+        assert where == "on_suppress_exception"
+        assert main_error is exception
+        assert isinstance(callback_error, TypeError)
+
+
+class TestConcurrency:
+    """
+    A single boundary used by many threads & tasks at once keeps information about handled
+    exceptions separate for each of them.
+    """
+
+    def test_threads(self) -> None:
+        seen_in_hooks = []
+
+        def on_suppress_exception(exc_info):
+            seen_in_hooks.append(boundary.exc_info is exc_info)
+
+        boundary = ErrorBoundary(on_suppress_exception=on_suppress_exception)
+
+        @boundary
+        def foo(exception):
+            time.sleep(0)
+            raise exception
+
+        def task(i):
+            exception = AnException(i)
+            foo(exception)
+            time.sleep(0)
+            return boundary.exc_info.value is exception
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(task, range(2000)))
+        assert all(results)
+        assert len(seen_in_hooks) == 2000
+        assert all(seen_in_hooks)
+
+    def test_tasks(self) -> None:
+        boundary = ErrorBoundary()
+
+        async def task(i):
+            exception = AnException(i)
+            async with boundary:
+                await asyncio.sleep(0)
+                raise exception
+            await asyncio.sleep(0)
+            return boundary.exc_info.value is exception
+
+        async def main():
+            return await asyncio.gather(*(task(i) for i in range(2000)))
+
+        assert all(asyncio.run(main()))
+
+    def test_task_inherits_but_doesnt_change(self) -> None:
+        boundary = ErrorBoundary(on_suppress_exception=lambda exc_info: None)
+        exception = AnException()
+
+        async def task():
+            inherited = boundary.exc_info.value
+            with boundary:
+                raise AnotherException()
+            return inherited, boundary.exc_info.value
+
+        async def main():
+            with boundary:
+                raise exception
+            inherited, own = await asyncio.create_task(task())
+            return inherited, own, boundary.exc_info.value
+
+        inherited, own, after = asyncio.run(main())
+        assert inherited is exception
+        assert isinstance(own, AnotherException)
+        assert after is exception
+
+    def test_set_exc_info(self, catchall_boundary) -> None:
+        with catchall_boundary:
+            raise AnException()
+        catchall_boundary.exc_info = None
+        assert catchall_boundary.exc_info is None
+
+
+class Payload:
+    def __init__(self) -> None:
+        self.data = bytearray(100_000)
+
+
+class TestLifetime:
+    """Information about the last exception doesn't outlive the boundary."""
+
+    def raise_with_payload(self, payloads) -> None:
+        payload = Payload()
+        payloads.append(weakref.ref(payload))
+        raise AnException()
+
+    def test_not_retained_after_boundary(self) -> None:
+        payloads: t.List[weakref.ref] = []
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(200):
+                boundary = ErrorBoundary(on_suppress_exception=lambda exc_info: None)
+                with boundary:
+                    self.raise_with_payload(payloads)
+                assert boundary.exc_info.type is AnException
+            del boundary
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        assert not any(payload() for payload in payloads)
+        assert retained < 1_000_000
+
+    def test_retained_while_boundary_lives(self) -> None:
+        payloads: t.List[weakref.ref] = []
+        boundary = ErrorBoundary(on_suppress_exception=lambda exc_info: None)
+        with boundary:
+            self.raise_with_payload(payloads)
+        gc.collect()
+        assert payloads[0]() is not None
+        with boundary:
+            pass
+        gc.collect()
+        assert payloads[0]() is None
+
+    def test_not_retained_after_tasks(self) -> None:
+        payloads: t.List[weakref.ref] = []
+        boundary = ErrorBoundary(on_suppress_exception=lambda exc_info: None)
+
+        async def task():
+            with boundary:
+                self.raise_with_payload(payloads)
+
+        async def main():
+            await asyncio.gather(*(task() for _ in range(10)))
+
+        asyncio.run(main())
+        gc.collect()
+        assert len(payloads) == 10
+        assert not any(payload() for payload in payloads)
+        assert boundary.exc_info is None
+
+
+def check_positive(number: int) -> int:
+    if number < 0:
+        raise AnException(number)
+    if number == 13:
+        raise AnotherException(number)
+    return number * 2
+
+
+class FailingExecutor(Executor):
+    """Fails every chunk as a whole, like a pool that can't pickle it."""
+
+    def submit(self, fn, *args, **kwargs):
+        future: Future = Future()
+        future.set_exception(AnException("broken"))
+        return future
+
+
+class TestMap:
+    @pytest.fixture
+    def boundary(self, callbacks):
+        return ErrorBoundary(
+            name="map",
+            catch=AnException,
+            on_suppress_exception=callbacks.on_suppress_exception,
+            metrics=BoundaryMetrics(),
+        )
+
+    @pytest.mark.parametrize("chunksize", [1, 3])
+    def test_inline(self, boundary, callbacks, chunksize) -> None:
+        results = list(boundary.map(check_positive, [1, -2, 3], chunksize=chunksize))
+        assert results[0] == ItemResult(0, 1, 2)
+        assert results[0].ok
+        assert results[1].index == 1
+        assert results[1].item == -2
+        assert isinstance(results[1].error, AnException)
+        assert not results[1].ok
+        assert results[2] == ItemResult(2, 3, 6)
+        callbacks.on_suppress_exception.assert_called_once()
+        assert callbacks.on_suppress_exception.call_args[0][0].value is results[1].error
+        outcomes = boundary.metrics.snapshot()["map"]["outcomes"]
+        assert outcomes == {"passed": 2, "suppressed": 1, "propagated": 0, "transformed": 0}
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"chunksize": 0},
+            {"chunksize": -1},
+            {"max_in_flight": 0},
+            {"max_in_flight": 0, "executor": ThreadPoolExecutor(max_workers=1)},
+        ],
+    )
+    def test_invalid_arguments(self, boundary, kwargs) -> None:
+        # raised on the call, before the iteration
+        with pytest.raises(ValueError):
+            boundary.map(check_positive, [1, 2], **kwargs)
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_executor(self, boundary, ordered) -> None:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                boundary.map(
+                    check_positive,
+                    range(-50, 10),
+                    executor=executor,
+                    chunksize=7,
+                    ordered=ordered,
+                    max_in_flight=3,
+                )
+            )
+        if ordered:
+            assert [r.index for r in results] == list(range(60))
+        assert sorted((r.index, r.item, r.value) for r in results) == [
+            (i, i - 50, None if i < 50 else (i - 50) * 2) for i in range(60)
+        ]
+        assert all(isinstance(r.error, AnException) for r in results if r.item < 0)
+
+    def test_propagated(self, boundary) -> None:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = boundary.map(check_positive, itertools.count(), executor=executor)
+            with pytest.raises(AnotherException):
+                for result in results:
+                    assert result.ok
+        assert boundary.exc_info.type is AnotherException
+
+    def test_transformed(self) -> None:
+        boundary = ErrorBoundary(
+            catch=(),
+            transform_propagated_exception=lambda exc_info: AnotherException("transformed"),
+        )
+        with pytest.raises(AnotherException, match="transformed") as error_info:
+            list(boundary.map(check_positive, [-1]))
+        assert isinstance(error_info.value.__cause__, AnException)
+
+    def test_backpressure(self, boundary) -> None:
+        consumed = itertools.count()
+        release = threading.Event()
+
+        def items():
+            for i in range(1000):
+                next(consumed)
+                yield i
+
+        def wait(item):
+            release.wait()
+            return item
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = boundary.map(wait, items(), executor=executor, chunksize=2, max_in_flight=3)
+            release.set()
+            assert next(results) == ItemResult(0, 0, 0)
+            # 3 chunks in flight & 1 submitted in place of the first one
+            assert next(consumed) == 8
+            results.close()
+
+    def test_failed_chunk(self, boundary) -> None:
+        results = list(
+            boundary.map(check_positive, range(3), executor=FailingExecutor(), chunksize=2)
+        )
+        assert [r.index for r in results] == [0, 1, 2]
+        assert all(str(r.error) == "broken" for r in results)
+
+
+class TestBoundaryHook:
+    def test_bound_to_boundary(self) -> None:
+        class Hook(BoundaryHook):
+            def __init__(self):
+                self.calls = []
+
+            def __call__(self, boundary, exc_info):
+                self.calls.append((boundary, exc_info))
+
+        hook = Hook()
+        boundary = ErrorBoundary(on_suppress_exception=hook)
+        other_boundary = ErrorBoundary(on_suppress_exception=hook)
+        with boundary:
+            raise AnException()
+        with other_boundary:
+            raise AnException()
+        assert hook.calls == [
+            (boundary, boundary.exc_info),
+            (other_boundary, other_boundary.exc_info),
+        ]
+
+
+class TestFastPath:
+    """
+    Boundaries with nothing to do on a successful exit take a path that skips the hooks.
+    """
+
+    def test_hooks_detected(self, catchall_boundary, boundary_with_callbacks) -> None:
+        class Subclass(ErrorBoundary):
+            def on_no_exception(self):
+                pass  # pragma: no cover
+
+        assert catchall_boundary._silent_on_success
+        assert not boundary_with_callbacks._silent_on_success
+        assert not Subclass()._silent_on_success
+        assert not ErrorBoundary(metrics=mock.Mock())._silent_on_success
+
+    def test_decorator(self, catchall_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        def foo(value):
+            if value:
+                return value
+            raise exception
+
+        assert foo(0) is None
+        assert catchall_boundary.exc_info.value is exception
+        assert foo(42) == 42
+        assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+        assert foo(42) == 42
+        assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+
+    def test_decorator_of_subclass_entering_and_exiting(self) -> None:
+        calls = []
+
+        class Subclass(ErrorBoundary):
+            def __enter__(self):
+                calls.append("enter")
+                return super().__enter__()
+
+            def __exit__(self, *exc_info):
+                calls.append("exit")
+                return super().__exit__(*exc_info)
+
+            async def __aenter__(self):
+                calls.append("aenter")
+                return await super().__aenter__()
+
+            async def __aexit__(self, *exc_info):
+                calls.append("aexit")
+                return await super().__aexit__(*exc_info)
+
+        boundary = Subclass()
+
+        @boundary
+        def foo():
+            return 42
+
+        @boundary
+        async def bar():
+            return 42
+
+        assert foo() == 42
+        assert asyncio.run(bar()) == 42
+        assert calls == ["enter", "exit", "aenter", "aexit"]
+
+    def test_hook_set_later(self, catchall_boundary) -> None:
+        on_no_exception = mock.Mock()
+
+        @catchall_boundary
+        def foo():
+            return 42
+
+        @catchall_boundary
+        async def bar():
+            return 42
+
+        catchall_boundary.on_no_exception = on_no_exception
+        assert not catchall_boundary._silent_on_success
+        assert foo() == 42
+        assert asyncio.run(bar()) == 42
+        with catchall_boundary:
+            pass
+        assert on_no_exception.call_count == 3
+        del catchall_boundary.on_no_exception
+        assert catchall_boundary._silent_on_success
+        assert foo() == 42
+        assert on_no_exception.call_count == 3
+
+    def test_metrics_set_later(self, catchall_boundary) -> None:
+        catchall_boundary.name = "api"
+
+        @catchall_boundary
+        def foo():
+            return 42
+
+        @catchall_boundary
+        async def bar():
+            return 42
+
+        catchall_boundary.metrics = metrics = BoundaryMetrics()
+        assert catchall_boundary.metrics is metrics
+        assert not catchall_boundary._silent_on_success
+        assert foo() == 42
+        assert asyncio.run(bar()) == 42
+        snapshot = metrics.snapshot()["api"]
+        assert snapshot["outcomes"]["passed"] == 2
+        assert snapshot["latency"]["count"] == 2
+        catchall_boundary.metrics = None
+        assert catchall_boundary._silent_on_success
+
+    def test_decorator_propagating(self, specific_boundary) -> None:
+        exception = AnotherException()
+
+        @specific_boundary
+        def foo():
+            raise exception
+
+        with pytest.raises(AnotherException) as error_info:
+            foo()
+        assert error_info.value is exception
+
+    def test_decorator_transforming(self) -> None:
+        transformed_exception = AnotherException()
+        boundary = ErrorBoundary(
+            catch=(), transform_propagated_exception=lambda exc_info: transformed_exception
+        )
+
+        @boundary
+        def foo():
+            raise AnException()
+
+        with pytest.raises(AnotherException) as error_info:
+            foo()
+        assert error_info.value is transformed_exception
+        assert isinstance(error_info.value.__cause__, AnException)
+
+    def test_context_manager(self, catchall_boundary) -> None:
+        with catchall_boundary:
+            raise AnException()
+        with catchall_boundary:
+            pass
+        assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+        with catchall_boundary:
+            pass
+        assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+
+    def test_async(self, catchall_boundary, specific_boundary) -> None:
+        exception = AnException()
+
+        @catchall_boundary
+        async def foo(value):
+            if value:
+                return value
+            raise exception
+
+        @specific_boundary
+        async def bar():
+            raise AnotherException()
+
+        async def main():
+            assert await foo(0) is None
+            assert catchall_boundary.exc_info.value is exception
+            assert await foo(42) == 42
+            assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+            assert await foo(42) == 42
+            async with catchall_boundary:
+                raise exception
+            async with catchall_boundary:
+                pass
+            assert catchall_boundary.exc_info == ExceptionInfo(None, None, None)
+            async with catchall_boundary:
+                pass
+            with pytest.raises(AnotherException):
+                await bar()
+
+        asyncio.run(main())
+
+    def test_hooks_called_on_success(self, boundary_with_callbacks, callbacks) -> None:
+        @boundary_with_callbacks
+        async def foo():
+            pass
+
+        @boundary_with_callbacks
+        def bar():
+            pass
+
+        asyncio.run(foo())
+        bar()
+        assert callbacks.on_no_exception.call_count == 2
@@ -1,9 +1,21 @@
+import itertools
+import multiprocessing
+import pickle
+import sys
+import threading
+import types
+
 import pytest
 
 from pca.packages.errors import (
     ErrorCatalog,
+    ErrorMeta,
     ExceptionWithCode,
+    LazyError,
     error_builder,
+    error_code,
+    error_registry,
+    from_dict,
 )
 from pca.packages.errors.types import ExceptionWithCodeType
 
@@ -146,3 +158,377 @@ class TestIntegrationWithCatalog:
 
         assert repr(MyCatalog.SomeName) == "MyCatalog.SomeName"
         assert MyCatalog.SomeName.__name__ == "SomeName"
+
+
+class TestCompactErrors:
+    @pytest.fixture
+    def compact_class(self):
+        return error_builder("CompactError", params=("field", "value"))
+
+    def test_params(self, compact_class) -> None:
+        instance = compact_class("an_arg", field="name", value=42)
+        assert instance.args == ("an_arg",)
+        assert instance.field == "name"
+        assert instance.value == 42
+        assert instance.kwargs == {"field": "name", "value": 42}
+
+    def test_unset_param(self, compact_class) -> None:
+        instance = compact_class(field="name")
+        assert instance.kwargs == {"field": "name"}
+        with pytest.raises(AttributeError):
+            instance.value
+
+    def test_no_instance_dict(self, compact_class) -> None:
+        instance = compact_class(field="name", value=42)
+        assert "field" not in instance.__dict__
+        assert instance.__dict__ == {}
+
+    def test_undeclared_param(self, compact_class) -> None:
+        with pytest.raises(TypeError):
+            compact_class(other="foo")
+
+    @pytest.mark.parametrize("name", ["code", "kwargs", "_private", "not valid", "class"])
+    def test_invalid_param_name(self, name) -> None:
+        with pytest.raises(ValueError):
+            error_builder("CompactError", params=("field", name))
+
+    def test_param_names_dont_clash_with_generated_code(self) -> None:
+        error_class = error_builder("CompactError", params=("error", "value", "args_"))
+        instance = error_class(error=1, value=2, args_=3)
+        assert instance.kwargs == {"error": 1, "value": 2, "args_": 3}
+
+    def test_compatibility(self, compact_class) -> None:
+        instance = compact_class("an_arg", field="name")
+        assert repr(instance) == "CompactError('an_arg', field='name')"
+        assert str(instance) == "CompactError('an_arg', field='name')"
+        assert instance.to_dict() == {
+            "code": "CompactError",
+            "catalog": None,
+            "kwargs": {"field": "name"},
+        }
+        cloned = instance.clone(value=1)
+        assert cloned.cls is compact_class
+        assert cloned.args == ("an_arg",)
+        assert cloned.kwargs == {"field": "name", "value": 1}
+        assert compact_class.conforms(cloned)
+
+    def test_in_catalog(self) -> None:
+        class MyCatalog(ErrorCatalog):
+            Compact = error_builder(params=("field",), base=ValueError)
+
+        with pytest.raises(ValueError) as error_info:
+            raise MyCatalog.Compact(field="name")
+        assert error_info.value.to_dict() == {
+            "code": "Compact",
+            "catalog": MyCatalog.__qualname__,
+            "kwargs": {"field": "name"},
+        }
+
+
+class TestRendering:
+    def test_cached(self, error_instance_with_kwargs) -> None:
+        rendered = repr(error_instance_with_kwargs)
+        assert rendered == "MyError('an_arg', foo='bar')"
+        assert repr(error_instance_with_kwargs) is rendered
+        assert str(error_instance_with_kwargs) is rendered
+
+    @pytest.mark.parametrize(
+        "mutate",
+        [
+            lambda kwargs: kwargs.__setitem__("foo", "baz"),
+            lambda kwargs: kwargs.__delitem__("foo"),
+            lambda kwargs: kwargs.__ior__({"spam": "eggs"}),
+            lambda kwargs: kwargs.clear(),
+            lambda kwargs: kwargs.pop("foo"),
+            lambda kwargs: kwargs.popitem(),
+            lambda kwargs: kwargs.setdefault("spam", "eggs"),
+            lambda kwargs: kwargs.update(spam="eggs"),
+            lambda kwargs: kwargs.update(foo=1, bar=True),
+        ],
+    )
+    def test_invalidated_by_kwargs_mutation(self, error_instance_with_kwargs, mutate) -> None:
+        repr(error_instance_with_kwargs)
+        mutate(error_instance_with_kwargs.kwargs)
+        expected_kwargs = ", ".join(
+            f"{k}={v!r}" for k, v in error_instance_with_kwargs.kwargs.items()
+        )
+        expected = f"MyError('an_arg'{', ' if expected_kwargs else ''}{expected_kwargs})"
+        assert repr(error_instance_with_kwargs) == expected
+
+    def test_invalidated_by_equal_value(self, error_class) -> None:
+        error = error_class(foo=1)
+        assert repr(error) == "MyError(foo=1)"
+        error.kwargs["foo"] = True
+        assert repr(error) == "MyError(foo=True)"
+        error.kwargs["foo"] = 1.0
+        assert repr(error) == "MyError(foo=1.0)"
+
+    def test_invalidated_by_key_replacement(self, error_class) -> None:
+        error = error_class(foo=1)
+        repr(error)
+        error.kwargs["bar"] = error.kwargs.pop("foo")
+        assert repr(error) == "MyError(bar=1)"
+
+    def test_invalidated_by_args_replacement(self, error_instance_with_kwargs) -> None:
+        repr(error_instance_with_kwargs)
+        error_instance_with_kwargs.args = ("other",)
+        assert repr(error_instance_with_kwargs) == "MyError('other', foo='bar')"
+
+    def test_kwargs_replaced_with_plain_dict(self, error_instance_with_kwargs) -> None:
+        repr(error_instance_with_kwargs)
+        error_instance_with_kwargs.kwargs = {"spam": "eggs"}
+        assert repr(error_instance_with_kwargs) == "MyError('an_arg', spam='eggs')"
+        error_instance_with_kwargs.kwargs["spam"] = "ham"
+        assert repr(error_instance_with_kwargs) == "MyError('an_arg', spam='ham')"
+
+    def test_kwargs_is_a_dict(self, error_instance_with_kwargs) -> None:
+        assert type(error_instance_with_kwargs.kwargs) is dict
+        assert error_instance_with_kwargs.kwargs == {"foo": "bar"}
+
+
+_lazy_catalogs = itertools.count()
+
+
+@pytest.fixture
+def lazy_catalog():
+    # each test gets its own catalog, to have the errors materialized on its own
+    name = f"LazyCatalog{next(_lazy_catalogs)}"
+
+    class LazyCatalog(ErrorCatalog):
+        __qualname__ = name
+        NotFound = error_builder(hint="Not found.", lazy=True)
+        Invalid = error_builder("InvalidValue", base=ValueError, params=("value",), lazy=True)
+
+        class Nested(ErrorCatalog):
+            __qualname__ = f"{name}.Nested"
+            NestedError = error_builder(lazy=True)
+
+    return LazyCatalog
+
+
+def placeholder(catalog, name):
+    return catalog.__dict__[name]
+
+
+class TestLazyErrors:
+    def test_placeholders(self, lazy_catalog) -> None:
+        not_found = placeholder(lazy_catalog, "NotFound")
+        assert isinstance(not_found, LazyError)
+        assert [(e.code, e.hint) for e in lazy_catalog] == [
+            ("NotFound", "Not found."),
+            ("InvalidValue", ""),
+            ("NestedError", ""),
+        ]
+        assert not_found.catalog is lazy_catalog
+        assert not_found.materialized is None
+        assert repr(not_found) == str(not_found) == f"{lazy_catalog.__name__}.NotFound"
+
+    def test_attribute_access(self, lazy_catalog) -> None:
+        not_found = placeholder(lazy_catalog, "NotFound")
+        error_class = lazy_catalog.NotFound
+        assert isinstance(error_class, ErrorMeta)
+        assert not_found.materialized is error_class
+        assert placeholder(lazy_catalog, "NotFound") is error_class
+        assert lazy_catalog.NotFound is error_class
+        assert error_class.catalog is lazy_catalog
+        assert error_class.code == "NotFound"
+        assert error_class.hint == "Not found."
+        assert [e.code for e in lazy_catalog] == ["NotFound", "InvalidValue", "NestedError"]
+        assert placeholder(lazy_catalog, "Invalid").materialized is None
+
+    def test_raise(self, lazy_catalog) -> None:
+        with pytest.raises(lazy_catalog.Invalid) as error_info:
+            raise lazy_catalog.Invalid(value=42)
+        assert isinstance(error_info.value, ValueError)
+        assert error_info.value.value == 42
+
+    def test_call_and_checks(self, lazy_catalog) -> None:
+        invalid = placeholder(lazy_catalog, "Invalid")
+        error = invalid(value=1)
+        assert error.cls is invalid.materialized
+        assert isinstance(error, invalid)
+        assert not isinstance(ValueError(), invalid)
+        assert issubclass(invalid.materialized, invalid)
+        assert invalid.conforms(error)
+        assert invalid.materialized.__slots__ == ("value",)
+
+    def test_registry(self, lazy_catalog) -> None:
+        nested = placeholder(lazy_catalog.Nested, "NestedError")
+        path = f"{lazy_catalog.__qualname__}.Nested"
+        error_class = error_registry[f"{path}.NestedError"]
+        assert error_class is nested.materialized
+        assert error_class in error_registry.find("NestedError")
+        assert nested not in error_registry.find("NestedError")
+        assert f"{path}.NestedError" not in error_registry.collisions
+        assert error_registry.resolve(path, "NestedError") is error_class
+        data = {"code": "NotFound", "catalog": lazy_catalog.__qualname__}
+        assert from_dict(data).cls is lazy_catalog.NotFound
+
+    def test_all(self, lazy_catalog) -> None:
+        error_classes = lazy_catalog.all
+        assert all(isinstance(e, ErrorMeta) for e in error_classes)
+        assert lazy_catalog.NotFound in lazy_catalog
+        assert len(lazy_catalog) == 3
+
+    def test_len_and_membership(self, lazy_catalog) -> None:
+        not_found = placeholder(lazy_catalog, "NotFound")
+        nested = placeholder(lazy_catalog.Nested, "NestedError")
+        assert len(lazy_catalog) == 3
+        assert not_found in lazy_catalog
+        assert nested in lazy_catalog
+        assert all(e.materialized is None for e in lazy_catalog)
+        error_class = nested.materialize()
+        assert error_class in lazy_catalog
+        assert error_class in lazy_catalog.Nested
+        assert nested.materialized is not None
+        assert not_found.materialized is None
+
+    def test_views_updated_in_place(self, lazy_catalog) -> None:
+        sub_catalog = type(f"{lazy_catalog.__name__}Sub", (lazy_catalog,), {})
+        outer_catalog = type(
+            f"{lazy_catalog.__name__}Outer", (ErrorCatalog,), {"Sub": sub_catalog}
+        )
+        nested = placeholder(lazy_catalog.Nested, "NestedError")
+        catalogs = (lazy_catalog.Nested, lazy_catalog, sub_catalog, outer_catalog)
+        assert [len(catalog) for catalog in catalogs] == [1, 3, 3, 3]
+        views = [catalog._merged_views for catalog in catalogs]
+        error_class = nested.materialize()
+        assert [catalog._merged_views for catalog in catalogs] == views
+        assert all(error_class in catalog for catalog in catalogs)
+        assert [len(catalog) for catalog in catalogs] == [1, 3, 3, 3]
+        assert list(outer_catalog)[-1] is error_class
+        assert list(lazy_catalog.Nested) == [error_class]
+        not_found = placeholder(lazy_catalog, "NotFound")
+        error_class = not_found.materialize()
+        assert sub_catalog._not_nested_errors["NotFound"] is error_class
+        assert list(outer_catalog)[0] is error_class
+
+    def test_built_while_merging(self, lazy_catalog) -> None:
+        not_found = placeholder(lazy_catalog, "NotFound")
+        # as if built by another thread, before the placeholder is replaced in the catalog
+        error_class = not_found.materialized = ErrorMeta("NotFound")
+        views = lazy_catalog._merge()
+        not_found.materialized = None
+        assert views.tree[0] is error_class
+        assert error_class in views.members
+
+    def test_frozen(self, lazy_catalog) -> None:
+        lazy_catalog.freeze()
+        assert isinstance(lazy_catalog.NotFound, ErrorMeta)
+        assert lazy_catalog.NotFound in lazy_catalog
+
+    def test_threads(self, lazy_catalog) -> None:
+        not_found = placeholder(lazy_catalog, "NotFound")
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(not_found.materialize()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(set(results)) == 1
+
+    def test_without_catalog(self) -> None:
+        class NotACatalog:
+            LazyOne = error_builder("LazyOne", lazy=True)
+
+        lazy = NotACatalog.__dict__["LazyOne"]
+        assert lazy.catalog is None
+        error_class = lazy.materialize()
+        assert error_class.code == "LazyOne"
+        assert error_class.catalog is None
+
+
+class PicklingCatalog(ErrorCatalog):
+    Plain = error_builder()
+    Compact = error_builder(base=ValueError, params=("value",))
+
+    class Nested(ErrorCatalog):
+        NestedError = error_builder()
+
+
+def raise_in_worker(value: int) -> ExceptionWithCode:
+    try:
+        raise PicklingCatalog.Compact(value=value)
+    except PicklingCatalog.Compact as e:
+        return e
+
+
+class TestPickling:
+    @pytest.mark.parametrize(
+        "error",
+        [
+            PicklingCatalog.Plain("an_arg", foo=[1, 2]),
+            PicklingCatalog.Compact(value=42),
+            PicklingCatalog.Nested.NestedError(),
+        ],
+    )
+    def test_round_trip(self, error) -> None:
+        restored = pickle.loads(pickle.dumps(error))
+        assert restored.cls is error.cls
+        assert restored.args == error.args
+        assert restored.kwargs == error.kwargs
+        assert error.cls.conforms(restored)
+        assert pickle.loads(pickle.dumps(error.to_dict())) == error.to_dict()
+
+    def test_error_class(self) -> None:
+        assert pickle.loads(pickle.dumps(PicklingCatalog.Nested.NestedError)) is (
+            PicklingCatalog.Nested.NestedError
+        )
+        lazy_catalog = ErrorCatalog.from_hints("PicklingLazyCatalog", {"Lazy": ""}, lazy=True)
+        lazy = placeholder(lazy_catalog, "Lazy")
+        assert pickle.loads(pickle.dumps(lazy())).cls is lazy.materialized
+
+    def test_class_is_pickled_once(self) -> None:
+        errors = [PicklingCatalog.Plain(i) for i in range(100)]
+        data = pickle.dumps(errors)
+        assert data.count(b"PicklingCatalog") == 1
+        assert [e.args for e in pickle.loads(data)] == [e.args for e in errors]
+
+    def test_module_is_imported(self, tmp_path, monkeypatch) -> None:
+        catalog = ErrorCatalog.from_hints(
+            "PicklingImportedCatalog", {"Imported": ""}, module="pickling_catalogs"
+        )
+        data = pickle.dumps(catalog.Imported())
+        (tmp_path / "pickling_catalogs.py").write_text("IMPORTED = True\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        try:
+            assert pickle.loads(data).cls is catalog.Imported
+            assert sys.modules["pickling_catalogs"].IMPORTED
+        finally:
+            sys.modules.pop("pickling_catalogs", None)
+
+    def test_same_path_in_other_module(self, monkeypatch) -> None:
+        catalogs = [
+            ErrorCatalog.from_hints("PicklingSameNamed", {"NotFound": hint}, module=module)
+            for module, hint in (("pickling_a", "A"), ("pickling_b", "B"))
+        ]
+        for module in ("pickling_a", "pickling_b"):
+            monkeypatch.setitem(sys.modules, module, types.ModuleType(module))
+        for catalog in catalogs:
+            restored = pickle.loads(pickle.dumps(catalog.NotFound()))
+            assert restored.cls is catalog.NotFound
+            assert isinstance(restored, catalog.NotFound)
+        assert pickle.loads(pickle.dumps(catalogs[1].NotFound)).hint == "B"
+
+    def test_not_in_catalog(self, error_instance) -> None:
+        with pytest.raises(pickle.PicklingError):
+            pickle.dumps(error_instance)
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(), reason="needs forking"
+    )
+    def test_between_processes(self) -> None:
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            errors = pool.map(raise_in_worker, range(3))
+        assert [e.value for e in errors] == [0, 1, 2]
+        assert all(PicklingCatalog.Compact.conforms(e) for e in errors)
+        with pytest.raises(PicklingCatalog.Compact):
+            raise errors[0]
+
+
+def test_error_code(error_instance) -> None:
+    assert error_code(error_instance) == "MyError"
+    assert error_code(ValueError("foo")) == "ValueError"
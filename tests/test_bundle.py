@@ -0,0 +1,116 @@
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    LazyError,
+    MessageBundle,
+    MessageRenderer,
+    build_bundle,
+    error_builder,
+)
+
+
+class BundleCatalog(ErrorCatalog):
+    NotFound = error_builder()
+    Invalid = error_builder()
+    Untranslated = error_builder(hint="Not translated.")
+
+    class Nested(ErrorCatalog):
+        NotFound = error_builder()
+        Lazy = error_builder(lazy=True)
+
+
+SOURCES = {
+    "en": {
+        "NotFound": "{resource} not found.",
+        "BundleCatalog.Invalid": "Invalid {field}.",
+        "BundleCatalog.Nested.Lazy": "Lazy.",
+        "OtherCatalog.Unknown": "Skipped.",
+    },
+    "pl": {"BundleCatalog.Nested.NotFound": "Nie znaleziono: {resource} 🔍."},
+}
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "messages.bundle"
+    with open(path, "wb") as f:
+        build_bundle(f, [BundleCatalog], SOURCES)
+    with MessageBundle(str(path)) as bundle:
+        yield bundle
+
+
+class TestMessageBundle:
+    def test_locales(self, bundle) -> None:
+        assert bundle.locales == ("en", "pl")
+        assert bundle._locales == {}
+        assert bundle.get("de") is None
+        with pytest.raises(KeyError):
+            bundle["de"]
+        assert bundle["pl"] is bundle.get("pl")
+        assert list(bundle._locales) == ["pl"]
+
+    def test_templates(self, bundle) -> None:
+        en = bundle["en"]
+        assert len(en) == 4
+        assert sorted(en) == [
+            "BundleCatalog.Invalid",
+            "BundleCatalog.Nested.Lazy",
+            "BundleCatalog.Nested.NotFound",
+            "BundleCatalog.NotFound",
+        ]
+        assert en["BundleCatalog.NotFound"] == "{resource} not found."
+        assert en["BundleCatalog.Nested.NotFound"] == "{resource} not found."
+        assert "BundleCatalog.Untranslated" not in en
+        assert "OtherCatalog.Unknown" not in en
+        with pytest.raises(KeyError):
+            en["NotFound"]
+        assert dict(bundle["pl"]) == {
+            "BundleCatalog.Nested.NotFound": "Nie znaleziono: {resource} 🔍."
+        }
+        # lazy errors aren't built by the bundle
+        assert isinstance(BundleCatalog.Nested.__dict__["Lazy"], LazyError)
+
+    def test_renderer(self, bundle) -> None:
+        renderer = MessageRenderer(
+            {"en": {"BundleCatalog.Invalid": "Wrong {field}."}}, bundle=bundle
+        )
+        error = BundleCatalog.Nested.NotFound(resource="User")
+        assert renderer.render(error, "pl_PL") == "Nie znaleziono: User 🔍."
+        assert renderer.render(BundleCatalog.NotFound(resource="User"), "pl") == "User not found."
+        assert renderer.render(BundleCatalog.Invalid(field="age")) == "Wrong age."
+        assert renderer.render(BundleCatalog.Untranslated()) == "Not translated."
+
+    def test_empty_locale(self, tmp_path) -> None:
+        path = tmp_path / "empty.bundle"
+        with open(path, "wb") as f:
+            build_bundle(f, [BundleCatalog], {"de": {}})
+        with MessageBundle(str(path)) as bundle:
+            assert len(bundle["de"]) == 0
+            assert bundle["de"].get("BundleCatalog.NotFound") is None
+
+    def test_many_templates(self, tmp_path) -> None:
+        hints = {f"Error{i}": "" for i in range(1000)}
+        catalog = ErrorCatalog.from_hints("BundleManyCatalog", hints)
+        path = tmp_path / "many.bundle"
+        with open(path, "wb") as f:
+            build_bundle(f, [catalog], {"en": {code: f"{code}." for code in hints}})
+        with MessageBundle(str(path)) as bundle:
+            templates = bundle["en"]
+            assert len(templates) == len(set(templates)) == 1000
+            assert all(templates[f"BundleManyCatalog.{code}"] == f"{code}." for code in hints)
+            assert "BundleManyCatalog.Error1000" not in templates
+
+    def test_invalid_template(self, tmp_path) -> None:
+        with open(tmp_path / "invalid.bundle", "wb") as f:
+            with pytest.raises(ValueError):
+                build_bundle(f, [BundleCatalog], {"en": {"NotFound": "{"}})
+
+    @pytest.mark.parametrize(
+        "data", [b"", b"PB", b"XX\x01\x00\x00\x00\x00\x00", b"PB\x01\x00\x01\x00\x00\x00"]
+    )
+    def test_corrupted(self, tmp_path, data) -> None:
+        path = tmp_path / "corrupted.bundle"
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            MessageBundle(str(path))
@@ -1,9 +1,16 @@
+import gc
 import typing as t
+import weakref
+
+import pytest
 
 from pca.packages.errors import (
     ErrorCatalog,
+    ErrorMeta,
     ExceptionWithCode,
+    LazyError,
     error_builder,
+    error_registry,
 )
 
 
@@ -48,3 +55,179 @@ class TestErrorCatalog:
         ExampleCatalog.add_instance(instance)
         assert instance in ExampleCatalog
         assert ExampleCatalog.Baz is instance  # type: ignore
+
+    def test_nesting_catalog_not_retained(self):
+        class LocalOuterCatalog(ErrorCatalog):
+            Example = ExampleCatalog
+
+        assert len(LocalOuterCatalog) == len(ExampleCatalog)
+        ref = weakref.ref(LocalOuterCatalog)
+        del LocalOuterCatalog
+        gc.collect()
+        assert ref() is None
+
+
+class TestIndex:
+    def test_all_is_cached(self):
+        class MyCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        assert MyCatalog.all is MyCatalog.all
+
+    def test_len_and_contains(self):
+        class MyCatalog(ErrorCatalog):
+            Foo = error_builder()
+            Bar = error_builder()
+
+        assert len(MyCatalog) == 2
+        assert MyCatalog.Bar in MyCatalog
+        assert ExampleCatalog.Foo not in MyCatalog
+
+    def test_invalidated_by_add_instance(self):
+        class MyCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        before = MyCatalog.all
+        MyCatalog.add_instance(error_builder("Bar"))
+        assert MyCatalog.all is not before
+        assert MyCatalog.all == (MyCatalog.Foo, MyCatalog.Bar)  # type: ignore
+
+    def test_invalidated_by_nested_catalog(self):
+        class NestedCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        class MyCatalog(ErrorCatalog):
+            Nested = NestedCatalog
+
+        assert len(MyCatalog) == 1
+        error = error_builder("Bar")
+        NestedCatalog.add_instance(error)
+        assert len(MyCatalog) == 2
+        assert error in MyCatalog
+
+    def test_invalidated_by_super_catalog(self):
+        class BaseCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        class MyCatalog(BaseCatalog):
+            Bar = error_builder()
+
+        assert len(MyCatalog) == 2
+        error = error_builder("Baz")
+        BaseCatalog.add_instance(error)
+        assert MyCatalog.all == (BaseCatalog.Foo, error, MyCatalog.Bar)
+
+    def test_merged_views_are_cached(self):
+        class BaseCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        class MyCatalog(BaseCatalog):
+            Bar = error_builder()
+
+        assert MyCatalog._not_nested_errors is MyCatalog._not_nested_errors
+        assert list(MyCatalog) == [BaseCatalog.Foo, MyCatalog.Bar]
+        error = error_builder("Baz")
+        BaseCatalog.add_instance(error)
+        assert list(MyCatalog) == [BaseCatalog.Foo, error, MyCatalog.Bar]
+
+
+class TestFreeze:
+    @pytest.fixture
+    def catalogs(self):
+        class NestedCatalog(ErrorCatalog):
+            Nested = error_builder()
+
+        class BaseCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        class MyCatalog(BaseCatalog):
+            Bar = error_builder()
+            Included = NestedCatalog
+
+        return BaseCatalog, MyCatalog, NestedCatalog
+
+    def test_freeze_is_recursive(self, catalogs):
+        base, catalog, nested = catalogs
+        catalog.freeze()
+        assert base.is_frozen
+        assert catalog.is_frozen
+        assert nested.is_frozen
+        catalog.freeze()  # idempotent
+        assert catalog.all == (base.Foo, catalog.Bar, nested.Nested)
+
+    def test_frozen_catalog_is_immutable(self, catalogs):
+        _, catalog, nested = catalogs
+        catalog.freeze()
+        with pytest.raises(AttributeError):
+            catalog.add_instance(error_builder("Baz"))
+        with pytest.raises(AttributeError):
+            nested.add_instance(error_builder("Baz"))
+        with pytest.raises(AttributeError):
+            catalog.Bar = error_builder()
+        with pytest.raises(AttributeError):
+            del catalog.Bar
+
+    def test_subclass_of_frozen_catalog(self, catalogs):
+        _, catalog, _ = catalogs
+        catalog.freeze()
+
+        class SubCatalog(catalog):
+            Baz = error_builder()
+
+        assert not SubCatalog.is_frozen
+        SubCatalog.add_instance(error_builder("Spam"))
+        SubCatalog.some_attribute = "value"
+        del SubCatalog.some_attribute
+        assert len(SubCatalog) == 5
+
+    def test_index_survives_mutations_elsewhere(self, catalogs):
+        _, catalog, _ = catalogs
+        catalog.freeze()
+        before = catalog.all
+
+        class OtherCatalog(ErrorCatalog):
+            pass
+
+        OtherCatalog.add_instance(error_builder("Baz"))
+        assert catalog.all is before
+
+
+class TestFromHints:
+    hints = {"NotFound": "Not found.", "Invalid": "Invalid value."}
+
+    def test_errors(self):
+        catalog = ErrorCatalog.from_hints("FromHintsCatalog", self.hints)
+        assert catalog.__module__ == __name__
+        assert catalog.__qualname__ == "FromHintsCatalog"
+        assert [(e.code, e.hint) for e in catalog] == list(self.hints.items())
+        assert catalog.NotFound.catalog is catalog
+        assert error_registry["FromHintsCatalog.Invalid"] is catalog.Invalid
+
+    def test_lazy(self):
+        catalog = ErrorCatalog.from_hints("FromHintsLazyCatalog", self.hints, lazy=True)
+        assert all(isinstance(e, LazyError) for e in catalog)
+        assert isinstance(catalog.NotFound, ErrorMeta)
+        assert catalog.NotFound.hint == "Not found."
+
+    def test_inheritance_and_nesting(self):
+        class BaseCatalog(ErrorCatalog):
+            Foo = error_builder()
+
+        nested = BaseCatalog.from_hints(
+            "Nested",
+            {"Bar": ""},
+            module="my_app.errors",
+            qualname="FromHintsOuterCatalog.Nested",
+        )
+
+        class FromHintsOuterCatalog(ErrorCatalog):
+            Nested = nested
+
+        assert nested.__module__ == "my_app.errors"
+        assert issubclass(nested, BaseCatalog)
+        assert FromHintsOuterCatalog.all == (BaseCatalog.Foo, nested.Bar)
+        assert error_registry["FromHintsOuterCatalog.Nested.Bar"] is nested.Bar
+
+    def test_invalid_code(self):
+        with pytest.raises(ValueError):
+            ErrorCatalog.from_hints("FromHintsInvalidCatalog", {"Not.Found": ""})
@@ -0,0 +1,150 @@
+import threading
+
+import pytest
+
+from pca.packages.errors import (
+    CollectingBoundary,
+    ErrorBoundary,
+    ErrorCollector,
+    ErrorsCollected,
+    error_builder,
+)
+
+
+InvalidValue = error_builder("InvalidValue", base=ValueError)
+
+
+def validate(value):
+    if value < 0:
+        raise InvalidValue(field="value", reason="negative")
+    if value % 10 == 0:
+        raise InvalidValue(field="value", reason="round", value=value)
+    return value
+
+
+@pytest.fixture
+def boundary():
+    return CollectingBoundary(catch=ValueError, max_groups=3, max_tracebacks=2)
+
+
+def process(boundary, values):
+    for value in values:
+        with boundary:
+            validate(value)
+
+
+class TestCollectingBoundary:
+    def test_nothing_collected(self, boundary) -> None:
+        process(boundary, [1, 2, 3])
+        report = boundary.report()
+        assert not report
+        assert report.errors == ()
+        boundary.raise_for_errors()
+
+    def test_grouping(self, boundary) -> None:
+        process(boundary, [-1, 1, -2, -3, 10, 10])
+        report = boundary.report()
+        assert report.total == 5
+        assert report.dropped == 0
+        negative, round_ = report.errors
+        assert negative.code == "InvalidValue"
+        assert negative.params == (("field", "value"), ("reason", "negative"))
+        assert negative.count == 3
+        assert len(negative.tracebacks) == 2
+        assert negative.tracebacks[0][-1].name == "validate"
+        assert negative.error.__traceback__ is None
+        assert negative.error.kwargs == {"field": "value", "reason": "negative"}
+        assert round_.count == 2
+
+    def test_exception_left_alone(self, boundary) -> None:
+        error = InvalidValue(field="value")
+        with boundary:
+            raise error
+        assert error.__traceback__ is not None
+        collected = boundary.report().errors[0].error
+        assert collected is not error
+        assert collected.__traceback__ is None
+        assert InvalidValue.conforms(collected)
+        assert collected.kwargs == error.kwargs
+
+    def test_uncopyable_exception(self, boundary) -> None:
+        class Uncopyable(ValueError):
+            def __init__(self, a, b) -> None:
+                super().__init__(a)
+
+        error = Uncopyable(1, 2)
+        with boundary:
+            raise error
+        assert boundary.report().errors[0].error is error
+        assert error.__traceback__ is not None
+
+    def test_map_results_keep_tracebacks(self, boundary) -> None:
+        (result,) = boundary.map(validate, [-1])
+        assert result.error.__traceback__ is not None
+        assert boundary.report().errors[0].error is not result.error
+
+    def test_max_groups(self, boundary) -> None:
+        process(boundary, [10, 20, 30, 40, 50, 10])
+        report = boundary.report()
+        assert report.total == 6
+        assert report.dropped == 2
+        assert [e.count for e in report.errors] == [2, 1, 1]
+
+    def test_raise_for_errors(self, boundary) -> None:
+        process(boundary, [-1, 10, 20, 30, 40])
+        with pytest.raises(ErrorsCollected) as error_info:
+            boundary.raise_for_errors()
+        error = error_info.value
+        assert str(error) == "5 error(s) of 3 kind(s) collected, 2 of them not grouped"
+        assert error.report.total == 5
+        assert [e.kwargs for e in error.exceptions] == [
+            {"field": "value", "reason": "negative"},
+            {"field": "value", "reason": "round", "value": 10},
+            {"field": "value", "reason": "round", "value": 20},
+        ]
+
+    def test_not_catched_propagated(self, boundary) -> None:
+        with pytest.raises(KeyError):
+            with boundary:
+                raise KeyError("foo")
+        assert not boundary.report()
+
+    def test_clear(self, boundary) -> None:
+        process(boundary, [-1])
+        boundary.collector.clear()
+        assert not boundary.report()
+
+
+class TestErrorCollector:
+    def test_other_exceptions(self) -> None:
+        collector = ErrorCollector()
+        boundary = ErrorBoundary(on_suppress_exception=collector)
+        for key in ["foo", "foo", ["unhashable"]]:
+            with boundary:
+                raise KeyError(key)
+        report = collector.report()
+        assert [(e.code, e.params, e.count) for e in report.errors] == [
+            ("KeyError", ("foo",), 2),
+            ("KeyError", "(['unhashable'],)", 1),
+        ]
+        with pytest.raises(ErrorsCollected) as error_info:
+            collector.raise_for_errors()
+        assert str(error_info.value) == "3 error(s) of 2 kind(s) collected"
+
+    def test_threads(self) -> None:
+        collector = ErrorCollector(max_tracebacks=5)
+        boundary = ErrorBoundary(on_suppress_exception=collector)
+
+        def worker():
+            process(boundary, [-1, 10] * 500)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = collector.report()
+        assert report.total == 8000
+        assert [e.count for e in report.errors] == [4000, 4000]
+        assert [len(e.tracebacks) for e in report.errors] == [5, 5]
@@ -0,0 +1,98 @@
+import pytest
+
+from pca.packages.errors import (
+    ErrorBoundary,
+    ErrorCatalog,
+    ExceptionInfo,
+    Fingerprinter,
+    error_builder,
+    fingerprint,
+)
+
+
+class FingerprintCatalog(ErrorCatalog):
+    FingerprintedError = error_builder()
+    OtherError = error_builder(params=("foo",))
+
+
+def raise_error(error):
+    raise error
+
+
+def caught(error_class, **kwargs):
+    try:
+        raise_error(error_class(**kwargs))
+    except Exception as e:
+        return e
+
+
+def caught_elsewhere(error_class, **kwargs):
+    try:
+        raise_error(error_class(**kwargs))
+    except Exception as e:
+        return e
+
+
+class TestFingerprint:
+    def test_same_origin(self) -> None:
+        errors = [caught(FingerprintCatalog.FingerprintedError, i=i) for i in range(3)]
+        assert len({e.fingerprint() for e in errors}) == 1
+        assert len(errors[0].fingerprint()) == 16
+        assert fingerprint(errors[0]) == errors[0].fingerprint()
+
+    def test_different_origin(self) -> None:
+        error = caught(FingerprintCatalog.FingerprintedError)
+        assert error.fingerprint() != caught_elsewhere(error.cls).fingerprint()
+
+    def test_different_error(self) -> None:
+        error = caught(FingerprintCatalog.FingerprintedError)
+        other = caught(FingerprintCatalog.OtherError, foo=1)
+        assert error.fingerprint() != other.fingerprint()
+
+    def test_not_raised(self) -> None:
+        error = FingerprintCatalog.FingerprintedError()
+        assert error.fingerprint() == FingerprintCatalog.FingerprintedError().fingerprint()
+        assert error.fingerprint() != caught(error.cls).fingerprint()
+
+    def test_foreign_exception(self) -> None:
+        assert fingerprint(caught(KeyError)) == fingerprint(
+            caught(
+                KeyError,
+            )
+        )
+        assert fingerprint(caught(KeyError)) != fingerprint(caught(ValueError))
+
+    def test_exception_info(self) -> None:
+        boundary = ErrorBoundary(catch=Exception)
+        with boundary:
+            raise_error(FingerprintCatalog.FingerprintedError())
+        exc_info = boundary.exc_info
+        assert exc_info.fingerprint() == exc_info.value.fingerprint()
+        assert ExceptionInfo(None, None, None).fingerprint() is None
+
+
+class TestFingerprinter:
+    def test_limit(self) -> None:
+        error, other = caught(KeyError), caught_elsewhere(KeyError)
+        innermost = Fingerprinter(limit=1)
+        assert innermost(error) == innermost(other)
+        assert Fingerprinter(limit=2)(error) != Fingerprinter(limit=2)(other)
+        assert Fingerprinter(limit=0)(error) == Fingerprinter()(KeyError())
+
+    def test_frames(self) -> None:
+        error = caught(KeyError)
+        frames = Fingerprinter().frames(error.__traceback__)
+        assert [code.co_name for code, _ in frames] == ["caught", "raise_error"]
+        assert all(isinstance(lineno, int) for _, lineno in frames)
+
+    def test_cache(self) -> None:
+        fingerprinter = Fingerprinter(maxsize=2)
+        errors = [caught(KeyError), caught(ValueError), caught(TypeError)]
+        results = [fingerprinter(e) for e in errors]
+        assert len(fingerprinter._fingerprints) == 2
+        assert [fingerprinter(e) for e in errors] == results
+
+    @pytest.mark.parametrize("maxsize", [1, 4096])
+    def test_stable(self, maxsize) -> None:
+        error = caught(FingerprintCatalog.FingerprintedError)
+        assert Fingerprinter(maxsize=maxsize)(error) == fingerprint(error)
@@ -0,0 +1,245 @@
+import io
+import json
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorIds,
+    ErrorRegistry,
+    LazyError,
+    decode_many,
+    encode_many,
+    error_builder,
+    error_ids,
+    from_bytes,
+    from_dict,
+    iter_from_json_lines,
+    to_bytes,
+)
+
+
+class IdsCatalog(ErrorCatalog):
+    Zeta = error_builder()
+    Alpha = error_builder()
+
+    class Nested(ErrorCatalog):
+        Beta = error_builder()
+
+
+class IdsLaterCatalog(ErrorCatalog):
+    Gamma = error_builder()
+
+
+def make_registry(*catalogs):
+    registry = ErrorRegistry()
+    for catalog in catalogs:
+        for error_class in catalog.all:
+            registry.register(error_class)
+    return registry
+
+
+def pinned_ids(registry):
+    return ErrorIds(registry, ErrorIds(registry).lock())
+
+
+@pytest.fixture
+def registry():
+    return make_registry(IdsCatalog)
+
+
+LOCK = {
+    "IdsCatalog.Alpha": 1,
+    "IdsCatalog.Nested.Beta": 2,
+    "IdsCatalog.Zeta": 3,
+    "IdsLaterCatalog.Gamma": 4,
+}
+
+
+class TestErrorIds:
+    def test_pinned_by_path(self, registry) -> None:
+        ids = ErrorIds(registry, LOCK)
+        assert ids.id_of(IdsCatalog.Alpha) == 1
+        assert ids.id_of(IdsCatalog.Nested.Beta) == 2
+        assert ids.id_of(IdsCatalog.Zeta()) == 3
+        assert ids[2] is IdsCatalog.Nested.Beta
+
+    def test_not_pinned(self, registry) -> None:
+        ids = ErrorIds(registry)
+        with pytest.raises(KeyError, match="no pinned ID"):
+            ids.id_of(IdsCatalog.Alpha)
+        with pytest.raises(KeyError):
+            ids[1]
+        with pytest.raises(KeyError, match="isn't in a catalog"):
+            ids.id_of(error_builder("Detached"))
+        # proposed, but not assigned
+        assert ids.lock() == {
+            "IdsCatalog.Alpha": 1,
+            "IdsCatalog.Nested.Beta": 2,
+            "IdsCatalog.Zeta": 3,
+        }
+        with pytest.raises(KeyError):
+            ids.id_of(IdsCatalog.Alpha)
+
+    def test_import_order_independent(self) -> None:
+        reversed_registry = ErrorRegistry()
+        for error_class in reversed(IdsCatalog.all):
+            reversed_registry.register(error_class)
+        assert ErrorIds(reversed_registry).lock() == ErrorIds(make_registry(IdsCatalog)).lock()
+
+    def test_independent_of_first_use(self) -> None:
+        # IDs asked for between the imports of the errors & after both of them
+        early_registry = ErrorRegistry()
+        early = ErrorIds(early_registry, LOCK)
+        early_registry.register(IdsCatalog.Zeta)
+        assert early.id_of(IdsCatalog.Zeta) == 3
+        early_registry.register(IdsCatalog.Alpha)
+        late = ErrorIds(make_registry(IdsCatalog), LOCK)
+        for error_class in (IdsCatalog.Alpha, IdsCatalog.Zeta):
+            assert early.id_of(error_class) == late.id_of(error_class)
+
+    def test_registered_later(self, registry) -> None:
+        ids = ErrorIds(registry, LOCK)
+        assert ids.id_of(IdsCatalog.Zeta) == 3
+        with pytest.raises(KeyError):
+            ids.id_of(IdsLaterCatalog.Gamma)
+        with pytest.raises(KeyError):
+            ids[4]
+        registry.register(IdsLaterCatalog.Gamma)
+        assert ids[4] is IdsLaterCatalog.Gamma
+        assert ids.id_of(IdsCatalog.Zeta) == 3
+
+    def test_pinned(self) -> None:
+        pinned = {"IdsCatalog.Zeta": 1, "Removed.Error": 5, "IdsCatalog.Alpha": 2}
+        ids = ErrorIds(make_registry(IdsCatalog, IdsLaterCatalog), pinned)
+        assert ids.lock() == {
+            "IdsCatalog.Zeta": 1,
+            "IdsCatalog.Alpha": 2,
+            "Removed.Error": 5,
+            "IdsCatalog.Nested.Beta": 6,
+            "IdsLaterCatalog.Gamma": 7,
+        }
+        assert ids.id_of(IdsCatalog.Zeta) == 1
+        with pytest.raises(KeyError):
+            ids[5]
+        with pytest.raises(KeyError):
+            ids.id_of(IdsLaterCatalog.Gamma)
+
+    def test_registered_again(self, registry) -> None:
+        ids = ErrorIds(registry, LOCK)
+        assert ids.id_of(IdsCatalog.Alpha) == 1
+
+        class IdsCatalog2(ErrorCatalog):
+            __qualname__ = "IdsCatalog"
+            Alpha = error_builder()
+
+        registry.register(IdsCatalog2.Alpha)
+        assert ids.id_of(IdsCatalog2.Alpha) == ids.id_of(IdsCatalog.Alpha) == 1
+        assert ids[1] is IdsCatalog2.Alpha
+
+    def test_same_path_in_other_module(self, registry) -> None:
+        ids = ErrorIds(registry, LOCK)
+        assert ids[1] is IdsCatalog.Alpha
+        other = ErrorCatalog.from_hints("IdsCatalog", {"Alpha": ""}, module="ids_other")
+        registry.register_many(other)
+        for error_class in (IdsCatalog.Alpha, other.Alpha):
+            with pytest.raises(KeyError, match="many modules"):
+                ids.id_of(error_class)
+        with pytest.raises(KeyError):
+            ids[1]
+        assert ids.id_of(IdsCatalog.Zeta) == 3
+
+    def test_lazy_errors_not_built(self) -> None:
+        catalog = ErrorCatalog.from_hints("IdsLazyCatalog", {"A": "", "B": ""}, lazy=True)
+        registry = ErrorRegistry()
+        registry.register_many(catalog)
+        ids = ErrorIds(registry, {"IdsLazyCatalog.A": 1, "IdsLazyCatalog.B": 2})
+        assert ids.lock() == {"IdsLazyCatalog.A": 1, "IdsLazyCatalog.B": 2}
+        assert all(e.materialized is None for e in catalog)
+        assert ids[1] is catalog.A
+        assert ids.id_of(catalog.A) == 1
+        assert isinstance(catalog.__dict__["B"], LazyError)
+
+    def test_pinned_path_not_registered(self, registry) -> None:
+        ids = ErrorIds(registry, {"IdsCatalog.Removed": 1, "Removed.Error": 2})
+        for error_id in (1, 2):
+            with pytest.raises(KeyError, match="isn't registered"):
+                ids[error_id]
+        with pytest.raises(KeyError, match="isn't registered"):
+            ErrorIds(ErrorRegistry(), LOCK).id_of(IdsCatalog.Alpha)
+
+    def test_pin(self, registry) -> None:
+        ids = ErrorIds(registry, {"IdsCatalog.Alpha": 1})
+        ids.pin({"IdsCatalog.Alpha": 1, "IdsCatalog.Zeta": 3})
+        assert ids.id_of(IdsCatalog.Zeta) == 3
+        assert ids[1] is IdsCatalog.Alpha
+        with pytest.raises(ValueError, match="already pinned"):
+            ids.pin({"IdsCatalog.Alpha": 2})
+        with pytest.raises(ValueError, match="unique"):
+            ids.pin({"IdsCatalog.Nested.Beta": 3})
+        assert ids.lock()["IdsCatalog.Nested.Beta"] == 4
+
+    @pytest.mark.parametrize("pinned", [{"A.a": 1, "A.b": 1}, {"A.a": 0}, {"A.a": "1"}])
+    def test_invalid_pinned(self, pinned) -> None:
+        with pytest.raises(ValueError):
+            ErrorIds(ErrorRegistry(), pinned)
+
+    def test_dump_load(self, registry) -> None:
+        file = io.StringIO()
+        ErrorIds(registry, {"IdsCatalog.Zeta": 10}).dump(file)
+        file.seek(0)
+        ids = ErrorIds.load(file, make_registry(IdsCatalog, IdsLaterCatalog))
+        assert ids.id_of(IdsCatalog.Zeta) == 10
+        assert ids.id_of(IdsCatalog.Alpha) == 11
+        with pytest.raises(KeyError):
+            ids.id_of(IdsLaterCatalog.Gamma)
+        assert ids.lock()["IdsLaterCatalog.Gamma"] == 13
+
+    def test_load_unknown_version(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported version of the lock: 2"):
+            ErrorIds.load(io.StringIO(json.dumps({"version": 2, "ids": {}})))
+
+
+class TestSerialization:
+    def test_dict(self) -> None:
+        ids = ErrorIds(pinned={"IdsCatalog.Nested.Beta": 1})
+        error = IdsCatalog.Nested.Beta(foo="bar")
+        data = error.to_dict(ids=ids)
+        assert data == {"id": 1, "kwargs": {"foo": "bar"}}
+        rebuilt = from_dict(data, ids=ids)
+        assert rebuilt.cls is error.cls
+        assert rebuilt.kwargs == error.kwargs
+        with pytest.raises(KeyError):
+            IdsCatalog.Zeta().to_dict(ids=ids)
+
+    def test_default_ids(self) -> None:
+        file = io.StringIO()
+        ErrorIds(pinned={"IdsCatalog.Nested.Beta": 1000}).dump(file)
+        file.seek(0)
+        error_ids.pin(ErrorIds.read(file))
+        data = IdsCatalog.Nested.Beta().to_dict(ids=error_ids)
+        assert data["id"] == 1000
+        assert from_dict(data).cls is IdsCatalog.Nested.Beta
+
+    def test_json_lines(self, registry) -> None:
+        ids = pinned_ids(registry)
+        errors = [IdsCatalog.Alpha(), IdsCatalog.Zeta(a=1)]
+        lines = [json.dumps(e.to_dict(ids)) for e in errors]
+        rebuilt = list(iter_from_json_lines(lines, ids=ids))
+        assert [e.cls for e in rebuilt] == [e.cls for e in errors]
+
+    def test_wire(self, registry) -> None:
+        ids = pinned_ids(registry)
+        errors = [IdsCatalog.Alpha(), IdsCatalog.Zeta(a="b"), IdsCatalog.Alpha()]
+        frame = encode_many(errors, ids)
+        assert b"Alpha" not in frame
+        assert len(frame) < len(encode_many(errors))
+        rebuilt = decode_many(frame, ids=ids)
+        assert [e.cls for e in rebuilt] == [e.cls for e in errors]
+        assert rebuilt[1].kwargs == {"a": "b"}
+        assert from_bytes(to_bytes(errors[0], ids), ids=ids).cls is IdsCatalog.Alpha
+
+    def test_wire_unknown_id(self, registry) -> None:
+        frame = to_bytes(IdsCatalog.Alpha(), pinned_ids(registry))
+        with pytest.raises(KeyError):
+            decode_many(frame, ids=ErrorIds(ErrorRegistry()))
@@ -7,3 +7,4 @@ def test_pca_namespace():
     assert hasattr(errors, "ErrorMeta")
     assert hasattr(errors, "ErrorCatalog")
     assert hasattr(errors, "ExceptionWithCode")
+    assert hasattr(errors, "error_registry")
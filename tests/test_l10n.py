@@ -0,0 +1,119 @@
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    MessageRenderer,
+    MessageTemplate,
+    error_builder,
+)
+
+
+class L10nCatalog(ErrorCatalog):
+    NotFound = error_builder(hint="The resource has not been found.")
+    Invalid = error_builder(params=("field", "value"))
+    NoHint = error_builder()
+
+    class Nested(ErrorCatalog):
+        NotFound = error_builder()
+
+
+@pytest.fixture
+def renderer():
+    return MessageRenderer(
+        {
+            "en": {
+                "NotFound": "{resource} not found.",
+                "L10nCatalog.Invalid": "Invalid {field}: {value!r}.",
+            },
+            "pl": {"L10nCatalog.Nested.NotFound": "Nie znaleziono: {resource}."},
+            "pl_PL": {"L10nCatalog.Invalid": "Niepoprawne pole {field}."},
+        }
+    )
+
+
+class TestMessageTemplate:
+    def test_render(self) -> None:
+        template = MessageTemplate("{0}: {user.name} has {items[1]:>3} {{items}}")
+
+        class User:
+            name = "Alice"
+
+        assert template.render({"user": User(), "items": [1, 2]}, ("Note",)) == (
+            "Note: Alice has   2 {items}"
+        )
+        assert repr(template) == f"MessageTemplate({template.text!r})"
+
+    def test_missing_params(self) -> None:
+        template = MessageTemplate("{count:d} of {total:d} {0}.")
+        assert template.render({"total": 3}) == "{count} of 3 {0}."
+        assert template.render({}, (), missing=lambda field: "?") == "? of ? ?."
+
+    def test_missing_params_with_escaped_braces(self) -> None:
+        template = MessageTemplate("a {{literal}} {x}, {{b}} {y:>3} }}")
+        assert template.render({}) == "a {literal} {x}, {b} {y} }"
+        assert template.render({"y": 1}) == "a {literal} {x}, {b}   1 }"
+
+    def test_literal(self) -> None:
+        assert MessageTemplate.literal("{not a field}").render({}) == "{not a field}"
+        assert MessageTemplate("").render({}) == ""
+
+    @pytest.mark.parametrize("text", ["{}", "{value:{width}}", "{unclosed"])
+    def test_invalid(self, text) -> None:
+        with pytest.raises(ValueError):
+            MessageTemplate(text)
+
+
+class TestMessageRenderer:
+    def test_render(self, renderer) -> None:
+        assert renderer.render(L10nCatalog.NotFound(resource="User")) == "User not found."
+        error = L10nCatalog.Invalid(field="age", value=-1)
+        assert renderer.render(error, "en_GB") == "Invalid age: -1."
+        assert renderer.render(error, "pl_PL") == "Niepoprawne pole age."
+
+    def test_locale_fallback(self, renderer) -> None:
+        assert renderer.locales("pl-PL") == ("pl-PL", "pl", "en")
+        assert renderer.locales("en") == ("en",)
+        assert renderer.locales() == ("en",)
+        nested = L10nCatalog.Nested.NotFound(resource="User")
+        assert renderer.render(nested, "pl-PL") == "Nie znaleziono: User."
+        # the bare code of the default locale
+        assert renderer.render(L10nCatalog.NotFound(resource="User"), "pl") == "User not found."
+
+    def test_without_template(self, renderer) -> None:
+        assert renderer.render(L10nCatalog.NoHint()) == "NoHint"
+        renderer.add("en", {"NotFound": "Not found: {{{resource}}}."})
+        assert renderer.template(L10nCatalog.NotFound) == "Not found: {{{resource}}}."
+        assert renderer.render(L10nCatalog.NotFound(resource="x")) == "Not found: {x}."
+        assert renderer.render(KeyError("key")) == "KeyError"
+        renderer.add("en", {"KeyError": "No such key: {0}."})
+        assert renderer.render(KeyError("key")) == "No such key: key."
+
+    def test_hint(self) -> None:
+        renderer = MessageRenderer()
+        assert renderer.render(L10nCatalog.NotFound()) == "The resource has not been found."
+
+    def test_missing_params(self, renderer) -> None:
+        assert renderer.render(L10nCatalog.NotFound()) == "{resource} not found."
+        renderer.missing = lambda field: "-"
+        assert renderer.render(L10nCatalog.Invalid(field="age")) == "Invalid age: -."
+
+    def test_render_many(self, renderer) -> None:
+        errors = [
+            L10nCatalog.Invalid(field="age", value=-1),
+            L10nCatalog.Invalid(field="name"),
+            L10nCatalog.Nested.NotFound(resource="User"),
+        ]
+        assert renderer.render_many(errors, "pl") == [
+            "Invalid age: -1.",
+            "Invalid name: {value}.",
+            "Nie znaleziono: User.",
+        ]
+        assert renderer.render_many([]) == []
+
+    def test_compiled_templates_are_cached(self) -> None:
+        renderer = MessageRenderer({"en": {"NotFound": "Not found."}}, maxsize=1)
+        renderer.render(L10nCatalog.NotFound())
+        renderer.render(L10nCatalog.NotFound())
+        assert renderer._compiled.cache_info().hits == 1
+        renderer.render(L10nCatalog.NoHint())
+        assert renderer._compiled.cache_info().currsize == 1
@@ -0,0 +1,375 @@
+import io
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorBoundary,
+    ErrorCodeFilter,
+    QueueLogSink,
+    RateLimitedSuppressionLog,
+    error_builder,
+)
+
+
+MyError = error_builder("MyError")
+
+
+@pytest.fixture
+def logger(caplog):
+    logger = logging.getLogger("test_log.error_code")
+    logger.addFilter(ErrorCodeFilter())
+    yield logger
+    logger.filters.clear()
+
+
+class TestErrorCodeFilter:
+    def test_error_with_code(self, logger, caplog) -> None:
+        try:
+            raise MyError(foo="bar")
+        except MyError:
+            logger.exception("failed")
+        assert caplog.records[0].error_code == "MyError"
+
+    def test_other_error(self, logger, caplog) -> None:
+        try:
+            raise KeyError("foo")
+        except KeyError:
+            logger.exception("failed")
+        assert caplog.records[0].error_code == "KeyError"
+
+    def test_no_error(self, logger, caplog) -> None:
+        logger.warning("no error")
+        assert caplog.records[0].error_code == ""
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimitedSuppressionLog:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def suppression_log(self, clock):
+        return RateLimitedSuppressionLog(burst=2, window=10.0, max_examples=2, clock=clock)
+
+    @pytest.fixture
+    def boundary(self, suppression_log):
+        return ErrorBoundary(name="api", on_suppress_exception=suppression_log)
+
+    def raise_many(self, boundary, count, **kwargs):
+        for i in range(count):
+            with boundary:
+                raise MyError(i=i, **kwargs)
+
+    def test_burst_logged_in_full(self, boundary, caplog) -> None:
+        self.raise_many(boundary, 5)
+        assert caplog.messages == ["MyError(i=0)", "MyError(i=1)"]
+        assert all(r.exc_info[0] is MyError for r in caplog.records)
+        assert all(r.levelno == logging.WARNING for r in caplog.records)
+
+    def test_summary_on_next_window(self, boundary, clock, caplog) -> None:
+        self.raise_many(boundary, 5)
+        clock.now = 10.0
+        self.raise_many(boundary, 1)
+        assert caplog.messages[2:] == [
+            "MyError suppressed by api 3 more time(s); examples: {'i': 2}, {'i': 3}",
+            "MyError(i=0)",
+        ]
+
+    def test_summary_on_other_error(self, suppression_log, boundary, clock, caplog) -> None:
+        other_boundary = ErrorBoundary(name="db", on_suppress_exception=suppression_log)
+        self.raise_many(boundary, 3)
+        clock.now = 5.0
+        self.raise_many(other_boundary, 3)
+        clock.now = 10.0
+        with other_boundary:
+            raise KeyError("foo")
+        assert caplog.messages[4:] == [
+            "MyError suppressed by api 1 more time(s); examples: {'i': 2}",
+            "KeyError('foo')",
+        ]
+        clock.now = 15.0
+        with boundary:
+            raise KeyError("foo")
+        assert caplog.messages[6:] == [
+            "MyError suppressed by db 1 more time(s); examples: {'i': 2}",
+            "KeyError('foo')",
+        ]
+
+    def test_no_summary_if_nothing_suppressed(self, boundary, clock, caplog) -> None:
+        self.raise_many(boundary, 2)
+        clock.now = 10.0
+        self.raise_many(boundary, 1)
+        assert caplog.messages == ["MyError(i=0)", "MyError(i=1)", "MyError(i=0)"]
+
+    def test_flush(self, boundary, suppression_log, caplog) -> None:
+        self.raise_many(boundary, 3)
+        suppression_log.flush()
+        suppression_log.flush()
+        assert caplog.messages == [
+            "MyError(i=0)",
+            "MyError(i=1)",
+            "MyError suppressed by api 1 more time(s); examples: {'i': 2}",
+        ]
+
+    def test_separate_buckets(self, suppression_log, caplog) -> None:
+        boundary = ErrorBoundary(name="api", on_suppress_exception=suppression_log)
+        other_boundary = ErrorBoundary(name="db", on_suppress_exception=suppression_log)
+        self.raise_many(boundary, 3)
+        self.raise_many(other_boundary, 3)
+        for _ in range(3):
+            with boundary:
+                raise KeyError("foo")
+        suppression_log.flush()
+        assert caplog.messages[-3:] == [
+            "MyError suppressed by api 1 more time(s); examples: {'i': 2}",
+            "MyError suppressed by db 1 more time(s); examples: {'i': 2}",
+            "KeyError suppressed by api 1 more time(s); examples: ('foo',)",
+        ]
+        assert len(caplog.messages) == 9
+
+    def test_defaults(self, caplog) -> None:
+        suppression_log = RateLimitedSuppressionLog()
+        assert suppression_log.logger is logging.getLogger("pca.packages.errors.boundary")
+        boundary = ErrorBoundary(name="api", on_suppress_exception=suppression_log)
+        self.raise_many(boundary, 11)
+        assert len(caplog.messages) == 10
+
+
+class BlockingStream(io.StringIO):
+    """A stream blocking the background thread of a sink on its first write until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.writing.set()
+        assert self.released.wait(5)
+        return super().write(text)
+
+
+class CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+class BrokenStream(io.StringIO):
+    def write(self, text: str) -> int:
+        raise OSError("disk full")
+
+
+class Unrepresentable:
+    def __repr__(self) -> str:
+        raise RuntimeError("no repr")
+
+
+class TestQueueLogSink:
+    @pytest.fixture
+    def stream(self):
+        return io.StringIO()
+
+    @pytest.fixture
+    def make_sink(self, stream):
+        sinks = []
+
+        def make_sink(**kwargs):
+            kwargs.setdefault("stream", stream)
+            sink = QueueLogSink(clock=lambda: 12.5, **kwargs)
+            sinks.append(sink)
+            return sink
+
+        yield make_sink
+        for sink in sinks:
+            if isinstance(sink.stream, BlockingStream):
+                sink.stream.released.set()
+            sink.close(timeout=5)
+
+    @pytest.fixture
+    def sink(self, make_sink):
+        return make_sink()
+
+    def lines(self, stream):
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def suppress(self, sink, count=1, start=0):
+        boundary = ErrorBoundary(name="api", on_suppress_exception=sink)
+        for i in range(start, start + count):
+            with boundary:
+                raise MyError(i=i)
+
+    def test_suppressed(self, sink, stream) -> None:
+        self.suppress(sink)
+        assert sink.flush(timeout=5)
+        (line,) = self.lines(stream)
+        traceback = line.pop("traceback")
+        assert line == {
+            "time": 12.5,
+            "boundary": "api",
+            "event": "suppressed",
+            "error": {"code": "MyError", "catalog": None, "kwargs": {"i": 0}},
+        }
+        assert "raise MyError(i=i)" in traceback
+        assert (sink.enqueued, sink.written, sink.dropped, sink.failed) == (1, 1, 0, 0)
+
+    def test_kwargs_changed_after_queued(self, make_sink, stream) -> None:
+        sink = make_sink(flush_interval=60)
+        boundary = ErrorBoundary(name="api", on_suppress_exception=sink)
+        with boundary:
+            raise MyError(i=0)
+        boundary.exc_info.value.kwargs["i"] = 1
+        assert sink.flush(timeout=5)
+        (line,) = self.lines(stream)
+        assert line["error"]["kwargs"] == {"i": 0}
+
+    def test_propagated(self, sink, stream) -> None:
+        boundary = ErrorBoundary(name="api", catch=(), on_propagate_exception=sink.propagated)
+        with pytest.raises(KeyError):
+            with boundary:
+                raise KeyError("foo")
+        sink.flush(timeout=5)
+        (line,) = self.lines(stream)
+        assert line["event"] == "propagated"
+        assert line["error"] == {"code": "KeyError", "type": "builtins.KeyError", "args": ["foo"]}
+
+    def test_inner_errors(self, sink, stream) -> None:
+        def fail(exc_info):
+            raise RuntimeError("hook failed")
+
+        boundary = ErrorBoundary(
+            name="api", on_suppress_exception=fail, log_inner_error=sink.inner_errors
+        )
+        with boundary:
+            raise MyError()
+        sink.flush(timeout=5)
+        line = self.lines(stream)[-1]
+        assert line["event"] == "inner_error"
+        assert line["where"] == "on_suppress_exception"
+        assert line["handled"] == "MyError"
+        assert line["error"]["code"] == "RuntimeError"
+        assert "hook failed" in line["traceback"]
+
+    def test_unserializable_args(self, sink, stream) -> None:
+        boundary = ErrorBoundary(name="api", on_suppress_exception=sink)
+        with boundary:
+            raise ValueError(object)
+        sink.flush(timeout=5)
+        assert self.lines(stream)[0]["error"]["args"] == [repr(object)]
+
+    def test_frames_summary(self, make_sink, stream) -> None:
+        sink = make_sink(frames="summary", traceback_limit=1)
+        self.suppress(sink)
+        sink.flush(timeout=5)
+        traceback = self.lines(stream)[0]["traceback"]
+        assert "raise MyError(i=i)" in traceback
+        assert traceback.count("File ") == 1
+
+    def test_frames_none(self, make_sink, stream) -> None:
+        sink = make_sink(frames="none")
+        self.suppress(sink)
+        sink.flush(timeout=5)
+        assert "traceback" not in self.lines(stream)[0]
+
+    def test_batches(self, make_sink) -> None:
+        stream = CountingStream()
+        sink = make_sink(stream=stream, batch_size=3, flush_interval=60)
+        self.suppress(sink, count=3)
+        assert sink.flush(timeout=5)
+        assert stream.writes == 1
+        assert [line["error"]["kwargs"]["i"] for line in self.lines(stream)] == [0, 1, 2]
+
+    @pytest.mark.parametrize(
+        "drop_policy, written",
+        [
+            (QueueLogSink.DROP_NEWEST, [0, 1, 2]),
+            (QueueLogSink.DROP_OLDEST, [0, 2, 3]),
+        ],
+    )
+    def test_drop_policy(self, make_sink, drop_policy, written) -> None:
+        stream = BlockingStream()
+        sink = make_sink(stream=stream, maxsize=2, batch_size=1, drop_policy=drop_policy)
+        self.suppress(sink)
+        assert stream.writing.wait(5)
+        # the background thread is stuck writing the first record, so the queue fills up
+        self.suppress(sink, count=3, start=1)
+        assert (sink.pending, sink.dropped) == (2, 1)
+        assert not sink.flush(timeout=0.01)
+        stream.released.set()
+        assert sink.flush(timeout=5)
+        assert [line["error"]["kwargs"]["i"] for line in self.lines(stream)] == written
+        assert (sink.enqueued, sink.written, sink.dropped) == (
+            4 if drop_policy == QueueLogSink.DROP_OLDEST else 3,
+            3,
+            1,
+        )
+
+    def test_idle(self, make_sink, stream) -> None:
+        sink = make_sink(flush_interval=0.001)
+        time.sleep(0.05)
+        self.suppress(sink)
+        assert sink.flush(timeout=5)
+        assert len(self.lines(stream)) == 1
+
+    def test_close_writes_pending(self, make_sink, stream) -> None:
+        sink = make_sink(batch_size=100, flush_interval=60)
+        self.suppress(sink, count=2)
+        sink.close(timeout=5)
+        assert len(self.lines(stream)) == 2
+        self.suppress(sink)
+        assert (sink.written, sink.dropped) == (2, 1)
+
+    def test_context_manager(self, stream) -> None:
+        with QueueLogSink(stream, flush_interval=60) as sink:
+            self.suppress(sink)
+        assert len(self.lines(stream)) == 1
+
+    def test_default_stream(self, make_sink, capsys) -> None:
+        sink = make_sink(stream=None)
+        self.suppress(sink)
+        sink.flush(timeout=5)
+        assert json.loads(capsys.readouterr().err)["boundary"] == "api"
+
+    def test_failed_writes(self, make_sink) -> None:
+        sink = make_sink(stream=BrokenStream())
+        self.suppress(sink, count=2)
+        assert sink.flush(timeout=5)
+        assert (sink.written, sink.failed) == (0, 2)
+
+    def test_failed_formatting(self, sink, stream) -> None:
+        boundary = ErrorBoundary(name="api", on_suppress_exception=sink)
+        with boundary:
+            raise ValueError(Unrepresentable())
+        sink.flush(timeout=5)
+        assert stream.getvalue() == ""
+        self.suppress(sink)
+        sink.flush(timeout=5)
+        assert len(self.lines(stream)) == 1
+        assert (sink.written, sink.failed) == (1, 1)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"drop_policy": "block"},
+            {"frames": "locals"},
+            {"maxsize": 0},
+            {"batch_size": 0},
+        ],
+    )
+    def test_invalid_arguments(self, kwargs) -> None:
+        with pytest.raises(ValueError):
+            QueueLogSink(**kwargs)
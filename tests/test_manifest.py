@@ -0,0 +1,185 @@
+import io
+import json
+import runpy
+import sys
+import textwrap
+import types
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    Manifest,
+    ManifestEntry,
+    error_builder,
+)
+from pca.packages.errors.manifest import main
+
+
+class ManifestCatalog(ErrorCatalog):
+    FirstError = error_builder(hint="The first one.")
+
+    class NestedCatalog(ErrorCatalog):
+        SecondError = error_builder()
+
+
+class OtherManifestCatalog(ErrorCatalog):
+    SecondError = error_builder(hint="Homonym of the nested one.")
+
+
+LAZY_MODULE = """
+from pca.packages.errors import ErrorCatalog, error_builder
+
+
+class LazyCatalog(ErrorCatalog):
+    class Nested(ErrorCatalog):
+        LazyError = error_builder(hint="Imported on demand.")
+"""
+
+
+@pytest.fixture
+def manifest():
+    return Manifest.from_modules([__name__])
+
+
+@pytest.fixture
+def lazy_module(tmp_path, monkeypatch):
+    (tmp_path / "manifest_lazy_module.py").write_text(textwrap.dedent(LAZY_MODULE))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "manifest_lazy_module"
+    sys.modules.pop("manifest_lazy_module", None)
+
+
+class TestManifest:
+    def test_from_modules(self, manifest) -> None:
+        assert [e.path for e in manifest] == [
+            "ManifestCatalog.FirstError",
+            "ManifestCatalog.NestedCatalog.SecondError",
+            "OtherManifestCatalog.SecondError",
+        ]
+        assert len(manifest) == 3
+        assert manifest["ManifestCatalog.FirstError"] == ManifestEntry(
+            __name__, "ManifestCatalog", "FirstError", "The first one."
+        )
+
+    def test_lookup(self, manifest) -> None:
+        assert manifest["FirstError"].path == "ManifestCatalog.FirstError"
+        assert "FirstError" in manifest
+        assert "OtherManifestCatalog.SecondError" in manifest
+        assert "NoSuchError" not in manifest
+        assert "SecondError" not in manifest
+        with pytest.raises(KeyError, match="ambiguous"):
+            manifest["SecondError"]
+        with pytest.raises(KeyError):
+            manifest["NoSuchError"]
+        assert [e.catalog for e in manifest.find("SecondError")] == [
+            "ManifestCatalog.NestedCatalog",
+            "OtherManifestCatalog",
+        ]
+        assert manifest.find("NoSuchError") == ()
+
+    def test_dump_load(self, manifest) -> None:
+        file = io.StringIO()
+        manifest.dump(file)
+        file.seek(0)
+        loaded = Manifest.load(file)
+        assert list(loaded) == list(manifest)
+        assert loaded.diff(manifest) == {}
+
+    def test_load_unknown_version(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported version of the manifest: None"):
+            Manifest.load(io.StringIO(json.dumps({"errors": []})))
+
+    def test_error_class(self, manifest) -> None:
+        assert manifest.error_class("FirstError") is ManifestCatalog.FirstError
+
+    def test_lazy_errors_not_built(self) -> None:
+        catalog = ErrorCatalog.from_hints(
+            "ManifestLazyCatalog", {"NotFound": "Not found."}, module=__name__, lazy=True
+        )
+        manifest = Manifest.from_catalogs([catalog])
+        assert manifest["NotFound"] == ManifestEntry(
+            __name__, "ManifestLazyCatalog", "NotFound", "Not found."
+        )
+        assert all(e.materialized is None for e in catalog)
+
+    def test_same_path_in_other_module(self) -> None:
+        entries = [
+            ManifestEntry(module, "ManifestSameNamed", "NotFound", "")
+            for module in ("manifest_a", "manifest_b")
+        ]
+        with pytest.raises(ValueError, match="ManifestSameNamed.NotFound"):
+            Manifest(entries)
+        # the same error listed twice, ie. through a catalog included into another one
+        assert len(Manifest(entries[:1] * 2)) == 1
+
+    def test_error_class_of_module(self, monkeypatch) -> None:
+        catalogs = [
+            ErrorCatalog.from_hints("ManifestSameNamed", {"NotFound": ""}, module=module)
+            for module in ("manifest_a", "manifest_b")
+        ]
+        for module in ("manifest_a", "manifest_b"):
+            monkeypatch.setitem(sys.modules, module, types.ModuleType(module))
+        for catalog in catalogs:
+            manifest = Manifest.from_catalogs([catalog])
+            assert manifest.error_class("NotFound") is catalog.NotFound
+
+    def test_lazy_import(self, lazy_module) -> None:
+        entry = ManifestEntry(
+            lazy_module, "LazyCatalog.Nested", "LazyError", "Imported on demand."
+        )
+        manifest = Manifest([entry])
+        assert manifest["LazyError"].hint == "Imported on demand."
+        assert lazy_module not in sys.modules
+        error_class = manifest.error_class("LazyError")
+        assert lazy_module in sys.modules
+        assert error_class is sys.modules[lazy_module].LazyCatalog.Nested.LazyError
+
+    def test_diff(self, manifest) -> None:
+        changed = Manifest(
+            [
+                ManifestEntry(__name__, "ManifestCatalog", "FirstError", "Changed."),
+                ManifestEntry(__name__, "ManifestCatalog", "NewError", ""),
+            ]
+        )
+        assert manifest.diff(changed) == {
+            "ManifestCatalog.FirstError": (
+                f"{__name__}:ManifestCatalog.FirstError 'The first one.'",
+                f"{__name__}:ManifestCatalog.FirstError 'Changed.'",
+            ),
+            "ManifestCatalog.NestedCatalog.SecondError": (
+                f"{__name__}:ManifestCatalog.NestedCatalog.SecondError ''",
+                "",
+            ),
+            "ManifestCatalog.NewError": ("", f"{__name__}:ManifestCatalog.NewError ''"),
+            "OtherManifestCatalog.SecondError": (
+                f"{__name__}:OtherManifestCatalog.SecondError 'Homonym of the nested one.'",
+                "",
+            ),
+        }
+
+
+class TestCommandLine:
+    def test_export(self, tmp_path, manifest) -> None:
+        output = tmp_path / "errors.json"
+        assert main(["export", __name__, "-o", str(output)]) == 0
+        with output.open() as file:
+            assert list(Manifest.load(file)) == list(manifest)
+
+    def test_check(self, tmp_path, capsys, lazy_module) -> None:
+        output = tmp_path / "errors.json"
+        main(["export", __name__, "-o", str(output)])
+        assert main(["check", str(output), __name__]) == 0
+        assert main(["check", str(output), __name__, lazy_module]) == 1
+        assert capsys.readouterr().out == (
+            "LazyCatalog.Nested.LazyError:\n"
+            "  manifest: -\n"
+            f"  modules:  {lazy_module}:LazyCatalog.Nested.LazyError 'Imported on demand.'\n"
+        )
+
+    def test_main_module(self, capsys, monkeypatch) -> None:
+        monkeypatch.setattr(sys, "argv", ["errors", "export", __name__])
+        with pytest.raises(SystemExit) as exit_info:
+            runpy.run_module("pca.packages.errors", run_name="__main__")
+        assert exit_info.value.code == 0
+        assert json.loads(capsys.readouterr().out)["version"] == 1
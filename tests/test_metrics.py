@@ -0,0 +1,184 @@
+import asyncio
+import threading
+
+import pytest
+
+from pca.packages.errors import (
+    BoundaryMetrics,
+    ErrorBoundary,
+    error_builder,
+)
+
+
+MyError = error_builder("MyError")
+
+
+@pytest.fixture
+def metrics():
+    return BoundaryMetrics(latency_buckets=(1.0, 0.1))
+
+
+@pytest.fixture
+def boundary(metrics):
+    return ErrorBoundary(name="api", catch=MyError, metrics=metrics)
+
+
+def outcomes(metrics, name="api"):
+    return metrics.snapshot()[name]["outcomes"]
+
+
+class TestOutcomes:
+    def test_passed(self, boundary, metrics) -> None:
+        with boundary:
+            pass
+        assert outcomes(metrics) == {
+            "passed": 1,
+            "suppressed": 0,
+            "propagated": 0,
+            "transformed": 0,
+        }
+        assert metrics.snapshot()["api"]["codes"] == {}
+
+    def test_suppressed(self, boundary, metrics) -> None:
+        for _ in range(2):
+            with boundary:
+                raise MyError()
+        assert outcomes(metrics)["suppressed"] == 2
+        assert metrics.snapshot()["api"]["codes"] == {"MyError": {"suppressed": 2}}
+
+    def test_propagated(self, boundary, metrics) -> None:
+        with pytest.raises(KeyError):
+            with boundary:
+                raise KeyError()
+        assert outcomes(metrics)["propagated"] == 1
+        assert metrics.snapshot()["api"]["codes"] == {"KeyError": {"propagated": 1}}
+
+    def test_propagated_by_failing_transformation(self, metrics) -> None:
+        def transform_propagated_exception(exc_info):
+            raise ValueError()
+
+        boundary = ErrorBoundary(
+            name="api",
+            catch=(),
+            metrics=metrics,
+            transform_propagated_exception=transform_propagated_exception,
+            log_inner_error=lambda *args: None,
+        )
+        with pytest.raises(KeyError):
+            with boundary:
+                raise KeyError()
+        assert outcomes(metrics)["propagated"] == 1
+
+    def test_transformed(self, metrics) -> None:
+        boundary = ErrorBoundary(
+            name="api",
+            catch=(),
+            metrics=metrics,
+            transform_propagated_exception=lambda exc_info: MyError(),
+        )
+        with pytest.raises(MyError):
+            with boundary:
+                raise KeyError()
+        assert outcomes(metrics)["transformed"] == 1
+        assert metrics.snapshot()["api"]["codes"] == {"KeyError": {"transformed": 1}}
+
+    def test_shared_by_boundaries(self, boundary, metrics) -> None:
+        other_boundary = ErrorBoundary(name="db", metrics=metrics)
+        with boundary:
+            pass
+        with other_boundary:
+            raise MyError()
+        assert outcomes(metrics, "api")["passed"] == 1
+        assert outcomes(metrics, "db")["suppressed"] == 1
+
+    def test_no_metrics(self) -> None:
+        boundary = ErrorBoundary()
+        with boundary:
+            raise MyError()
+        assert boundary.metrics is None
+
+
+class TestLatency:
+    def test_sync(self, boundary, metrics) -> None:
+        @boundary
+        def foo(fail):
+            if fail:
+                raise MyError()
+            return 42
+
+        assert foo(False) == 42
+        assert foo(True) is None
+        latency = metrics.snapshot()["api"]["latency"]
+        assert latency["buckets"] == [0.1, 1.0]
+        assert latency["counts"] == [2, 0, 0]
+        assert latency["count"] == 2
+        assert 0 < latency["sum"] < 0.2
+
+    def test_async(self, boundary, metrics) -> None:
+        @boundary
+        async def foo():
+            return 42
+
+        assert asyncio.run(foo()) == 42
+        latency = metrics.snapshot()["api"]["latency"]
+        assert latency["count"] == 1
+
+    def test_slow(self, metrics) -> None:
+        metrics.observe_latency("api", 0.5)
+        metrics.observe_latency("api", 5.0)
+        assert metrics.snapshot()["api"]["latency"]["counts"] == [0, 1, 1]
+
+
+class TestSharding:
+    def test_threads_merged(self, boundary, metrics) -> None:
+        @boundary
+        def foo(i):
+            if i % 2:
+                raise MyError()
+
+        def worker():
+            for i in range(1000):
+                foo(i)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snapshot = metrics.snapshot()["api"]
+        assert snapshot["outcomes"]["passed"] == 4000
+        assert snapshot["outcomes"]["suppressed"] == 4000
+        assert snapshot["codes"] == {"MyError": {"suppressed": 4000}}
+        assert snapshot["latency"]["count"] == 8000
+
+    def test_reset(self, boundary, metrics) -> None:
+        with boundary:
+            pass
+        metrics.reset()
+        assert metrics.snapshot() == {}
+        with boundary:
+            pass
+        assert outcomes(metrics)["passed"] == 1
+
+    def test_ended_threads_folded(self, boundary, metrics) -> None:
+        @boundary
+        def foo(i):
+            if i % 2:
+                raise MyError()
+
+        for i in range(50):
+            thread = threading.Thread(target=foo, args=(i,))
+            thread.start()
+            thread.join()
+            # shards pile up neither without snapshots
+            assert len(metrics._shards) <= 8
+
+        snapshot = metrics.snapshot()["api"]
+        assert metrics._shards == []
+        assert snapshot["outcomes"]["passed"] == 25
+        assert snapshot["outcomes"]["suppressed"] == 25
+        assert snapshot["codes"] == {"MyError": {"suppressed": 25}}
+        assert snapshot["latency"]["count"] == 50
+        assert sum(snapshot["latency"]["counts"]) == 50
+        assert metrics.snapshot()["api"] == snapshot
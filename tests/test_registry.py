@@ -0,0 +1,313 @@
+import gc
+import weakref
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorRegistry,
+    error_builder,
+    error_registry,
+)
+
+
+class RegistryExternalCatalog(ErrorCatalog):
+    ExternalError = error_builder()
+
+
+class RegistryCompositeCatalog(ErrorCatalog):
+    OwnError = error_builder()
+    Included = RegistryExternalCatalog
+
+    class NestedCatalog(ErrorCatalog):
+        NestedError = error_builder()
+        OwnError = error_builder()
+
+
+@pytest.fixture
+def registry():
+    registry = ErrorRegistry()
+    for error_class in RegistryCompositeCatalog.all:
+        registry.register(error_class)
+    registry.link(RegistryCompositeCatalog, "Included", RegistryExternalCatalog)
+    return registry
+
+
+class TestLookup:
+    def test_by_path(self, registry) -> None:
+        nested = RegistryCompositeCatalog.NestedCatalog
+        assert registry["RegistryCompositeCatalog.NestedCatalog.NestedError"] is nested.NestedError
+        assert registry["RegistryCompositeCatalog.OwnError"] is RegistryCompositeCatalog.OwnError
+
+    def test_by_included_path(self, registry) -> None:
+        external_error = RegistryExternalCatalog.ExternalError
+        assert registry["RegistryExternalCatalog.ExternalError"] is external_error
+        assert registry["RegistryCompositeCatalog.Included.ExternalError"] is external_error
+
+    def test_by_code(self, registry) -> None:
+        assert registry["ExternalError"] is RegistryExternalCatalog.ExternalError
+        # memoized
+        assert registry["ExternalError"] is RegistryExternalCatalog.ExternalError
+
+    def test_ambiguous_code(self, registry) -> None:
+        with pytest.raises(KeyError):
+            registry["OwnError"]
+        assert registry.find("OwnError") == (
+            RegistryCompositeCatalog.OwnError,
+            RegistryCompositeCatalog.NestedCatalog.OwnError,
+        )
+
+    def test_missing(self, registry) -> None:
+        with pytest.raises(KeyError):
+            registry["RegistryCompositeCatalog.Missing"]
+        assert registry.get("Missing") is None
+        assert registry.get("NoSuchCatalog.Missing") is None
+        assert "Missing" not in registry
+        assert "RegistryCompositeCatalog.OwnError" in registry
+        assert registry.find("Missing") == ()
+
+    def test_not_attached_error_is_ignored(self, registry) -> None:
+        registry.register(error_builder("Detached"))
+        assert "Detached" not in registry
+
+
+class TestRegistration:
+    def test_add_instance(self) -> None:
+        class RegistryAddInstanceCatalog(ErrorCatalog):
+            pass
+
+        error_class = error_builder("Added")
+        RegistryAddInstanceCatalog.add_instance(error_class)
+        path = f"{RegistryAddInstanceCatalog.__qualname__}.Added"
+        assert error_registry[path] is error_class
+
+    def test_register_many(self) -> None:
+        registry = ErrorRegistry()
+        generation = registry.generation
+        registry.register_many(RegistryCompositeCatalog.all + (error_builder("Detached"),))
+        assert registry.generation == generation + 1
+        assert registry["NestedError"] is RegistryCompositeCatalog.NestedCatalog.NestedError
+        assert registry["RegistryCompositeCatalog.OwnError"] is RegistryCompositeCatalog.OwnError
+        assert "Detached" not in registry
+        registry.register_many(())
+        assert registry.generation == generation + 1
+
+    def test_reregistering_is_idempotent(self, registry) -> None:
+        registry.register(RegistryCompositeCatalog.OwnError)
+        assert registry.find("OwnError") == (
+            RegistryCompositeCatalog.OwnError,
+            RegistryCompositeCatalog.NestedCatalog.OwnError,
+        )
+        assert registry.collisions == {}
+
+    def test_collisions(self, registry) -> None:
+        class SameNamedCatalog(ErrorCatalog):
+            __qualname__ = "RegistryCompositeCatalog"
+
+        duplicate = error_builder("OwnError")
+        duplicate.catalog = SameNamedCatalog
+        registry.register(duplicate)
+        assert registry.collisions == {
+            "RegistryCompositeCatalog.OwnError": (RegistryCompositeCatalog.OwnError, duplicate)
+        }
+        assert registry["RegistryCompositeCatalog.OwnError"] is duplicate
+
+    def test_same_path_in_other_module(self, registry) -> None:
+        catalogs = [
+            ErrorCatalog.from_hints(
+                "RegistrySameNamed", {"NotFound": hint, "Other": hint}, module=module
+            )
+            for module, hint in (("registry_a", "A"), ("registry_b", "B"))
+        ]
+        for catalog in catalogs:
+            registry.register_many(catalog)
+        with pytest.raises(KeyError, match="ambiguous"):
+            registry["RegistrySameNamed.NotFound"]
+        with pytest.raises(KeyError):
+            registry.resolve("RegistrySameNamed", "NotFound")
+        assert registry.get("RegistrySameNamed.NotFound") is None
+        assert list(registry.subtree("RegistrySameNamed")) == [
+            catalogs[0].NotFound,
+            catalogs[1].NotFound,
+            catalogs[0].Other,
+            catalogs[1].Other,
+        ]
+
+    def test_in_module(self, registry) -> None:
+        catalogs = [
+            ErrorCatalog.from_hints("RegistryInModule", {"NotFound": ""}, module=module)
+            for module in ("registry_a", "registry_b")
+        ]
+        registry.register_many(catalogs[0])
+        assert registry.in_module("registry_a", "RegistryInModule.NotFound") is (
+            catalogs[0].NotFound
+        )
+        for module, key in [
+            ("registry_b", "RegistryInModule.NotFound"),
+            ("registry_a", "RegistryInModule.Missing"),
+            ("registry_a", "Missing.NotFound"),
+            ("registry_a", "NotFound"),
+        ]:
+            with pytest.raises(KeyError):
+                registry.in_module(module, key)
+        registry.register_many(catalogs[1])
+        for catalog in catalogs:
+            assert registry.in_module(catalog.__module__, "RegistryInModule.NotFound") is (
+                catalog.NotFound
+            )
+
+    def test_same_path_in_other_module_lazy(self, registry) -> None:
+        catalogs = [
+            ErrorCatalog.from_hints(
+                "RegistrySameNamedLazy", {"NotFound": hint}, lazy=True, module=module
+            )
+            for module, hint in (("registry_a", "A"), ("registry_b", "B"))
+        ]
+        for catalog in catalogs:
+            registry.register_many(catalog)
+        # built from the placeholders, so registered again
+        error_classes = [catalog.NotFound for catalog in catalogs]
+        for error_class in error_classes:
+            registry.register(error_class)
+        assert list(registry.subtree("RegistrySameNamedLazy")) == error_classes
+        assert registry.find("NotFound")[-2:] == tuple(error_classes)
+        # building the classes isn't a collision
+        assert len(registry.collisions["RegistrySameNamedLazy.NotFound"]) == 2
+        with pytest.raises(KeyError, match="ambiguous"):
+            registry["RegistrySameNamedLazy.NotFound"]
+
+
+class RegistryBaseCatalog(ErrorCatalog):
+    Plain = error_builder()
+
+    class Nested(ErrorCatalog):
+        NestedError = error_builder()
+
+
+class RegistrySubCatalog(RegistryBaseCatalog):
+    Own = error_builder()
+
+
+class TestInheritance:
+    def test_inherited_errors(self) -> None:
+        assert error_registry["RegistrySubCatalog.Plain"] is RegistryBaseCatalog.Plain
+        assert error_registry["RegistrySubCatalog.Own"] is RegistrySubCatalog.Own
+        assert error_registry.get("RegistryBaseCatalog.Own") is None
+        assert error_registry.in_module(__name__, "RegistrySubCatalog.Plain") is (
+            RegistryBaseCatalog.Plain
+        )
+        assert error_registry.claims("RegistrySubCatalog.Plain") == {
+            __name__: RegistryBaseCatalog.Plain
+        }
+        assert error_registry.find("Plain").count(RegistryBaseCatalog.Plain) == 1
+
+    def test_inherited_nested_catalogs(self) -> None:
+        nested_error = RegistryBaseCatalog.Nested.NestedError
+        assert error_registry["RegistrySubCatalog.Nested.NestedError"] is nested_error
+
+    def test_added_to_base(self) -> None:
+        class RegistryAddedBase(ErrorCatalog):
+            __qualname__ = "RegistryAddedBase"
+
+        class RegistryAddedSub(RegistryAddedBase):
+            __qualname__ = "RegistryAddedSub"
+
+        error = error_builder("Added")
+        RegistryAddedBase.add_instance(error)
+        assert error_registry["RegistryAddedSub.Added"] is error
+
+    def test_overridden(self) -> None:
+        class RegistryOverridingCatalog(RegistryBaseCatalog):
+            __qualname__ = "RegistryOverridingCatalog"
+            Plain = error_builder()
+
+        path = "RegistryOverridingCatalog.Plain"
+        assert error_registry[path] is RegistryOverridingCatalog.Plain
+
+
+class TestLifetime:
+    def test_catalog_in_function_collected(self, registry) -> None:
+        def define():
+            class RegistryLocalCatalog(ErrorCatalog):
+                __qualname__ = "RegistryLocalCatalog"
+                LocalError = error_builder()
+
+            lazy = ErrorCatalog.from_hints("RegistryLocalLazy", {"LocalError": ""}, lazy=True)
+            registry.register_many(RegistryLocalCatalog)
+            registry.register_many(lazy)
+            registry.register(lazy.LocalError)
+            assert len(registry.find("LocalError")) == 2
+            return [weakref.ref(RegistryLocalCatalog), weakref.ref(lazy)]
+
+        refs = define()
+        gc.collect()
+        assert [ref() for ref in refs] == [None, None]
+        for reg in (registry, error_registry):
+            assert reg.find("LocalError") == ()
+            assert reg.get("RegistryLocalCatalog.LocalError") is None
+            assert reg.get("RegistryLocalLazy.LocalError") is None
+
+    def test_redefined_in_same_module(self, registry) -> None:
+        catalogs = []
+        for _ in range(2):
+
+            class RegistryRedefinedCatalog(ErrorCatalog):
+                __qualname__ = "RegistryRedefinedCatalog"
+                RedefinedError = error_builder()
+
+            registry.register_many(RegistryRedefinedCatalog)
+            catalogs.append(RegistryRedefinedCatalog)
+        redefined = catalogs[-1].RedefinedError
+        for reg in (registry, error_registry):
+            assert reg["RedefinedError"] is redefined
+            assert reg.find("RedefinedError") == (redefined,)
+            assert reg["RegistryRedefinedCatalog.RedefinedError"] is redefined
+
+    def test_memoized_lookups_dropped(self, registry) -> None:
+        kept = ErrorCatalog.from_hints("RegistryKeptCatalog", {"MemoizedError": ""})
+        registry.register_many(kept)
+
+        def define():
+            local = ErrorCatalog.from_hints("RegistryLocalCatalog", {"MemoizedError": ""})
+            registry.register_many(local)
+            with pytest.raises(KeyError, match="ambiguous"):
+                registry["MemoizedError"]
+            with pytest.raises(KeyError):
+                registry.resolve(None, "MemoizedError")
+            assert len(registry.collisions) == 0
+
+        define()
+        gc.collect()
+        assert registry.resolve(None, "MemoizedError") is kept.MemoizedError
+        assert registry["MemoizedError"] is kept.MemoizedError
+
+
+class TestSubtree:
+    def test_catalog(self, registry) -> None:
+        nested = RegistryCompositeCatalog.NestedCatalog
+        assert list(registry.subtree("RegistryCompositeCatalog")) == [
+            RegistryCompositeCatalog.OwnError,
+            nested.NestedError,
+            nested.OwnError,
+            RegistryExternalCatalog.ExternalError,
+        ]
+        assert list(registry.subtree("RegistryCompositeCatalog.Included")) == [
+            RegistryExternalCatalog.ExternalError,
+        ]
+
+    def test_all(self, registry) -> None:
+        assert set(registry.subtree()) == set(RegistryCompositeCatalog.all)
+        assert len(list(registry.subtree())) == 4
+
+    def test_missing(self, registry) -> None:
+        assert list(registry.subtree("NoSuchCatalog")) == []
+
+
+def test_process_wide_registry() -> None:
+    nested = RegistryCompositeCatalog.NestedCatalog
+    assert (
+        error_registry["RegistryCompositeCatalog.NestedCatalog.NestedError"] is nested.NestedError
+    )
+    assert error_registry["RegistryCompositeCatalog.Included.ExternalError"] is (
+        RegistryExternalCatalog.ExternalError
+    )
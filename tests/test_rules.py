@@ -0,0 +1,132 @@
+import pytest
+
+from pca.packages.errors import (
+    Action,
+    DecisionTable,
+    ErrorBoundary,
+    ErrorCatalog,
+    Rule,
+    error_builder,
+)
+
+
+class RulesCatalog(ErrorCatalog):
+    NotFound = error_builder(base=LookupError)
+    Unavailable = error_builder()
+
+
+class BaseError(Exception):
+    pass
+
+
+class DerivedError(BaseError):
+    pass
+
+
+class DeeplyDerivedError(DerivedError):
+    pass
+
+
+def transform(exc_info):
+    return RulesCatalog.Unavailable(reason=repr(exc_info.value))
+
+
+class TestRule:
+    def test_types(self) -> None:
+        assert Rule(KeyError, Action.SUPPRESS).types == (KeyError,)
+        assert Rule((KeyError, ValueError), Action.SUPPRESS).types == (KeyError, ValueError)
+        assert Rule(RulesCatalog, Action.SUPPRESS).types == RulesCatalog.all
+
+    def test_transform_required(self) -> None:
+        with pytest.raises(ValueError):
+            Rule(KeyError, Action.TRANSFORM)
+        with pytest.raises(ValueError):
+            Rule(KeyError, Action.SUPPRESS, transform)
+
+
+class TestDecisionTable:
+    @pytest.fixture
+    def table(self):
+        return DecisionTable(
+            [
+                Rule(DerivedError, Action.PROPAGATE),
+                Rule(BaseError, Action.SUPPRESS),
+                Rule(RulesCatalog, Action.SUPPRESS),
+                Rule(TimeoutError, Action.TRANSFORM, transform),
+            ]
+        )
+
+    def test_first_matching_rule(self, table) -> None:
+        assert table.lookup(BaseError) is table.rules[1]
+        assert table.lookup(DerivedError) is table.rules[0]
+        assert table.lookup(DeeplyDerivedError) is table.rules[0]
+        assert table.lookup(RulesCatalog.NotFound) is table.rules[2]
+        assert table.lookup(TimeoutError) is table.rules[3]
+
+    def test_no_match(self, table) -> None:
+        rule = table.lookup(KeyError)
+        assert rule.action is Action.PROPAGATE
+        assert rule not in table.rules
+
+    def test_cached(self, table) -> None:
+        table.lookup(DeeplyDerivedError)
+        assert table._cache == {DeeplyDerivedError: table.rules[0]}
+
+    def test_bounded(self) -> None:
+        table = DecisionTable([Rule(BaseError, Action.SUPPRESS)], maxsize=2)
+        table.lookup(BaseError)
+        table.lookup(DerivedError)
+        table.lookup(DeeplyDerivedError)
+        assert list(table._cache) == [DerivedError, DeeplyDerivedError]
+
+
+class TestBoundaryRules:
+    @pytest.fixture
+    def boundary(self):
+        return ErrorBoundary(
+            catch=BaseError,
+            rules=[
+                Rule(DerivedError, Action.PROPAGATE),
+                Rule(RulesCatalog, Action.SUPPRESS),
+                Rule(TimeoutError, Action.TRANSFORM, transform),
+            ],
+        )
+
+    def test_suppress(self, boundary) -> None:
+        with boundary:
+            raise RulesCatalog.NotFound()
+        with boundary:
+            raise BaseError()
+
+    def test_propagate(self, boundary) -> None:
+        with pytest.raises(DeeplyDerivedError):
+            with boundary:
+                raise DeeplyDerivedError()
+        with pytest.raises(KeyError):
+            with boundary:
+                raise KeyError()
+
+    def test_transform(self, boundary) -> None:
+        with pytest.raises(RulesCatalog.Unavailable) as error_info:
+            with boundary:
+                raise TimeoutError("foo")
+        assert error_info.value.reason == "TimeoutError('foo')"
+        assert isinstance(error_info.value.__cause__, TimeoutError)
+
+    def test_catch_changed(self, boundary) -> None:
+        boundary.catch = KeyError
+        assert boundary.catch is KeyError
+        with boundary:
+            raise KeyError()
+        with pytest.raises(BaseError):
+            with boundary:
+                raise BaseError()
+
+    def test_rules_changed(self, boundary) -> None:
+        boundary.rules = [Rule(RulesCatalog, Action.PROPAGATE)]
+        assert boundary.rules == (Rule(RulesCatalog, Action.PROPAGATE),)
+        with pytest.raises(RulesCatalog.NotFound):
+            with boundary:
+                raise RulesCatalog.NotFound()
+        with boundary:
+            raise DerivedError()
@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorRegistry,
+    error_builder,
+    from_dict,
+    iter_from_dicts,
+    iter_from_json_lines,
+)
+
+
+class SerializationCatalog(ErrorCatalog):
+    TopLevelError = error_builder()
+
+    class NestedCatalog(ErrorCatalog):
+        NestedError = error_builder()
+
+    class UniquelyNamedCatalog(ErrorCatalog):
+        UniquelyNamedError = error_builder()
+
+
+@pytest.fixture
+def errors():
+    return [
+        SerializationCatalog.TopLevelError(foo="bar"),
+        SerializationCatalog.NestedCatalog.NestedError(),
+        SerializationCatalog.NestedCatalog.NestedError(spam=["eggs"]),
+    ]
+
+
+def assert_same(rebuilt, errors):
+    assert len(rebuilt) == len(errors)
+    for rebuilt_error, error in zip(rebuilt, errors):
+        assert rebuilt_error.cls is error.cls
+        assert rebuilt_error.kwargs == error.kwargs
+        assert error.cls.conforms(rebuilt_error)
+
+
+class TestFromDict:
+    def test_round_trip(self, errors) -> None:
+        assert errors[1].to_dict()["catalog"] == "SerializationCatalog.NestedCatalog"
+        assert_same([from_dict(e.to_dict()) for e in errors], errors)
+
+    def test_by_path(self) -> None:
+        data = {"code": "NestedError", "catalog": "SerializationCatalog.NestedCatalog"}
+        error = from_dict(data)
+        assert error.cls is SerializationCatalog.NestedCatalog.NestedError
+        assert error.kwargs == {}
+
+    def test_by_catalog_name(self) -> None:
+        data = {"code": "UniquelyNamedError", "catalog": "UniquelyNamedCatalog"}
+        error = from_dict(data)
+        assert error.cls is SerializationCatalog.UniquelyNamedCatalog.UniquelyNamedError
+
+    def test_by_code(self) -> None:
+        error = from_dict({"code": "TopLevelError", "catalog": None, "kwargs": {"a": 1}})
+        assert error.cls is SerializationCatalog.TopLevelError
+        assert error.kwargs == {"a": 1}
+
+    def test_unknown(self) -> None:
+        with pytest.raises(KeyError):
+            from_dict({"code": "NoSuchError", "catalog": "SerializationCatalog"})
+        with pytest.raises(KeyError):
+            from_dict({"code": "NoSuchError", "catalog": None})
+
+    def test_custom_registry(self) -> None:
+        registry = ErrorRegistry()
+        with pytest.raises(KeyError):
+            from_dict(SerializationCatalog.TopLevelError().to_dict(), registry=registry)
+        registry.register(SerializationCatalog.TopLevelError)
+        error = from_dict(SerializationCatalog.TopLevelError().to_dict(), registry=registry)
+        assert error.cls is SerializationCatalog.TopLevelError
+
+
+class TestBulk:
+    def test_iter_from_dicts(self, errors) -> None:
+        rebuilt = iter_from_dicts(e.to_dict() for e in errors)
+        assert not isinstance(rebuilt, list)
+        assert_same(list(rebuilt), errors)
+
+    def test_iter_from_json_lines_file(self, errors) -> None:
+        lines = "".join(json.dumps(e.to_dict()) + "\n" for e in errors)
+        source = io.StringIO(lines + "\n")
+        assert_same(list(iter_from_json_lines(source)), errors)
+
+    def test_iter_from_json_lines_bytes(self, errors) -> None:
+        source = [json.dumps(e.to_dict()).encode() for e in errors]
+        assert_same(list(iter_from_json_lines(source)), errors)
+
+    def test_unknown(self) -> None:
+        source = ['{"code": "NoSuchError", "catalog": "SerializationCatalog"}']
+        with pytest.raises(KeyError):
+            list(iter_from_json_lines(source))
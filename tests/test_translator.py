@@ -0,0 +1,88 @@
+import pytest
+
+from pca.packages.errors import (
+    Action,
+    ErrorBoundary,
+    ErrorCatalog,
+    ExceptionTranslator,
+    Rule,
+    error_builder,
+)
+
+
+class TranslatedCatalog(ErrorCatalog):
+    NotFound = error_builder()
+    Unavailable = error_builder()
+
+
+class DriverTimeout(Exception):
+    def __init__(self, host, timeout=None):
+        super().__init__(host)
+        self.host = host
+        if timeout is not None:
+            self.timeout = timeout
+
+
+class ReadTimeout(DriverTimeout):
+    pass
+
+
+@pytest.fixture
+def translator():
+    translator = ExceptionTranslator()
+    translator.register(KeyError, TranslatedCatalog.NotFound, key=lambda e: e.args[0])
+    translator.register(DriverTimeout, TranslatedCatalog.Unavailable, attrs=("host", "timeout"))
+    return translator
+
+
+class TestTranslate:
+    def test_with_source_function(self, translator) -> None:
+        error = translator.translate(KeyError("foo"))
+        assert error.cls is TranslatedCatalog.NotFound
+        assert error.kwargs == {"key": "foo"}
+
+    def test_with_attrs(self, translator) -> None:
+        error = translator.translate(ReadTimeout("db", timeout=5))
+        assert error.cls is TranslatedCatalog.Unavailable
+        assert error.kwargs == {"host": "db", "timeout": 5}
+
+    def test_missing_attr_skipped(self, translator) -> None:
+        error = translator.translate(DriverTimeout("db"))
+        assert error.kwargs == {"host": "db"}
+
+    def test_no_translation(self, translator) -> None:
+        assert translator.translate(ValueError()) is None
+
+    def test_first_registered_wins(self, translator) -> None:
+        translator.register(ReadTimeout, TranslatedCatalog.NotFound)
+        assert translator.translate(ReadTimeout("db")).cls is TranslatedCatalog.Unavailable
+
+    def test_registering_drops_cache(self, translator) -> None:
+        assert translator.translate(ValueError()) is None
+        translator.register(ValueError, TranslatedCatalog.NotFound)
+        assert translator.translate(ValueError()).cls is TranslatedCatalog.NotFound
+
+
+class TestWithBoundary:
+    def test_as_hook_shared_by_boundaries(self, translator) -> None:
+        boundaries = [
+            ErrorBoundary(catch=(), transform_propagated_exception=translator) for _ in range(2)
+        ]
+        for boundary in boundaries:
+            with pytest.raises(TranslatedCatalog.NotFound) as error_info:
+                with boundary:
+                    raise KeyError("foo")
+            assert error_info.value.key == "foo"
+            assert isinstance(error_info.value.__cause__, KeyError)
+
+    def test_untranslated_propagated(self, translator) -> None:
+        boundary = ErrorBoundary(catch=(), transform_propagated_exception=translator)
+        with pytest.raises(ValueError):
+            with boundary:
+                raise ValueError()
+
+    def test_as_rule(self, translator) -> None:
+        boundary = ErrorBoundary(rules=[Rule(KeyError, Action.TRANSFORM, translator)])
+        with pytest.raises(TranslatedCatalog.NotFound):
+            with boundary:
+                raise KeyError("foo")
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+from pca.packages.errors import (
+    ErrorCatalog,
+    ErrorRegistry,
+    decode_many,
+    encode_many,
+    error_builder,
+    from_bytes,
+    to_bytes,
+)
+
+
+class WireCatalog(ErrorCatalog):
+    WireTopLevelError = error_builder()
+
+    class NestedCatalog(ErrorCatalog):
+        WireNestedError = error_builder()
+
+
+CatalogLessError = error_builder("WireCatalogLessError")
+
+VALUES = {
+    "none": None,
+    "true": True,
+    "false": False,
+    "int": -42,
+    "big_int": 2**70,
+    "negative_big_int": -(2**64),
+    "float": 1.5,
+    "str": "zażółć",
+    "bytes": b"\x00\xff",
+    "list": [1, "a", [None]],
+    "tuple": (1, (2.0,)),
+    "dict": {"a": {1: [True]}},
+}
+
+
+@pytest.fixture
+def errors():
+    return [
+        WireCatalog.WireTopLevelError(foo="bar"),
+        WireCatalog.NestedCatalog.WireNestedError(),
+        WireCatalog.NestedCatalog.WireNestedError(**VALUES),
+        WireCatalog.WireTopLevelError(foo="baz"),
+    ]
+
+
+def assert_same(rebuilt, errors):
+    assert len(rebuilt) == len(errors)
+    for rebuilt_error, error in zip(rebuilt, errors):
+        assert rebuilt_error.cls is error.cls
+        assert rebuilt_error.kwargs == error.kwargs
+        assert [type(v) for v in rebuilt_error.kwargs.values()] == [
+            type(v) for v in error.kwargs.values()
+        ]
+
+
+class TestSingle:
+    def test_round_trip(self, errors) -> None:
+        assert_same([from_bytes(to_bytes(e)) for e in errors], errors)
+
+    def test_no_catalog(self) -> None:
+        # like `from_dict`, only errors attached to a catalog can be rebuilt
+        data = to_bytes(CatalogLessError(a=1))
+        with pytest.raises(KeyError, match="WireCatalogLessError"):
+            from_bytes(data)
+
+    def test_smaller_than_json(self, errors) -> None:
+        error = errors[0]
+        assert len(to_bytes(error)) < len(json.dumps(error.to_dict()))
+
+    def test_many_errors(self, errors) -> None:
+        with pytest.raises(ValueError, match="Expected a single error, got 4"):
+            from_bytes(encode_many(errors))
+
+
+class TestBatch:
+    def test_round_trip(self, errors) -> None:
+        assert_same(decode_many(encode_many(errors)), errors)
+        assert decode_many(encode_many([])) == []
+
+    def test_wide_strings(self, errors) -> None:
+        errors.append(WireCatalog.WireTopLevelError(long="x" * 0x10000))
+        assert_same(decode_many(encode_many(errors)), errors)
+
+    def test_generator(self, errors) -> None:
+        assert_same(decode_many(encode_many(e for e in errors)), errors)
+
+    def test_interned_strings(self, errors) -> None:
+        once = len(encode_many(errors[:1]))
+        assert len(encode_many(errors[:1] * 10)) < 10 * once
+
+    def test_memoryview(self, errors) -> None:
+        frame = encode_many(errors)
+        buffer = bytearray(b"xx" + frame + b"yy")
+        assert_same(decode_many(memoryview(buffer)[2:-2]), errors)
+
+    def test_unknown(self) -> None:
+        with pytest.raises(KeyError):
+            decode_many(encode_many([WireCatalog.WireTopLevelError()]), registry=ErrorRegistry())
+
+
+class TestInvalid:
+    def test_unsupported_value(self) -> None:
+        with pytest.raises(TypeError, match="Object of type set can't be encoded"):
+            to_bytes(WireCatalog.WireTopLevelError(foo={1}))
+
+    def test_too_many_kwargs(self) -> None:
+        error = WireCatalog.WireTopLevelError(**{f"a{i}": i for i in range(0x10000)})
+        with pytest.raises(ValueError, match="Too many kwargs"):
+            to_bytes(error)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"",
+            b"XX" + to_bytes(WireCatalog.WireTopLevelError())[2:],
+            to_bytes(WireCatalog.WireTopLevelError())[:20],
+            to_bytes(WireCatalog.WireTopLevelError(foo=1))[:-1],
+            to_bytes(WireCatalog.WireTopLevelError(foo=b"abc"))[:-1],
+            to_bytes(WireCatalog.WireTopLevelError()) + b"\x00",
+            to_bytes(WireCatalog.WireTopLevelError(foo=None)).replace(b"N", b"?"),
+        ],
+        ids=[
+            "empty",
+            "magic",
+            "truncated strings",
+            "truncated",
+            "truncated bytes",
+            "trailing",
+            "tag",
+        ],
+    )
+    def test_corrupted(self, data) -> None:
+        with pytest.raises(ValueError):
+            decode_many(data)